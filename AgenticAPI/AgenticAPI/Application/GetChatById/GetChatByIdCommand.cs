@@ -1,4 +1,5 @@
-﻿using AgenticAPI.Infrastructure;
+﻿using AgenticAPI.Domain;
+using AgenticAPI.Infrastructure;
 using MediatR;
 
 namespace AgenticAPI.Application.GetChatById
@@ -16,7 +17,17 @@ namespace AgenticAPI.Application.GetChatById
             var response = new GetChatByIdResponseModel();
             try
             {
-                var result = await _chatService.GetByChatId(request.ChatId!);
+                Chat? result;
+                int messageCount;
+                if (request.Take.HasValue)
+                {
+                    (result, messageCount) = await _chatService.GetChatMessagesPage(request.ChatId!, request.Skip, request.Take.Value);
+                }
+                else
+                {
+                    result = await _chatService.GetByChatId(request.ChatId!);
+                    messageCount = result?.Messages.Count ?? 0;
+                }
 
                 if (result == null)
                 {
@@ -27,6 +38,7 @@ namespace AgenticAPI.Application.GetChatById
                 else
                 {
                     response.chat = result;
+                    response.MessageCount = messageCount;
                     response.Success = true;
                     response.StatusCode = System.Net.HttpStatusCode.OK;
                 }
@@ -5,5 +5,7 @@ namespace AgenticAPI.Application.GetChatById
     public class GetChatByIdRequestModel: IRequest<GetChatByIdResponseModel>
     {
         public string? ChatId { get; set; }
+        public int? Skip { get; set; }
+        public int? Take { get; set; }
     }
 }
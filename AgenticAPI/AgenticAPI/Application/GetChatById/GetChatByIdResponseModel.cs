@@ -5,6 +5,7 @@ namespace AgenticAPI.Application.GetChatById
     public class GetChatByIdResponseModel: BaseResponseModel
     {
         public Chat? chat { get; set; }
+        public int MessageCount { get; set; }
 
         public GetChatByIdResponseModel(): base()
         {
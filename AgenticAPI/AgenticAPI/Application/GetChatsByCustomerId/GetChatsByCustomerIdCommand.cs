@@ -1,3 +1,4 @@
+using AgenticAPI.Domain;
 using AgenticAPI.Infrastructure;
 using AgenticAPI.Application.GetChatsByCustomerId;
 using MediatR;
@@ -18,9 +19,9 @@ namespace AgenticAPI.Application.GetChatsByCustomerId
             var response = new GetChatsByCustomerIdResponseModel();
             try
             {
-                var result = await _chatService.GetChatsByCustomerId(request.CustomerId!);
+                var result = await _chatService.GetChatsByCustomerId(request.CustomerId!, request.CreatedAfter);
                 response.Success = true;
-                if (result == null || result.Count == 0)
+                if ((result == null || result.Count == 0) && !request.CreatedAfter.HasValue)
                 {
                     response.StatusCode = System.Net.HttpStatusCode.NotFound;
                     response.Errors.Add("Customer Id has no related chats");
@@ -28,7 +29,7 @@ namespace AgenticAPI.Application.GetChatsByCustomerId
                 else
                 {
                     response.StatusCode = System.Net.HttpStatusCode.OK;
-                    response.Chats = result;
+                    response.Chats = result ?? new List<ChatSummary>();
                 } 
             }
             catch (Exception ex)
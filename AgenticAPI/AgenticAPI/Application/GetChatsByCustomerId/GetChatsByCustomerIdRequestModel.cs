@@ -5,5 +5,6 @@ namespace AgenticAPI.Application.GetChatsByCustomerId
     public class GetChatsByCustomerIdRequestModel: IRequest<GetChatsByCustomerIdResponseModel>
     {
         public string? CustomerId { get; set; }
+        public DateTime? CreatedAfter { get; set; }
     }
 }
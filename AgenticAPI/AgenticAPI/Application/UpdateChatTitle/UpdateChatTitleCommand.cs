@@ -0,0 +1,41 @@
+﻿using AgenticAPI.Infrastructure;
+using MediatR;
+
+namespace AgenticAPI.Application.UpdateChatTitle
+{
+    public class UpdateChatTitleCommand : IRequestHandler<UpdateChatTitleRequestModel, UpdateChatTitleResponseModel>
+    {
+        private IChatService _chatService;
+
+        public UpdateChatTitleCommand(IChatService chatService)
+        {
+            _chatService = chatService;
+        }
+
+        public async Task<UpdateChatTitleResponseModel> Handle(UpdateChatTitleRequestModel request, CancellationToken cancellationToken)
+        {
+            var response = new UpdateChatTitleResponseModel();
+            try
+            {
+                var result = await _chatService.UpdateChatDetails(request.ChatId!, "ChatTitle", request.ChatTitle!);
+                response.Success = true;
+                response.StatusCode = System.Net.HttpStatusCode.Created;
+                response.Chat = result;
+            }
+            catch (ArgumentException ex)
+            {
+                response.Success = false;
+                response.StatusCode = System.Net.HttpStatusCode.BadRequest;
+                response.Errors!.Add(ex.Message);
+            }
+            catch (Exception ex)
+            {
+                response.Success = false;
+                response.StatusCode = System.Net.HttpStatusCode.InternalServerError;
+                response.Errors!.Add(ex.Message);
+            }
+
+            return response;
+        }
+    }
+}
@@ -0,0 +1,10 @@
+﻿using MediatR;
+
+namespace AgenticAPI.Application.UpdateChatTitle
+{
+    public class UpdateChatTitleRequestModel: IRequest<UpdateChatTitleResponseModel>
+    {
+        public string? ChatId { get; set; }
+        public string? ChatTitle { get; set; }
+    }
+}
@@ -0,0 +1,14 @@
+﻿using AgenticAPI.Domain;
+
+namespace AgenticAPI.Application.UpdateChatTitle
+{
+    public class UpdateChatTitleResponseModel: BaseResponseModel
+    {
+        public Chat? Chat { get; set; }
+
+        public UpdateChatTitleResponseModel(): base()
+        {
+
+        }
+    }
+}
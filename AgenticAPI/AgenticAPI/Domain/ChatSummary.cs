@@ -5,5 +5,7 @@
         public string? ChatId { get; set; }
         public string? ChatTitle { get; set; }
         public DateTime CreatedAt { get; set; }
+        public int MessageCount { get; set; }
+        public DateTime? LastMessageAt { get; set; }
     }
 }
@@ -43,22 +43,41 @@ namespace AgenticAPI.Infrastructure
             }
         }
         
-        public async Task<List<ChatSummary>> GetChatsByCustomerId(string customerId)
+        public async Task<List<ChatSummary>> GetChatsByCustomerId(string customerId, DateTime? createdAfter = null)
         {
             try
             {
                 var filter = Builders<BsonDocument>.Filter.Eq("CustomerId", customerId);
-                var projection = Builders<BsonDocument>.Projection
-                    .Include("ChatId")
-                    .Include("ChatTitle")
-                    .Include("CreatedAt");
-                var documents = await _chatCollection.Find(filter).Project(projection).ToListAsync();
+                if (createdAfter.HasValue)
+                {
+                    // Lets clients that already hold the older chats fetch only the new ones
+                    filter &= Builders<BsonDocument>.Filter.Gt("CreatedAt", createdAfter.Value.ToUniversalTime());
+                }
+                // The message count & last message time tell clients whether what they derived from a chat is still current
+                var messages = new BsonDocument("$ifNull", new BsonArray { "$Messages", new BsonArray() });
+                var projection = new BsonDocument
+                {
+                    { "ChatId", 1 },
+                    { "ChatTitle", 1 },
+                    { "CreatedAt", 1 },
+                    { "MessageCount", new BsonDocument("$size", messages) },
+                    { "LastMessageAt", new BsonDocument("$arrayElemAt", new BsonArray { "$Messages.Timestamp", -1 }) }
+                };
+                var documents = await _chatCollection.Aggregate()
+                    .Match(filter)
+                    .Sort(Builders<BsonDocument>.Sort.Descending("CreatedAt"))
+                    .Project(projection)
+                    .ToListAsync();
 
                 var result = documents.Select(doc => new ChatSummary
                 {
                     ChatId = doc.GetValue("ChatId", BsonNull.Value).AsString,
                     ChatTitle = doc.GetValue("ChatTitle", BsonNull.Value).AsString,
-                    CreatedAt = doc.GetValue("CreatedAt", BsonNull.Value).ToUniversalTime()
+                    CreatedAt = doc.GetValue("CreatedAt", BsonNull.Value).ToUniversalTime(),
+                    MessageCount = doc.GetValue("MessageCount", 0).ToInt32(),
+                    LastMessageAt = doc.Contains("LastMessageAt") && doc["LastMessageAt"].IsValidDateTime
+                        ? doc["LastMessageAt"].ToUniversalTime()
+                        : null
                 }).ToList();
 
                 return result;
@@ -90,6 +109,43 @@ namespace AgenticAPI.Infrastructure
         }
 
 
+        public async Task<(Chat? Chat, int MessageCount)> GetChatMessagesPage(string chatId, int? skip, int take)
+        {
+            try
+            {
+                // Without skip the last messages are returned, so a long chat opens on its most recent page
+                var slice = skip.HasValue
+                    ? new BsonArray { "$Messages", skip.Value, take }
+                    : new BsonArray { "$Messages", -take };
+                var projection = new BsonDocument
+                {
+                    { "_id", 0 },
+                    { "ChatId", 1 },
+                    { "CustomerId", 1 },
+                    { "ChatTitle", 1 },
+                    { "CreatedAt", 1 },
+                    { "Summary", 1 },
+                    { "Messages", new BsonDocument("$slice", slice) },
+                    { "MessageCount", new BsonDocument("$size", new BsonDocument("$ifNull", new BsonArray { "$Messages", new BsonArray() })) }
+                };
+
+                var filter = Builders<BsonDocument>.Filter.Eq("ChatId", chatId);
+                var doc = await _chatCollection.Aggregate().Match(filter).Project(projection).FirstOrDefaultAsync();
+                if (doc == null)
+                {
+                    return (null, 0);
+                }
+
+                return (BsonSerializer.Deserialize<Chat>(doc), doc.GetValue("MessageCount", 0).ToInt32());
+            }
+            catch (Exception ex)
+            {
+                Console.WriteLine("GetChatMessagesPage failed: " + ex.Message);
+                return (null, 0);
+            }
+        }
+
+
         public async Task<bool> AddMessagesToChat(string chatId, List<ChatMessage> messages)
         {
             try
@@ -120,16 +176,17 @@ namespace AgenticAPI.Infrastructure
         {
             try
             {
+                // Only the field is set, so messages added concurrently are not overwritten by a stale copy of the chat
                 var filter = Builders<BsonDocument>.Filter.Eq("ChatId", chatId);
-                var chat = await _chatCollection.Find(filter).FirstOrDefaultAsync();
+                var update = Builders<BsonDocument>.Update.Set(fieldToUpdate, BsonValue.Create(newValue));
+                var options = new FindOneAndUpdateOptions<BsonDocument> { ReturnDocument = ReturnDocument.After };
+                var chat = await _chatCollection.FindOneAndUpdateAsync(filter, update, options);
 
                 if (chat == null)
                 {
                     throw new ArgumentException("ChatId could not be found");
                 }
 
-                chat[fieldToUpdate] = BsonValue.Create(newValue);
-                await _chatCollection.ReplaceOneAsync(filter, chat);
                 return BsonSerializer.Deserialize<Chat>(chat);
             }
             catch (ArgumentException)
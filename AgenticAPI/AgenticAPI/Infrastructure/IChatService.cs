@@ -7,8 +7,9 @@ namespace AgenticAPI.Infrastructure
     public interface IChatService
     {
         public Task<bool> CreateChat(Chat newChat);
-        public Task<List<ChatSummary>> GetChatsByCustomerId(string customerId);
+        public Task<List<ChatSummary>> GetChatsByCustomerId(string customerId, DateTime? createdAfter = null);
         public Task<Chat?> GetByChatId(string chatId);
+        public Task<(Chat? Chat, int MessageCount)> GetChatMessagesPage(string chatId, int? skip, int take);
         public Task<bool> AddMessagesToChat(string chatId, List<ChatMessage> message);
         public Task<Chat?> UpdateChatDetails(string chatId, string fieldToUpdate, object newValue);
     }
@@ -8,6 +8,7 @@ using System.ComponentModel.DataAnnotations;
 using AgenticAPI.Application.GetChatById;
 using AgenticAPI.Application.GetChatsByCustomerId;
 using AgenticAPI.Application.UpdateChatSummary;
+using AgenticAPI.Application.UpdateChatTitle;
 
 namespace AgenticAPI.WebAPI.Controllers
 {
@@ -91,11 +92,11 @@ namespace AgenticAPI.WebAPI.Controllers
         [ProducesResponseType(StatusCodes.Status200OK)]
         [ProducesResponseType(StatusCodes.Status404NotFound)]
         [ProducesResponseType(StatusCodes.Status500InternalServerError)]
-        public async Task<IActionResult> GetChatsByCustomerId([FromHeader][Required] string customerId)
+        public async Task<IActionResult> GetChatsByCustomerId([FromHeader][Required] string customerId, [FromHeader] DateTime? createdAfter)
         {
             try
             {
-                var request = new GetChatsByCustomerIdRequestModel { CustomerId = customerId };
+                var request = new GetChatsByCustomerIdRequestModel { CustomerId = customerId, CreatedAfter = createdAfter };
                 var response = await _mediator.Send(request);
 
                 if (response.StatusCode == System.Net.HttpStatusCode.NotFound)
@@ -123,11 +124,11 @@ namespace AgenticAPI.WebAPI.Controllers
         [ProducesResponseType(StatusCodes.Status400BadRequest)]
         [ProducesResponseType(StatusCodes.Status500InternalServerError)]
         [ActionName("GetChatById")]
-        public async Task<IActionResult> GetChatById(string chatId)
+        public async Task<IActionResult> GetChatById(string chatId, [FromQuery] int? skip, [FromQuery] int? take)
         {
             try
             {
-                var request = new GetChatByIdRequestModel { ChatId = chatId };
+                var request = new GetChatByIdRequestModel { ChatId = chatId, Skip = skip, Take = take };
                 var response = await _mediator.Send(request);
 
                 if (response.StatusCode == System.Net.HttpStatusCode.OK)
@@ -178,5 +179,35 @@ namespace AgenticAPI.WebAPI.Controllers
                 return StatusCode(500, ex.Message);
             }
         }
+
+        [HttpPost("SetChatTitle")]
+        [ProducesResponseType(StatusCodes.Status201Created)]
+        [ProducesResponseType(StatusCodes.Status400BadRequest)]
+        [ProducesResponseType(StatusCodes.Status500InternalServerError)]
+        [ActionName("SetChatTitle")]
+        public async Task<IActionResult> SetChatTitle([FromBody] UpdateChatTitleRequestModel request)
+        {
+            try
+            {
+                var response = await _mediator.Send(request);
+
+                if (response.StatusCode == System.Net.HttpStatusCode.Created)
+                {
+                    return Created("Chat Title Set: ", response);
+                }
+                else if (response.StatusCode == System.Net.HttpStatusCode.BadRequest)
+                {
+                    return BadRequest(response);
+                }
+                else
+                {
+                    return StatusCode(500, "Could not access DB");
+                }
+            }
+            catch (Exception ex)
+            {
+                return StatusCode(500, ex.Message);
+            }
+        }
     }
 }
@@ -0,0 +1,131 @@
+import json
+import os
+import re
+from dataclasses import dataclass
+from typing import (
+    Dict,
+    List,
+    Optional,
+    Pattern,
+)
+
+import numpy as np
+from dotenv import load_dotenv, find_dotenv
+
+from services.text_embedding import HashedNgramEmbedder
+
+load_dotenv(find_dotenv())
+
+# Turns the router is not confident about go to the LLM supervisor
+INTENT_ROUTER_ENABLED = os.getenv("INTENT_ROUTER_ENABLED", "true").lower() == "true"
+INTENT_ROUTER_MIN_SIMILARITY = float(os.getenv("INTENT_ROUTER_MIN_SIMILARITY", "0.3"))
+INTENT_ROUTER_MIN_MARGIN = float(os.getenv("INTENT_ROUTER_MIN_MARGIN", "0.05"))
+INTENT_ROUTER_UTTERANCES = os.getenv(
+    "INTENT_ROUTER_UTTERANCES",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "intents", "train.json"),
+)
+
+# Label of the utterances the supervisor should handle itself: follow-ups, greetings, confirmations
+SUPERVISOR = "supervisor"
+
+# High precision patterns, a turn matching the patterns of exactly one agent is routed without the classifier
+RULES: Dict[str, List[str]] = {
+    "loan_statement_agent": [
+        r"\b(loan|account)\s+statement\b",
+        r"\bemi\s+(break\s?down|schedule)\b",
+        r"\brepayment\s+history\b",
+    ],
+    "loan_management_agent": [
+        r"\b(outstanding|remaining)\s+(loan|balance|amount|principal)\b",
+        r"\bforeclos",
+        r"\bpart[\s-]?payment\b",
+        r"\bpre[\s-]?pay",
+        r"\breduce\s+(my\s+)?(loan\s+)?tenure\b",
+        r"\b(close|pay\s+off)\s+(my\s+)?loan\b",
+    ],
+    "update_agent": [
+        r"\b(update|change|modify|replace|set)\b.*\be-?mail\b",
+        r"\b(enable|disable|turn\s+(on|off)|switch\s+(on|off)|stop|start|opt\s+(in|out))\b.*\breminders?\b",
+    ],
+    "query_agent": [
+        r"\bkyc\b",
+        r"\b(neft|rtgs|imps|upi)\b",
+    ],
+    "summary_agent": [
+        r"\b(summar(y|ise|ize)|recap)\b",
+        r"\b(what|when)\s+did\s+i\b",
+        r"\b(past|last)\s+(week|7\s+days)\b",
+    ],
+}
+
+
+@dataclass(frozen= True)
+class RouteDecision:
+    agent: str
+    confidence: float
+    source: str
+
+    @property
+    def confident(self) -> bool:
+        return self.agent != SUPERVISOR
+
+
+class IntentRouter:
+    """
+    Picks the agent for a user turn locally: regex rules first, then the nearest centroid of labelled utterances.
+    Turns below the similarity or margin thresholds, or closest to the supervisor's own utterances, go to the supervisor.
+    """
+
+    def __init__(
+        self,
+        utterances: Dict[str, List[str]],
+        rules: Optional[Dict[str, List[str]]] = None,
+        min_similarity: float = INTENT_ROUTER_MIN_SIMILARITY,
+        min_margin: float = INTENT_ROUTER_MIN_MARGIN,
+        embedder: Optional[HashedNgramEmbedder] = None,
+    ):
+        self.embedder = embedder or HashedNgramEmbedder()
+        self.min_similarity = min_similarity
+        self.min_margin = min_margin
+        self.rules: Dict[str, List[Pattern]] = {
+            agent: [re.compile(pattern, re.IGNORECASE) for pattern in patterns]
+            for agent, patterns in (RULES if rules is None else rules).items()
+        }
+
+        self.labels = list(utterances)
+        centroids = []
+        for label in self.labels:
+            centroid = np.mean([self.embedder.embed(text) for text in utterances[label]], axis= 0)
+            centroids.append(centroid / np.linalg.norm(centroid))
+        self.centroids = np.stack(centroids)
+
+    @classmethod
+    def from_file(cls, path: str = INTENT_ROUTER_UTTERANCES, **kwargs) -> "IntentRouter":
+        with open(path, "r", encoding= "utf-8") as file:
+            return cls(json.load(file), **kwargs)
+
+    def _match_rules(self, text: str) -> Optional[str]:
+        matched = {agent for agent, patterns in self.rules.items() if any(pattern.search(text) for pattern in patterns)}
+        return matched.pop() if len(matched) == 1 else None
+
+    def route(self, text: str) -> RouteDecision:
+        agent = self._match_rules(text)
+        if agent:
+            return RouteDecision(agent= agent, confidence= 1.0, source= "rule")
+
+        similarities = self.centroids @ self.embedder.embed(text)
+        ranked = np.argsort(similarities)[::-1]
+        best, runner_up = similarities[ranked[0]], similarities[ranked[1]]
+        label = self.labels[ranked[0]]
+        if best < self.min_similarity or best - runner_up < self.min_margin:
+            return RouteDecision(agent= SUPERVISOR, confidence= float(best), source= "fallback")
+        return RouteDecision(agent= label, confidence= float(best), source= "centroid")
+
+
+def get_intent_router() -> Optional[IntentRouter]:
+    """
+    Builds the default intent router from INTENT_ROUTER_UTTERANCES, or returns None when routing is disabled.
+    """
+    if not INTENT_ROUTER_ENABLED:
+        return None
+    return IntentRouter.from_file()
@@ -1,20 +1,14 @@
 from langgraph.prebuilt import create_react_agent
-from langchain_openai import ChatOpenAI
+from services.llm_registry import get_chat_model
 
 from tools.loan_statement_tool import get_loan_statement
 from models.graphState import GraphState
+from services.history_window import history_window_hook
 from dotenv import load_dotenv
-from pydantic import SecretStr
-import os
 
 load_dotenv()
 
-model = ChatOpenAI(
-    model="gpt-4o",
-    temperature=0,
-    streaming=True,
-    api_key=SecretStr(os.getenv('OPENAI_API_KEY', ''))
-)
+model = get_chat_model("agent")
 
 
 def get_loan_statement_agent():
@@ -38,6 +32,7 @@ def get_loan_statement_agent():
             Once the tool has been used, stop and return control to the supervisor or user."""
         ),
         name="loan_statement_agent",
+        pre_model_hook=history_window_hook("loan_statement_agent"),
         state_schema=GraphState,
     )
     
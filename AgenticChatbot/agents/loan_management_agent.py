@@ -1,26 +1,21 @@
 from langgraph.prebuilt import create_react_agent
-from langchain_openai import ChatOpenAI
-from pydantic import SecretStr
+from services.llm_registry import get_chat_model
 from dotenv import load_dotenv
-import os
 
 from tools.loan_management_tools import (
     get_outstanding_balance,
     get_loan_closure_amount,
     simulate_tenure_reduction,
     simulate_part_payment_impact,
+    compare_loan_scenarios,
 )
 
 from models.graphState import GraphState
+from services.history_window import history_window_hook
 
 load_dotenv()
 
-model = ChatOpenAI(
-    model="gpt-4o",
-    temperature=0,
-    streaming=True,
-    api_key=SecretStr(os.getenv('OPENAI_API_KEY', ''))
-)
+model = get_chat_model("agent")
 
 def get_loan_management_agent():
     agent = create_react_agent(
@@ -30,6 +25,7 @@ def get_loan_management_agent():
             get_loan_closure_amount,
             simulate_tenure_reduction,
             simulate_part_payment_impact,
+            compare_loan_scenarios,
         ],
         prompt=(
             """You are a helpful and specialized loan management assistant.
@@ -39,6 +35,7 @@ def get_loan_management_agent():
             - `get_loan_closure_amount`
             - `simulate_tenure_reduction`
             - `simulate_part_payment_impact`
+            - `compare_loan_scenarios`
 
             Your job is to help customers manage their loan by calling the appropriate tool
             based on what the user says.
@@ -56,6 +53,10 @@ def get_loan_management_agent():
             - If they mention part payment, lump sum, or want to reduce EMI or tenure by paying extra,
               call `simulate_part_payment_impact`. Make sure `part_payment` is provided.
 
+            - If they want to compare several part payment amounts and/or tenure reductions at once,
+              call `compare_loan_scenarios` with all the amounts and reductions mentioned.
+              Use [0] for the list the user did not mention.
+
             RULES:
             - Do not reply directly.
             - Always call the tool directly when you detect a relevant request.
@@ -67,6 +68,7 @@ def get_loan_management_agent():
             """
         ),
         name="loan_management_agent",
+        pre_model_hook=history_window_hook("loan_management_agent"),
         state_schema=GraphState,
     )
     return agent
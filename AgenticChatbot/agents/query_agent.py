@@ -1,21 +1,16 @@
 from langgraph.prebuilt import create_react_agent
-from langchain_openai import ChatOpenAI
+from services.llm_registry import get_chat_model
 from langgraph.graph.graph import CompiledGraph
 
 from models.graphState import GraphState
+from services.history_window import history_window_hook
 from tools.query_handlers.customer_data_query import process_customer_data_query
 from tools.query_handlers import profile_query_handler, payments_query_handler
 
-from pydantic import SecretStr
 from dotenv import load_dotenv
-import os
 
 load_dotenv()
-model = ChatOpenAI(model= "gpt-4o",
-                   temperature= 0,
-                   streaming= True, 
-                   api_key= SecretStr(os.getenv('OPENAI_API_KEY', ''))
-        )
+model = get_chat_model("agent")
 
 process_profile_query = profile_query_handler.get_profile_query_handler()
 process_payments_query = payments_query_handler.get_payments_query_handler()
@@ -37,6 +32,7 @@ def get_query_agent() -> CompiledGraph:
             """
         ),
         name= "query_agent",
+        pre_model_hook= history_window_hook("query_agent"),
         state_schema= GraphState,
     )
 
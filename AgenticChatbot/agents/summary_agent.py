@@ -1,6 +1,6 @@
 from langchain_core.tools import tool
 from langgraph.prebuilt import create_react_agent, InjectedState
-from langchain_openai import ChatOpenAI
+from services.llm_registry import get_chat_model
 from typing import (
     Dict,
     List,
@@ -9,27 +9,41 @@ from typing import (
 )
 from langgraph.graph.graph import CompiledGraph
 
-import requests
+import os
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from itertools import takewhile
+
+from services import backend_client
+from services.background import BackgroundJobError, run_in_background
+from services.summary_cache import get_summary_cache
 import certifi
 import ssl
 import urllib3
 urllib3.disable_warnings()
 from endpoints import Endpoints
 from datetime import datetime, timezone, timedelta
-from utils import chat_summary_generation
+from utils import chat_summary_generation, achat_summary_generation
+from tools.async_support import async_implementation
 from dotenv import load_dotenv, find_dotenv
-from pydantic import SecretStr
-import os
 from models.graphState import GraphState
+from services.history_window import history_window_hook
 
 
 load_dotenv(find_dotenv())
 
-model = ChatOpenAI(
-    model= "gpt-4o",
-    temperature= 0,
-    api_key= SecretStr(os.getenv('OPENAI_API_KEY', ''))
-)
+# Chats fetched & summarised at the same time when the summary agent looks at the past week
+SUMMARY_MAX_CONCURRENCY = int(os.getenv("SUMMARY_MAX_CONCURRENCY", "10"))
+
+model = get_chat_model("agent")
+
+
+def sort_chats_by_creation(chats: List[Dict]) -> List[Dict]:
+    return sorted(
+        chats,
+        key= lambda x: datetime.fromisoformat(x['createdAt'].replace('Z', '+00:00')),
+        reverse=True
+    )
 
 
 def fetch_all_chats_by_customer_id(customer_id: str) -> List[Dict]:
@@ -39,20 +53,13 @@ def fetch_all_chats_by_customer_id(customer_id: str) -> List[Dict]:
     }
 
     try:
-        response = requests.get(
+        response = backend_client.get(
             url,
             headers= headers,
-            verify= False,
         )
         data = response.json()
         if response.status_code == 200:
-            chats = data.get('chats', [])
-            sorted_chats = sorted(
-                        chats, 
-                        key= lambda x: datetime.fromisoformat(x['createdAt'].replace('Z', '+00:00')), 
-                        reverse=True
-                    )
-            return sorted_chats
+            return sort_chats_by_creation(data.get('chats', []))
         else:
             print(f"[ERROR] fetch_all_chats failed with status {response.status_code}: {data['errors']}")
             return []
@@ -61,44 +68,61 @@ def fetch_all_chats_by_customer_id(customer_id: str) -> List[Dict]:
         return []
 
 
-def fetch_messages_by_chat_id(chatId: str) -> List[Dict]:
-    url = Endpoints.GET_MESSAGES_BY_CHAT_ID.format(chatId= chatId)
+async def afetch_all_chats_by_customer_id(customer_id: str) -> List[Dict]:
+    url = Endpoints.GET_CHAT_BY_CUSTOMER_ID
+    headers = {
+        "customerId": customer_id
+    }
 
     try:
-        response = requests.get(
+        response = await backend_client.aget(
             url,
-            verify= False
+            headers= headers,
         )
         data = response.json()
         if response.status_code == 200:
-            return data['chat']['messages']
+            return sort_chats_by_creation(data.get('chats', []))
         else:
-            print(f"[ERROR] fetch_messages_by_chat_id failed with status {response.status_code}: {data['errors']}")
+            print(f"[ERROR] fetch_all_chats failed with status {response.status_code}: {data['errors']}")
             return []
     except Exception as e:
         print("[EXCEPTION] Could not complete request", e)
         return []
 
 
-def fetch_summary_for_chat_id(chatId: str) -> str:
+def fetch_chat(chatId: str) -> Dict:
+    """
+    Fetches a chat once, for both its messages & its stored summary.
+    """
     url = Endpoints.GET_MESSAGES_BY_CHAT_ID.format(chatId= chatId)
 
     try:
-        response = requests.get(
-            url,
-            verify= False
-        )
+        response = backend_client.get(url)
         data = response.json()
         if response.status_code == 200:
-            summary = data['chat']['summary']
-            return summary if summary else ""
-             
+            return data['chat']
         else:
-            print(f"[ERROR] fetch_messages_by_chat_id failed with status {response.status_code}: {data['errors']}")
-            return ""
+            print(f"[ERROR] fetch_chat failed with status {response.status_code}: {data['errors']}")
+            return {}
     except Exception as e:
         print("[EXCEPTION] Could not complete request", e)
-        return ""
+        return {}
+
+
+async def afetch_chat(chatId: str) -> Dict:
+    url = Endpoints.GET_MESSAGES_BY_CHAT_ID.format(chatId= chatId)
+
+    try:
+        response = await backend_client.aget(url)
+        data = response.json()
+        if response.status_code == 200:
+            return data['chat']
+        else:
+            print(f"[ERROR] fetch_chat failed with status {response.status_code}: {data['errors']}")
+            return {}
+    except Exception as e:
+        print("[EXCEPTION] Could not complete request", e)
+        return {}
 
 
 def add_summary_to_chat(chatId: str, summary: str) -> bool:
@@ -113,11 +137,10 @@ def add_summary_to_chat(chatId: str, summary: str) -> bool:
     }
 
     try:
-        response = requests.post(
+        response = backend_client.post(
             url,
             headers= headers,
             json= payload,
-            verify= False
         )
         if response.status_code == 201:
             return True
@@ -129,10 +152,88 @@ def add_summary_to_chat(chatId: str, summary: str) -> bool:
         return False
 
 
+async def aadd_summary_to_chat(chatId: str, summary: str) -> bool:
+    url = Endpoints.SET_CHAT_SUMMARY
+    headers = {
+        "accept": "*/*",
+        "Content-Type": "application/json"
+    }
+    payload = {
+        "chatId": chatId,
+        "summary": summary
+    }
 
+    try:
+        response = await backend_client.apost(
+            url,
+            headers= headers,
+            json= payload,
+        )
+        if response.status_code == 201:
+            return True
+        else:
+            print(f"[ERROR] fetch_messages_by_chat_id failed with status {response.status_code}")
+            return False
+    except Exception as e:
+        print("[EXCEPTION] Could not complete request", e)
+        return False
+
+
+
+
+def save_summary_in_background(chatId: str, summary: str) -> None:
+    """
+    Writes a generated summary back to the chat without holding up the answer, retrying failed writes.
+    The saved summary is read by `graph_window`, standing in for the older messages when the chat is reopened.
+    """
+    async def save() -> None:
+        if not await aadd_summary_to_chat(chatId, summary):
+            raise BackgroundJobError(f"Could not save the summary of chat {chatId}")
+
+    run_in_background(save, description= f"Saving the summary of chat {chatId}")
+
+
+def recent_chats(chat_history: List[Dict], days: int = 7) -> List[Dict]:
+    # The chats are sorted newest first
+    cutoff = datetime.now(timezone.utc) - timedelta(days= days)
+    return list(takewhile(
+        lambda chat: datetime.fromisoformat(chat['createdAt'].replace("Z", "+00:00")) >= cutoff,
+        chat_history,
+    ))
+
+
+# Summaries of unchanged chats are reused across sessions & restarts
+summary_cache = get_summary_cache()
+
+
+def stored_summary(chat: Dict, details: Dict) -> str:
+    # The backend keeps no version with the summary saved on a chat, which may predate the chat's last messages.
+    # It is only reused here for chats listed without a messageCount; versioned chats rely on summary_cache.
+    return "" if 'messageCount' in chat else details.get('summary') or ""
+
+
+def summarize_chat(chat: Dict) -> str:
+    details = fetch_chat(chat['chatId'])
+    if not details:
+        return ""
+    summary = stored_summary(chat, details)
+    if not summary:
+        summary = chat_summary_generation(details.get('messages', []))
+        save_summary_in_background(chat['chatId'], summary)
+    return summary
+
+
+async def asummarize_chat(chat: Dict, semaphore: asyncio.Semaphore) -> str:
+    async with semaphore:
+        details = await afetch_chat(chat['chatId'])
+        if not details:
+            return ""
+        summary = stored_summary(chat, details)
+        if not summary:
+            summary = await achat_summary_generation(details.get('messages', []))
+            save_summary_in_background(chat['chatId'], summary)
+    return summary
 
-# In Memory Cache to avoid repeated API calls
-cache = {}
 
 @tool(parse_docstring= True)
 def setup_summary_cache(state: Annotated[Dict[str, Any], InjectedState]) -> List[Dict]:
@@ -144,32 +245,40 @@ def setup_summary_cache(state: Annotated[Dict[str, Any], InjectedState]) -> List
     """
 
     customer_id = state["customer"]["customerId"]
-    summaries = []
-    now = datetime.now(timezone.utc)
-    cutoff = now - timedelta(days= 7)
-    chat_history = fetch_all_chats_by_customer_id(customer_id)
-    for chat in chat_history:
-        # Check cutoff date of past week
-        created_at = datetime.fromisoformat(chat['createdAt'].replace("Z", "+00:00"))
-        if created_at < cutoff:
-            break
-
-        if chat['chatId'] not in cache:
-            messages = fetch_messages_by_chat_id(chat['chatId'])
-            current_summary = fetch_summary_for_chat_id(chat['chatId'])
-            if current_summary:
-                summary = current_summary
-            else:
-                summary = chat_summary_generation(messages)
-                add_summary_to_chat(chat['chatId'], summary)
-            
-            cache[chat['chatId']] = summary
-        
-        
-        chat['summary'] = cache[chat['chatId']]
-        summaries.append(chat)
-
-    return summaries
+    chats = recent_chats(fetch_all_chats_by_customer_id(customer_id))
+
+    for chat in chats:
+        chat['summary'] = summary_cache.get(customer_id, chat) or ""
+
+    # The uncached chats are fetched & summarised concurrently, SUMMARY_MAX_CONCURRENCY at a time
+    missing = [chat for chat in chats if not chat['summary']]
+    if missing:
+        with ThreadPoolExecutor(max_workers= SUMMARY_MAX_CONCURRENCY) as executor:
+            for chat, summary in zip(missing, executor.map(summarize_chat, missing)):
+                chat['summary'] = summary
+                # Chats that could not be fetched are retried on the next call
+                if summary:
+                    summary_cache.set(customer_id, chat, summary)
+    return chats
+
+
+@async_implementation(setup_summary_cache)
+async def asetup_summary_cache(state: Dict[str, Any]) -> List[Dict]:
+    customer_id = state["customer"]["customerId"]
+    chats = recent_chats(await afetch_all_chats_by_customer_id(customer_id))
+
+    for chat in chats:
+        chat['summary'] = await summary_cache.aget(customer_id, chat) or ""
+
+    missing = [chat for chat in chats if not chat['summary']]
+    if missing:
+        semaphore = asyncio.Semaphore(SUMMARY_MAX_CONCURRENCY)
+        summaries = await asyncio.gather(*(asummarize_chat(chat, semaphore) for chat in missing))
+        for chat, summary in zip(missing, summaries):
+            chat['summary'] = summary
+            if summary:
+                await summary_cache.aset(customer_id, chat, summary)
+    return chats
 
 
 
@@ -194,6 +303,7 @@ def get_summary_agent() -> CompiledGraph:
             """
         ),
         name= "summary_agent",
+        pre_model_hook= history_window_hook("summary_agent"),
         state_schema= GraphState
     )
 
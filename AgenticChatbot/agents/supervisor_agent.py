@@ -1,4 +1,4 @@
-from langchain_openai import ChatOpenAI
+from services.llm_registry import get_chat_model
 from langgraph.graph.graph import CompiledGraph
 from langgraph.prebuilt import InjectedState, create_react_agent
 from langchain_core.tools import tool, InjectedToolCallId
@@ -10,26 +10,20 @@ from typing import (
     Dict, 
     Any
 )
-from pydantic import SecretStr
 from dotenv import load_dotenv
-import os
 from models.graphState import GraphState
+from services.history_window import history_window_hook
+from tools.async_support import async_implementation
 
 load_dotenv()
-model = ChatOpenAI(model= "gpt-4o",
-                   temperature= 0,
-                   api_key= SecretStr(os.getenv('OPENAI_API_KEY', ''))
-        )
+model = get_chat_model("router")
 
 
 def create_handoff_tool(*, agent_name: str, description: str | None = None):
     name = f"transfer_to_{agent_name}"
     description = description or f"Ask {agent_name} for help"
 
-    @tool(name, description= description) 
-    def handoff_tool(
-        tool_call_id: Annotated[str, InjectedToolCallId],state: Annotated[Dict[str, Any], InjectedState]
-    ) -> Command:
+    def handoff_command(tool_call_id: str, state: Dict[str, Any]) -> Command:
         tool_message = ToolMessage(
             content = f"Successfully transferred to {agent_name}",
             name= name, 
@@ -37,11 +31,23 @@ def create_handoff_tool(*, agent_name: str, description: str | None = None):
         )
         
         print(f"Handing Off to {name}")
+        # Only the new messages are sent, the parent's add_messages reducer appends them to its history.
+        # The AI message holding the tool call is included since the parent has not seen it yet.
         return Command(
             goto= agent_name,
-            update= {"messages": state["messages"] + [tool_message]},
+            update= {"messages": [state["messages"][-1], tool_message]},
             graph= Command.PARENT,
         )
+
+    @tool(name, description= description) 
+    def handoff_tool(
+        tool_call_id: Annotated[str, InjectedToolCallId],state: Annotated[Dict[str, Any], InjectedState]
+    ) -> Command:
+        return handoff_command(tool_call_id, state)
+
+    @async_implementation(handoff_tool)
+    async def ahandoff_tool(tool_call_id: str, state: Dict[str, Any]) -> Command:
+        return handoff_command(tool_call_id, state)
     
     return handoff_tool
 
@@ -93,6 +99,7 @@ def get_supervisor_agent(members: List[str]) -> CompiledGraph:
 """
         ),
         name="supervisor",
+        pre_model_hook=history_window_hook("supervisor"),
         state_schema=GraphState
     )
         
@@ -1,18 +1,13 @@
 from langgraph.prebuilt import create_react_agent
-from langchain_openai import ChatOpenAI
+from services.llm_registry import get_chat_model
 
 from tools.customer_update import *
 from models.graphState import GraphState
-from pydantic import SecretStr
+from services.history_window import history_window_hook
 from dotenv import load_dotenv
-import os
 
 load_dotenv()
-model = ChatOpenAI(model= "gpt-4o",
-                   temperature= 0,
-                   streaming= True,
-                   api_key= SecretStr(os.getenv('OPENAI_API_KEY', ''))
-        )
+model = get_chat_model("agent")
 
 
 def get_update_agent():
@@ -31,6 +26,7 @@ def get_update_agent():
             """
         ),
         name= "update_agent",
+        pre_model_hook= history_window_hook("update_agent"),
         state_schema= GraphState,
     )
 
@@ -1,18 +1,13 @@
 from langgraph.prebuilt import create_react_agent
-from langchain_openai import ChatOpenAI
+from services.llm_registry import get_chat_model
 from langgraph.graph.graph import CompiledGraph
 
 from tools.customer_id_validation import validate_customer_id
 from models.graphState import GraphState
-from pydantic import SecretStr
 from dotenv import load_dotenv, find_dotenv
-import os
 
 load_dotenv(find_dotenv())
-model = ChatOpenAI(model= "gpt-4o",
-                   temperature= 0,
-                   api_key= SecretStr(os.getenv('OPENAI_API_KEY', ''))
-        )
+model = get_chat_model("onboarding")
 
 
 prompt = """
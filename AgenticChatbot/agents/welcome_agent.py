@@ -1,8 +1,6 @@
-from langchain_openai import ChatOpenAI
+from services.llm_registry import get_chat_model
 from langchain_core.tools import tool, InjectedToolCallId
 from dotenv import load_dotenv, find_dotenv
-import os
-from pydantic import SecretStr
 from langgraph.prebuilt import create_react_agent, InjectedState
 from langgraph.graph.graph import CompiledGraph
 from langgraph.graph import END
@@ -10,6 +8,7 @@ from langgraph.types import Command
 from models.graphState import GraphState
 from tools.check_customer import check_customer
 from tools.verify_customer_id import verify_customer_id
+from tools.async_support import async_implementation
 from typing import (
     Annotated, 
     Dict, 
@@ -19,11 +18,7 @@ from langchain_core.messages import ToolMessage
 
 
 load_dotenv(find_dotenv())
-model = ChatOpenAI(
-    model= "gpt-4o",
-    temperature= 0,
-    api_key= SecretStr(os.getenv("OPENAI_API_KEY", ''))
-)
+model = get_chat_model("onboarding")
 
 prompt = """
 You are a welcome agent for a Loan application system.
@@ -81,6 +76,12 @@ def handle_validation_failure(tool_call_id: Annotated[str, InjectedToolCallId],
     )
 
 
+@async_implementation(handle_validation_failure)
+async def ahandle_validation_failure(tool_call_id: str, state: Dict[str, Any]) -> Command:
+    # No IO involved, the coroutine only saves the executor hop when the graph is awaited
+    return handle_validation_failure.func(tool_call_id, state)
+
+
 
 def get_welcome_agent() -> CompiledGraph:
     agent = create_react_agent(
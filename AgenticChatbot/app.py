@@ -2,55 +2,103 @@ import time
 from dotenv import load_dotenv
 import streamlit as st
 import streamlit_extras.stateful_button as stx
-from langchain_core.messages import HumanMessage, AIMessage
+from langchain_core.messages import HumanMessage
 from typing import List, Dict, Any
 from langchain_core.runnables import RunnableConfig
 from uuid import uuid4
 import asyncio
 from services.pdf_generation import generate_pdf_bytes, generate_excel_bytes
 import re
-from graph import build_model, invoke_model
+from graph import build_model, astream_model
+from langgraph.graph.graph import CompiledGraph
 from speech_processing import recognize_from_microphone, text_to_microphone
 from services.chat_logic import *
+from services.chat_persistence import ChatPersistence
+from services.message_queue import MESSAGE_QUEUE_ENABLED, get_message_queue
+from services.chat_history import ChatHistory
+from tools.query_handlers.rag_service import RAG_WARMUP_ON_START, warm_up_rag_services
+from services.chat_view import CHAT_PAGE_SIZE, CHAT_RENDER_WINDOW, graph_window, to_display
+from services.loan_service import invalidate_loan_statement
+from services import backend_client, llm_registry
 from utils import *
 from datetime import datetime, timezone
 
 
-async def stream_text_output(text: str):
+@st.cache_resource(show_spinner= "Starting the assistant...")
+def load_model() -> CompiledGraph:
     """
-    Stream text letter by letter in a parent st.chat_message().
+    Builds the agent graph once per process. Sessions share the compiled graph & its checkpointer
+    and are kept apart by the thread id in their run config.
     """
-    message_placeholder = st.empty()
-    displayed_text = ""
+    start = time.perf_counter()
+    graph = build_model()
+    print(f"[INFO] Agent graph built in {time.perf_counter() - start:.2f}s")
+    # The RAG pipelines are opened with the graph rather than on the first query that needs them
+    if RAG_WARMUP_ON_START:
+        warm_up_rag_services()
+    # Starts the message queue's flusher, which sends the messages a previous run left queued
+    if MESSAGE_QUEUE_ENABLED:
+        get_message_queue()
+    return graph
 
-    for char in text:
-        displayed_text += char
-        message_placeholder.markdown(displayed_text + "▌")  # add cursor for effect
-        time.sleep(0.04)  # use time.sleep for Streamlit, not asyncio
 
-    message_placeholder.markdown(displayed_text)  # remove cursor
+def session_config() -> RunnableConfig:
+    if "thread_id" not in st.session_state:
+        st.session_state.thread_id = str(uuid4())
+    return RunnableConfig({"configurable": {"thread_id": st.session_state.thread_id}})
 
 
-async def stream_output_with_audio(content):
-    ivr_message = ivr_message_generation(content)
-    await asyncio.gather(
-        text_to_microphone(ivr_message),
-        stream_text_output(content),
-        return_exceptions= False
-    )
+def start_new_thread() -> None:
+    """
+    Moves the session to a fresh checkpointer thread, e.g. when another chat is opened.
+    """
+    st.session_state.thread_id = str(uuid4())
 
-async def load_messages(messages: List[Dict[str, Any]]):
+
+async def speak_output(content: str):
     """
-    Load messages into the Streamlit chat interface.
+    Reads a shortened version of the assistant's reply out loud.
     """
-    
-    for msg in messages:
-        if msg["role"] == "user":
-            st.session_state.state["messages"].append(HumanMessage(content= msg["message"]))
-            st.session_state.messages.append({"role": "user", "content": msg["message"]})
-        elif msg["role"] == "assistant":
-            st.session_state.state["messages"].append(AIMessage(content= msg["message"]))
-            st.session_state.messages.append({"role": "assistant", "content": msg["message"]})
+    ivr_message = await aivr_message_generation(content)
+    await text_to_microphone(ivr_message)
+
+async def load_messages(chat_id: str):
+    """
+    Load the last page of a chat into the Streamlit chat interface. The agents get a bounded window of it
+    plus the chat summary, older pages are fetched when the user asks for them.
+    """
+    messages, message_count, summary = await fetch_messages_page(chat_id, take= CHAT_PAGE_SIZE)
+    older_messages = message_count - len(messages)
+
+    st.session_state.state["messages"].extend(graph_window(messages, summary, has_older= older_messages > 0))
+    st.session_state.messages.extend(to_display(messages))
+    st.session_state.older_messages_start = older_messages
+    st.session_state.visible_from = 0
+
+
+async def load_earlier_messages():
+    """
+    Shows the previous page of the chat, fetching it from the backend once every loaded message is shown.
+    """
+    if st.session_state.visible_from > 0:
+        st.session_state.visible_from = max(0, st.session_state.visible_from - CHAT_PAGE_SIZE)
+        return
+
+    chat_id = st.session_state.current_chat.known_chat_id() if st.session_state.current_chat else None
+    start = st.session_state.older_messages_start
+    if not chat_id or start <= 0:
+        return
+    skip = max(0, start - CHAT_PAGE_SIZE)
+    messages, _, _ = await fetch_messages_page(chat_id, take= start - skip, skip= skip)
+    st.session_state.messages[:0] = to_display(messages)
+    st.session_state.older_messages_start = skip
+
+
+def show_latest_messages():
+    """
+    Keeps the rendered part of a growing conversation within CHAT_RENDER_WINDOW messages.
+    """
+    st.session_state.visible_from = max(st.session_state.visible_from, len(st.session_state.messages) - CHAT_RENDER_WINDOW)
 
 
 async def handle_prompt(prompt: str):
@@ -63,30 +111,43 @@ async def handle_prompt(prompt: str):
         st.session_state.messages.append({"role": "user", "content": prompt})
 
         if st.session_state.state["validated"] == True:
+            # The chat is created & titled in the background while the agents answer
             if st.session_state.current_chat is None:
-                chat_title = chat_title_generation(prompt)
-                st.session_state.current_chat = await create_new_chat(
+                st.session_state.current_chat = ChatPersistence.create(
                     st.session_state.state["customer"]["customerId"],
-                    chat_title,
+                    prompt,
                 )
+                if "chat_history" in st.session_state:
+                    st.session_state.chat_history.track(st.session_state.current_chat)
             
             messages_to_add.append({
                 "role": "user", 
                 "message": prompt, 
                 "timestamp": datetime.now(timezone.utc).isoformat()})
 
-    response = invoke_model(model, input_state= st.session_state.state, config= config)
-    ai_msg = response["messages"][-1]
+    # Tokens are rendered as the agents generate them, the final message replaces the streamed text
+    with st.chat_message("assistant"):
+        message_placeholder = st.empty()
+        response = await astream_model(
+            model,
+            input_state= st.session_state.state,
+            config= session_config(),
+            on_text= lambda text: message_placeholder.markdown(text + "▌"),
+        )
+        ai_msg = response["messages"][-1]
+        message_placeholder.markdown(ai_msg.content)
+
     st.session_state.state = response
     st.session_state.messages.append({
         "role": "assistant", 
         "content": ai_msg.content, 
-        "to_stream": True,
+        "to_speak": True,
         "statement_generation": response.get("loan_statement_generation", False)
     })
 
     # Reset statement generation flag
     st.session_state.state["loan_statement_generation"] = False
+    show_latest_messages()
 
     if st.session_state.state["validated"] == True and st.session_state["current_chat"] is not None:
         messages_to_add.append({
@@ -95,10 +156,8 @@ async def handle_prompt(prompt: str):
             "timestamp": datetime.now(timezone.utc).isoformat()
         })
 
-        await add_messages_to_chat(
-            chat_id= st.session_state.current_chat,
-            messages= messages_to_add
-        )
+        # Saved in the background, in order & retried on failure
+        st.session_state.current_chat.add_messages(messages_to_add)
         
     st.rerun()
 
@@ -110,10 +169,18 @@ async def run_app():
     
     if validated == True:
         st.set_page_config(initial_sidebar_state= "expanded")
-        st.session_state["chatHistory"] = await fetch_all_chats_by_customer_id(st.session_state.state["customer"]["customerId"])
+        customer_id = st.session_state.state["customer"]["customerId"]
+        if "chat_history" not in st.session_state or st.session_state.chat_history.customer_id != customer_id:
+            st.session_state.chat_history = ChatHistory(customer_id)
+            st.session_state.chat_history_page = 0
+        # Only the chats created since the last refresh are fetched
+        await st.session_state.chat_history.refresh()
     else:
         st.set_page_config(initial_sidebar_state= "collapsed")
-    
+
+    # Built after the page config, which must be the first Streamlit call, as the cache spinner renders an element
+    global model
+    model = load_model()
     
     st.title("Concorde Finances")
     st.markdown("Providing Loan Customer Assistance")
@@ -131,17 +198,26 @@ async def run_app():
         st.session_state.messages = []
     if "current_chat" not in st.session_state:
         st.session_state.current_chat = None
-    
-    for i, msg in enumerate(st.session_state.messages):
+    if "visible_from" not in st.session_state:
+        st.session_state.visible_from = 0
+        st.session_state.older_messages_start = 0
+
+    if st.session_state.visible_from > 0 or st.session_state.older_messages_start > 0:
+        if st.button("Load earlier messages", type= "tertiary"):
+            await load_earlier_messages()
+            st.rerun()
+
+    # Only the latest messages are rendered, earlier ones are loaded on demand
+    for i in range(st.session_state.visible_from, len(st.session_state.messages)):
+        msg = st.session_state.messages[i]
         role = msg.get("role")
         content = msg.get("content")
-        to_stream = msg.get("to_stream", False)
+        to_speak = msg.get("to_speak", False)
         with st.chat_message(role):
-            if to_stream:
-                await stream_output_with_audio(content)
-                msg["to_stream"] = False
-            else:
-                st.markdown(content)
+            st.markdown(content)
+            if to_speak:
+                await speak_output(content)
+                msg["to_speak"] = False
 
 
             if msg.get("statement_generation", False):
@@ -199,29 +275,55 @@ async def run_app():
         new_chat_button = st.button("New Chat", disabled= not validated, type= "primary")
         if new_chat_button:
             print("[DEBUG] New chat button clicked")
+            invalidate_loan_statement(st.session_state.state["customer"]["customerId"])
             st.session_state.current_chat = None
             st.session_state.messages = []
+            st.session_state.visible_from = 0
+            st.session_state.older_messages_start = 0
+            st.session_state.chat_history_page = 0
+            start_new_thread()
             st.rerun()
         
         st.markdown("### Chat History")
-        for chat in st.session_state.get("chatHistory", []):
+        chat_history = st.session_state.get("chat_history")
+        page_count = chat_history.page_count() if chat_history else 1
+        page = min(st.session_state.get("chat_history_page", 0), page_count - 1)
+        # Only the current page is rendered, whatever the number of chats
+        for chat in chat_history.page(page) if chat_history else []:
             chatId = chat['chatId']
             chatTitle = chat['chatTitle']
-            isCurrentChat = chatId == st.session_state.current_chat
+            isCurrentChat = st.session_state.current_chat is not None and chatId == st.session_state.current_chat.known_chat_id()
             load_chat_buton = st.button(chatTitle, key= chatId, disabled= isCurrentChat, type= "tertiary" if isCurrentChat else "secondary")
             if load_chat_buton:
                 print(f"[DEBUG] Load chat button clicked for chatId: {chatId}")
                 st.session_state.state["messages"] = []
                 st.session_state.messages = []
-                st.session_state.current_chat = chatId
-                chat_messages = await fetch_messages_by_chat_id(chatId)
-                await load_messages(chat_messages)
+                st.session_state.current_chat = ChatPersistence.existing(chatId)
+                start_new_thread()
+                await load_messages(chatId)
+                st.rerun()
+
+        if page_count > 1:
+            newer_column, older_column = st.columns(2)
+            if newer_column.button("Newer", disabled= page == 0, use_container_width= True):
+                st.session_state.chat_history_page = page - 1
                 st.rerun()
+            if older_column.button("Older", disabled= page == page_count - 1, use_container_width= True):
+                st.session_state.chat_history_page = page + 1
+                st.rerun()
+            st.caption(f"Page {page + 1} of {page_count}")
+
+
+async def main():
+    try:
+        await run_app()
+    finally:
+        # The pooled aiohttp session & OpenAI connections are bound to this rerun's event loop
+        await backend_client.close_async_session()
+        await llm_registry.close_async_clients()
 
 
 if __name__ == "__main__":
     load_dotenv()
 
-    model = build_model()
-    config = RunnableConfig({"configurable": {"thread_id": str(uuid4())}})
-    asyncio.run(run_app())
+    asyncio.run(main())
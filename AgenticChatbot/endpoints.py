@@ -1,22 +1,30 @@
+import os
+from dotenv import load_dotenv, find_dotenv
+
+load_dotenv(find_dotenv())
+BACKEND_BASE_URL = os.getenv("BACKEND_BASE_URL", "https://localhost:7260").rstrip("/")
+
 class Endpoints:
-    GET_CUSTOMER_BY_ID = "https://localhost:7260/api/Customer"
+    GET_CUSTOMER_BY_ID = f"{BACKEND_BASE_URL}/api/Customer"
 
-    CHECK_CUSTOMER = "https://localhost:7260/api/Customer/CheckCustomer"
+    CHECK_CUSTOMER = f"{BACKEND_BASE_URL}/api/Customer/CheckCustomer"
 
-    VERIFY_CUSTOMER_ID = "https://localhost:7260/api/Customer/VerifyCustomer"
+    VERIFY_CUSTOMER_ID = f"{BACKEND_BASE_URL}/api/Customer/VerifyCustomer"
     
-    UPDATE_CUSTOMER_EMAIL = "https://localhost:7260/api/Customer/UpdateEmail"
+    UPDATE_CUSTOMER_EMAIL = f"{BACKEND_BASE_URL}/api/Customer/UpdateEmail"
+
+    UPDATE_CUSTOMER_PAYMENT_REMINDER = f"{BACKEND_BASE_URL}/api/Customer/UpdatePaymentReminder"
 
-    UPDATE_CUSTOMER_PAYMENT_REMINDER = "https://localhost:7260/api/Customer/UpdatePaymentReminder"
+    GET_CHAT_BY_CUSTOMER_ID = f"{BACKEND_BASE_URL}/api/Chat/GetChatsForCustomer"
 
-    GET_CHAT_BY_CUSTOMER_ID = "https://localhost:7260/api/Chat/GetChatsForCustomer"
+    CREATE_NEW_CHAT = f"{BACKEND_BASE_URL}/api/Chat/CreateChat"
 
-    CREATE_NEW_CHAT = "https://localhost:7260/api/Chat/CreateChat"
+    ADD_MESSAGES_TO_CHAT = f"{BACKEND_BASE_URL}/api/Chat/AddMesssages"
 
-    ADD_MESSAGES_TO_CHAT = "https://localhost:7260/api/Chat/AddMesssages"
+    GET_MESSAGES_BY_CHAT_ID = f"{BACKEND_BASE_URL}/api/Chat/{{chatId}}"
 
-    GET_MESSAGES_BY_CHAT_ID = "https://localhost:7260/api/Chat/{chatId}"
+    SET_CHAT_SUMMARY = f"{BACKEND_BASE_URL}/api/Chat/SetChatSummary"
 
-    SET_CHAT_SUMMARY = "https://localhost:7260/api/Chat/SetChatSummary"
+    SET_CHAT_TITLE = f"{BACKEND_BASE_URL}/api/Chat/SetChatTitle"
 
-    FETCH_LOAN_STATEMENT = "https://localhost:7260/api/LoanStatement"
\ No newline at end of file
+    FETCH_LOAN_STATEMENT = f"{BACKEND_BASE_URL}/api/LoanStatement"
\ No newline at end of file
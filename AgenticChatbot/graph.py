@@ -6,22 +6,60 @@ from agents.welcome_agent import get_welcome_agent
 from agents.summary_agent import get_summary_agent
 from agents.loan_agent import get_loan_statement_agent  
 from agents.loan_management_agent import get_loan_management_agent
+from agents.intent_router import IntentRouter, get_intent_router
 
-from typing import Dict, Any
+from typing import Dict, Any, Callable
 from langgraph.graph import StateGraph, START, END
-from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from services.checkpointers import get_checkpointer
 from langchain_core.runnables import RunnableConfig
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
 
 from langgraph.graph.graph import CompiledGraph
 from typing import Literal
 
-def build_model() -> CompiledGraph:
-    def router(state: GraphState) -> Literal["welcome_agent", "supervisor", "end"]:
+# Agents whose replies are meant for the user as they are, the supervisor would only repeat them
+FINAL_RESPONSE_AGENTS = {"summary_agent", "loan_statement_agent", "loan_management_agent"}
+
+
+def is_final_response(agent_name: str, state: GraphState) -> bool:
+    """
+    Whether the output of an agent's run can go to the user without another supervisor call:
+    the result of a return_direct tool, or the reply of an agent in FINAL_RESPONSE_AGENTS.
+    Failed tool calls always go back to the supervisor.
+    """
+    last_message = state["messages"][-1]
+    if isinstance(last_message, ToolMessage):
+        return last_message.status != "error"
+    if isinstance(last_message, AIMessage) and not last_message.tool_calls:
+        return agent_name in FINAL_RESPONSE_AGENTS
+    return False
+
+
+def build_model(checkpointer: BaseCheckpointSaver | None = None, intent_router: IntentRouter | None = None) -> CompiledGraph:
+    def route_turn(state: GraphState) -> str:
+        """
+        Sends a validated turn straight to an agent when the intent router is confident, else to the supervisor.
+        """
+        last_message = state["messages"][-1] if state["messages"] else None
+        if intent_router is None or not isinstance(last_message, HumanMessage):
+            return "supervisor"
+
+        decision = intent_router.route(last_message.content)
+        print(f"[INFO] Intent router: {decision.agent} ({decision.source}, {decision.confidence:.2f})")
+        return decision.agent
+
+    def after_agent(agent_name: str) -> Callable[[GraphState], str]:
+        def route_result(state: GraphState) -> str:
+            return END if is_final_response(agent_name, state) else "supervisor"
+        return route_result
+
+    def router(state: GraphState) -> str:
         """
         Routes the state to the appropriate agent based on validation status.
         """
         if state["validated"] == True:
-            return "supervisor"
+            return route_turn(state)
         else:
             if state["current_retries"] <= state["validation_retries"]:
                 return "welcome_agent"
@@ -29,7 +67,8 @@ def build_model() -> CompiledGraph:
                 return "end"
 
     
-    checkpointer= InMemorySaver()
+    checkpointer = checkpointer or get_checkpointer()
+    intent_router = intent_router or get_intent_router()
     update_agent = get_update_agent()
     query_agent = get_query_agent()
     summary_agent = get_summary_agent()
@@ -53,21 +92,78 @@ def build_model() -> CompiledGraph:
             {
                 "welcome_agent": "welcome_agent",
                 "supervisor": "supervisor",
+                **{member: member for member in members},
                 "end": END
             }
         )
         .add_edge("welcome_agent", END)
-        .add_edge("update_agent", "supervisor")
-        .add_edge("query_agent", "supervisor")
-        .add_edge("summary_agent", "supervisor")
-        .add_edge("update_agent", "supervisor")
-        .add_edge("loan_statement_agent", "supervisor")
-        .add_edge("loan_management_agent", "supervisor")
-    ).compile(checkpointer= checkpointer)
+    )
+    for member in members:
+        graph.add_conditional_edges(member, after_agent(member), ["supervisor", END])
 
-    return graph
+    return graph.compile(checkpointer= checkpointer)
 
 
 def invoke_model(model: CompiledGraph, input_state: Dict[str, Any], config: RunnableConfig) -> Dict[str, Any]:
     response = model.invoke(input_state, config= config)
-    return model.get_state(config= config).values
\ No newline at end of file
+    return model.get_state(config= config).values
+
+
+async def ainvoke_model(model: CompiledGraph, input_state: Dict[str, Any], config: RunnableConfig) -> Dict[str, Any]:
+    """
+    Async counterpart of `invoke_model`. Tools & agent nodes run their async implementations,
+    so the event loop stays free to serve other sessions while a turn waits on the LLM or the backend.
+    """
+    await model.ainvoke(input_state, config= config)
+    return (await model.aget_state(config= config)).values
+
+
+# Node of the prebuilt react agents that calls the LLM. LLM calls made inside tools are not streamed.
+AGENT_LLM_NODE = "agent"
+
+
+async def astream_model(
+    model: CompiledGraph,
+    input_state: Dict[str, Any],
+    config: RunnableConfig,
+    on_text: Callable[[str], None],
+) -> Dict[str, Any]:
+    """
+    Runs the graph like `ainvoke_model` while streaming the agents' replies token by token.
+
+    Args:
+        model (CompiledGraph): The compiled multi-agent graph.
+        input_state (Dict[str, Any]): The state to run the graph with.
+        config (RunnableConfig): The run config holding the thread id.
+        on_text (Callable[[str], None]): Called with the text of the reply being generated so far, every time a token arrives.
+            The text restarts when the next agent starts replying, and is reset to "" when a reply turns out to be a tool call.
+
+    Returns:
+        Dict[str, Any]: The state values once the run completes.
+    """
+    message_id = None
+    text = ""
+    tool_call_messages = set()
+
+    async for message, metadata in model.astream(input_state, config= config, stream_mode= "messages"):
+        if not isinstance(message, AIMessage) or metadata.get("langgraph_node") != AGENT_LLM_NODE:
+            continue
+        if message.id in tool_call_messages:
+            continue
+
+        if message.id != message_id:
+            message_id = message.id
+            text = ""
+
+        if message.tool_calls or getattr(message, "tool_call_chunks", None):
+            tool_call_messages.add(message.id)
+            if text:
+                text = ""
+                on_text(text)
+            continue
+
+        if isinstance(message.content, str) and message.content:
+            text += message.content
+            on_text(text)
+
+    return (await model.aget_state(config= config)).values
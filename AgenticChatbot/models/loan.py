@@ -28,3 +28,40 @@ class LoanStatementResponse(BaseModel):
     loanAccountNumber: str
     loanSummary: LoanSummary
     paymentHistory: Optional[List[LoanPayment]]
+
+
+class LoanClosureQuote(BaseModel):
+    outstandingPrincipal: float
+    interestRate: float
+    accruedInterest: float
+    foreclosureChargePercent: float
+    foreclosureCharge: float
+    totalClosureAmount: float
+
+class TenureReductionQuote(BaseModel):
+    principal: float
+    interestRate: float
+    remainingMonths: int
+    newTenureMonths: int
+    currentEmi: float
+    newEmi: float
+    emiIncrease: float
+    currentTotalInterest: float
+    newTotalInterest: float
+    interestSaved: float
+
+class PartPaymentQuote(BaseModel):
+    principal: float
+    partPayment: float
+    newPrincipal: float
+    interestRate: float
+    currentEmi: float
+    remainingMonths: int
+    currentTotalInterest: float
+    reducedEmi: float
+    reducedEmiTotalInterest: float
+    reducedEmiInterestSaved: float
+    reducedTenureMonths: int
+    reducedTenureTotalInterest: float
+    reducedTenureInterestSaved: float
+    monthsSaved: int
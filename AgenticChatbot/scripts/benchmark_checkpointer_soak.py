@@ -0,0 +1,120 @@
+"""
+Soak test of the checkpointer backends: runs many short sessions through the multi-agent graph and samples the
+traced Python heap (tracemalloc) as sessions accumulate. The unbounded InMemorySaver grows linearly with sessions,
+the bounded backends should level off once the thread cap is reached.
+
+Runs against a local stub backend & stub chat models, so no API keys or services are needed.
+
+Usage (from the AgenticChatbot directory):
+    python -m scripts.benchmark_checkpointer_soak --sessions 300 --turns 2 --max-threads 50
+"""
+import argparse
+import gc
+import os
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Dict, List
+from uuid import uuid4
+
+from scripts.benchmark_stubs import StubBackend, StubChatModel
+
+parser = argparse.ArgumentParser(description= __doc__, formatter_class= argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--sessions", type= int, default= 300, help= "Sessions run per backend")
+parser.add_argument("--turns", type= int, default= 2, help= "User turns per session")
+parser.add_argument("--sample-every", type= int, default= 50, help= "Sessions between memory samples")
+parser.add_argument("--max-threads", type= int, default= 50, help= "Thread cap of the bounded in-memory saver")
+parser.add_argument("--max-checkpoints", type= int, default= 10, help= "Checkpoints retained per thread")
+parser.add_argument("--backends", nargs= "+", default= ["unbounded", "memory", "sqlite"], choices= ["unbounded", "memory", "sqlite"])
+parser.add_argument("--port", type= int, default= 8767)
+args = parser.parse_args()
+
+# The backend URL & API key are read when the application modules are imported
+os.environ["BACKEND_BASE_URL"] = f"http://127.0.0.1:{args.port}"
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+# Turns go through the supervisor's handoffs, not the intent router
+os.environ["INTENT_ROUTER_ENABLED"] = "false"
+
+from langchain_core.messages import HumanMessage
+from langgraph.checkpoint.memory import InMemorySaver
+
+import agents.loan_management_agent
+import agents.supervisor_agent
+from graph import build_model, invoke_model
+from services.checkpointers import BoundedMemorySaver, BoundedSqliteSaver
+
+
+def make_checkpointer(backend: str, directory: str):
+    if backend == "unbounded":
+        return InMemorySaver()
+    if backend == "memory":
+        return BoundedMemorySaver(max_threads= args.max_threads, max_checkpoints_per_thread= args.max_checkpoints)
+    return BoundedSqliteSaver.from_path(
+        os.path.join(directory, "checkpoints.sqlite"), max_checkpoints_per_thread= args.max_checkpoints
+    )
+
+
+def run_session(model, index: int) -> None:
+    config = {"configurable": {"thread_id": str(uuid4())}}
+    state: Dict[str, Any] = {
+        "customer": {"customerId": f"SOAK{index:05d}", "customerName": f"Customer {index}"},
+        "validated": True,
+        "messages": [],
+        "validation_retries": 3,
+        "current_retries": 0,
+        "loan_statement_generation": False,
+    }
+    for turn in range(args.turns):
+        state["messages"] = list(state["messages"]) + [HumanMessage(content= f"Part payment question {turn}")]
+        state = invoke_model(model, input_state= state, config= config)
+
+
+def soak(backend: str, directory: str) -> List[float]:
+    checkpointer = make_checkpointer(backend, directory)
+    model = build_model(checkpointer= checkpointer)
+    run_session(model, 0)
+
+    samples = []
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    for index in range(1, args.sessions + 1):
+        run_session(model, index)
+        if index % args.sample_every == 0:
+            gc.collect()
+            samples.append((tracemalloc.get_traced_memory()[0] - baseline) / 2 ** 20)
+    tracemalloc.stop()
+
+    if hasattr(checkpointer, "stats"):
+        print(f"[{backend}] {checkpointer.stats()}")
+    if isinstance(checkpointer, BoundedSqliteSaver):
+        checkpointer.conn.close()
+    return samples
+
+
+def main() -> None:
+    backend = StubBackend(port= args.port, latency= 0).start()
+    agents.supervisor_agent.model = StubChatModel(tool_name= "transfer_to_loan_management_agent", latency= 0)
+    agents.loan_management_agent.model = StubChatModel(
+        tool_name= "simulate_part_payment_impact", tool_args= {"part_payment": 5000}, latency= 0
+    )
+
+    results = {}
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            for name in args.backends:
+                start = time.perf_counter()
+                results[name] = soak(name, directory)
+                print(f"[{name}] {args.sessions} sessions in {time.perf_counter() - start:.1f}s")
+    finally:
+        backend.stop()
+
+    print(f"\nTraced heap growth (MiB) after N sessions of {args.turns} turns")
+    print(f"{'sessions':>8} | " + " | ".join(f"{name:>10}" for name in results))
+    for i in range(len(next(iter(results.values())))):
+        sessions = (i + 1) * args.sample_every
+        print(f"{sessions:>8} | " + " | ".join(f"{samples[i]:>10.2f}" for samples in results.values()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Measures turns/second of the multi-agent graph with N simultaneous sessions, comparing the blocking
+`invoke_model` (sessions served one after another) with `ainvoke_model` (sessions awaited concurrently).
+
+Runs against a local stub backend & stub chat models, so no API keys or services are needed.
+Each turn routes supervisor -> loan_management_agent -> simulate_part_payment_impact, whose result ends the turn.
+
+Usage (from the AgenticChatbot directory):
+    python -m scripts.benchmark_concurrency --sessions 1 8 32 --llm-latency 0.2 --backend-latency 0.05
+"""
+import argparse
+import asyncio
+import os
+import time
+from typing import Any, Dict, List
+from uuid import uuid4
+
+from scripts.benchmark_stubs import StubBackend, StubChatModel
+
+parser = argparse.ArgumentParser(description= __doc__, formatter_class= argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--sessions", type= int, nargs= "+", default= [1, 8, 32], help= "Simultaneous sessions per run")
+parser.add_argument("--llm-latency", type= float, default= 0.2, help= "Seconds per stub LLM call")
+parser.add_argument("--backend-latency", type= float, default= 0.05, help= "Seconds per stub backend request")
+parser.add_argument("--port", type= int, default= 8765)
+args = parser.parse_args()
+
+# The backend URL & API key are read when the application modules are imported
+os.environ["BACKEND_BASE_URL"] = f"http://127.0.0.1:{args.port}"
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+# Turns go through the supervisor's handoffs, not the intent router
+os.environ["INTENT_ROUTER_ENABLED"] = "false"
+
+from langchain_core.messages import HumanMessage
+from langchain_core.runnables import RunnableConfig
+
+import agents.loan_management_agent
+import agents.supervisor_agent
+from graph import build_model, invoke_model, ainvoke_model
+from services import backend_client, llm_registry
+from services.loan_service import clear_loan_statement_cache
+
+
+def session_state(index: int) -> Dict[str, Any]:
+    return {
+        "customer": {"customerId": f"BENCH{index:05d}", "customerName": f"Customer {index}"},
+        "validated": True,
+        "messages": [HumanMessage(content= "What happens if I make a part payment of $5,000?")],
+        "validation_retries": 3,
+        "current_retries": 0,
+        "loan_statement_generation": False,
+    }
+
+
+def session_config() -> RunnableConfig:
+    return RunnableConfig({"configurable": {"thread_id": str(uuid4())}})
+
+
+def run_sync(model, sessions: int) -> float:
+    clear_loan_statement_cache()
+    start = time.perf_counter()
+    for i in range(sessions):
+        invoke_model(model, input_state= session_state(i), config= session_config())
+    return time.perf_counter() - start
+
+
+async def run_async(model, sessions: int) -> float:
+    clear_loan_statement_cache()
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        ainvoke_model(model, input_state= session_state(i), config= session_config())
+        for i in range(sessions)
+    ))
+    return time.perf_counter() - start
+
+
+async def run_async_all(model, session_counts: List[int]) -> List[float]:
+    try:
+        return [await run_async(model, sessions) for sessions in session_counts]
+    finally:
+        await backend_client.close_async_session()
+        await llm_registry.close_async_clients()
+
+
+def main() -> None:
+    backend = StubBackend(port= args.port, latency= args.backend_latency).start()
+
+    agents.supervisor_agent.model = StubChatModel(
+        tool_name= "transfer_to_loan_management_agent", latency= args.llm_latency
+    )
+    agents.loan_management_agent.model = StubChatModel(
+        tool_name= "simulate_part_payment_impact", tool_args= {"part_payment": 5000}, latency= args.llm_latency
+    )
+    model = build_model()
+
+    try:
+        # Warm up imports, pools & graph compilation outside the measurements
+        run_sync(model, 1)
+        asyncio.run(run_async_all(model, [1]))
+
+        sync_times = [run_sync(model, sessions) for sessions in args.sessions]
+        async_times = asyncio.run(run_async_all(model, args.sessions))
+    finally:
+        backend.stop()
+
+    print(f"LLM latency {args.llm_latency}s, backend latency {args.backend_latency}s\n")
+    print(f"{'sessions':>8} | {'sync turns/s':>12} | {'async turns/s':>13} | {'speedup':>7}")
+    print(f"{'-' * 8}-+-{'-' * 12}-+-{'-' * 13}-+-{'-' * 7}")
+    for sessions, sync_time, async_time in zip(args.sessions, sync_times, async_times):
+        sync_rate = sessions / sync_time
+        async_rate = sessions / async_time
+        print(f"{sessions:>8} | {sync_rate:>12.2f} | {async_rate:>13.2f} | {async_rate / sync_rate:>6.1f}x")
+    print(f"\nBackend requests served: {backend.requests}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Times the query embeddings of the RAG retrievers for a stream of repetitive customer questions, uncached & through
+the embedding cache, then again after a restart, when only the memory-mapped store holds the vectors.
+
+The questions are drawn from a small set with a Zipf-like skew & varied case & punctuation. The embedding model is a
+deterministic stub sleeping `--latency` seconds per call, so no API key is needed.
+
+Usage (from the AgenticChatbot directory):
+    python -m scripts.benchmark_embedding_cache --queries 500
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+from typing import List, Tuple
+
+parser = argparse.ArgumentParser(description= __doc__, formatter_class= argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--queries", type= int, default= 500)
+parser.add_argument("--latency", type= float, default= 0.15, help= "Seconds per stub embedding call")
+parser.add_argument("--dimensions", type= int, default= 3072, help= "Size of the vectors, 3072 for text-embedding-3-large")
+args = parser.parse_args()
+
+# The API key is read when the application modules are imported
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from services.embedding_cache import CachedEmbeddings, MemmapEmbeddingStore
+
+MODEL = "text-embedding-3-large"
+
+QUESTIONS = [
+    "How do I change my address?",
+    "What payment modes are accepted?",
+    "How can I update my phone number?",
+    "When is my next EMI due?",
+    "Can I pay my EMI with a credit card?",
+    "How do I update my email address?",
+    "What happens if I miss a payment?",
+    "Is there a fee for late payment?",
+    "How do I set up auto debit?",
+    "Can I change my registered bank account?",
+    "How do I download my payment receipt?",
+    "What documents do I need to update my KYC?",
+    "Can I prepay my loan?",
+    "How long does a payment take to reflect?",
+    "How do I change my nominee?",
+    "Why was my payment declined?",
+    "Can I pay through UPI?",
+    "How do I update my date of birth?",
+    "Where can I see my payment history?",
+    "How do I change my communication preferences?",
+]
+
+
+class SlowFakeEmbedding(DeterministicFakeEmbedding):
+    """
+    Deterministic vectors of the question text, after a network-like delay.
+    """
+
+    def embed_query(self, text: str) -> List[float]:
+        time.sleep(args.latency)
+        return super().embed_query(text)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        await asyncio.sleep(args.latency)
+        return super().embed_query(text)
+
+
+def variant(question: str, rng: random.Random) -> str:
+    return rng.choice([question, question.lower(), question.rstrip("?"), f"  {question} "])
+
+
+def workload() -> List[str]:
+    rng = random.Random(7)
+    weights = [1 / (rank + 1) for rank in range(len(QUESTIONS))]
+    return [variant(rng.choices(QUESTIONS, weights= weights)[0], rng) for _ in range(args.queries)]
+
+
+def time_queries(embed, queries: List[str]) -> List[float]:
+    timings = []
+    for query in queries:
+        start = time.perf_counter()
+        embed(query)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+async def atime_queries(embeddings: CachedEmbeddings, queries: List[str]) -> List[float]:
+    timings = []
+    for query in queries:
+        start = time.perf_counter()
+        await embeddings.aembed_query(query)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main() -> None:
+    model = SlowFakeEmbedding(size= args.dimensions)
+    queries = workload()
+    directory = tempfile.mkdtemp()
+    rows: List[Tuple[str, List[float], int]] = []
+
+    rows.append(("uncached", time_queries(model.embed_query, queries), len(queries)))
+
+    cached = CachedEmbeddings(model, MODEL, store= MemmapEmbeddingStore(directory, MODEL))
+    rows.append(("cached", time_queries(cached.embed_query, queries), cached.metrics["modelCalls"]))
+    cached.store.close()
+
+    # A restart: an empty memory tier over the vectors the previous process stored
+    restarted = CachedEmbeddings(model, MODEL, store= MemmapEmbeddingStore(directory, MODEL))
+    rows.append(("restarted", time_queries(restarted.embed_query, queries), restarted.metrics["modelCalls"]))
+    disk_hits = restarted.metrics["diskHits"]
+
+    restarted.clear()
+    before = restarted.metrics["modelCalls"]
+    rows.append(("async", asyncio.run(atime_queries(restarted, queries)), restarted.metrics["modelCalls"] - before))
+    restarted.store.close()
+
+    print(f"{args.queries} queries over {len(QUESTIONS)} questions, {args.latency * 1000:.0f}ms per embedding call, "
+          f"{args.dimensions} dimensions, {disk_hits} vectors read back from disk after the restart\n")
+    print(f"{'mode':>9} | {'model calls':>11} | {'mean (ms)':>9} | {'p50 (ms)':>8} | {'total (s)':>9}")
+    print(f"{'-' * 9}-+-{'-' * 11}-+-{'-' * 9}-+-{'-' * 8}-+-{'-' * 9}")
+    for name, timings, calls in rows:
+        print(f"{name:>9} | {calls:>11} | {statistics.mean(timings) * 1000:>9.2f} | {statistics.median(timings) * 1000:>8.3f} | {sum(timings):>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
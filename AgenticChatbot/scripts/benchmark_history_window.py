@@ -0,0 +1,168 @@
+"""
+Reports the prompt tokens sent to the agents' LLMs per turn as a conversation grows, with & without the history
+window pre-model hook (last K turns verbatim plus a rolling summary of the older ones).
+
+Runs one conversation through the multi-agent graph per mode. Every turn routes
+supervisor -> loan_statement_agent -> get_loan_statement, which ends the turn, so each turn adds a long loan statement
+to the history. Prompt tokens are counted with `count_tokens_approximately` over the messages each LLM call
+receives, excluding tool schemas. The rolling summary is produced by a stub as well, its input tokens are
+reported separately since they are paid once per summarized turn. The summary is refreshed in the background after
+the model call, so each turn's prompt carries the summary left by the previous one & the turns it does not cover.
+
+Runs against a local stub backend & stub chat models, so no API keys or services are needed.
+
+Usage (from the AgenticChatbot directory):
+    python -m scripts.benchmark_history_window --turns 40 --window-turns 4
+"""
+import argparse
+import asyncio
+import os
+from typing import Any, Dict, List
+
+from scripts.benchmark_stubs import StubBackend, StubChatModel
+
+parser = argparse.ArgumentParser(description= __doc__, formatter_class= argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--turns", type= int, default= 40, help= "User turns in the conversation")
+parser.add_argument("--window-turns", type= int, default= 4, help= "Turns kept verbatim by the hook")
+parser.add_argument("--report-every", type= int, default= 5, help= "Turns between report rows")
+parser.add_argument("--port", type= int, default= 8769)
+args = parser.parse_args()
+
+# The backend URL, API key & window settings are read when the application modules are imported
+os.environ["BACKEND_BASE_URL"] = f"http://127.0.0.1:{args.port}"
+os.environ["HISTORY_WINDOW_TURNS"] = str(args.window_turns)
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+# Turns go through the supervisor's handoffs, not the intent router
+os.environ["INTENT_ROUTER_ENABLED"] = "false"
+
+from langchain_core.messages import BaseMessage, HumanMessage
+from langchain_core.messages.utils import count_tokens_approximately
+from langchain_core.outputs import ChatResult
+from langchain_core.runnables import RunnableLambda
+
+import agents.loan_agent
+import agents.supervisor_agent
+import services.history_window
+from services.background import run_in_background
+import tools.loan_statement_tool
+import utils
+from graph import build_model, invoke_model
+
+STATEMENT_ROWS = 24
+
+# Approximate prompt tokens of every stub LLM call, in call order
+PROMPT_TOKENS: List[int] = []
+
+
+class RecordingChatModel(StubChatModel):
+    """
+    A stub chat model that records the approximate prompt tokens of each call into PROMPT_TOKENS.
+    """
+
+    def _respond(self, messages: List[BaseMessage]) -> ChatResult:
+        PROMPT_TOKENS.append(count_tokens_approximately(messages))
+        return super()._respond(messages)
+
+
+class StubSummarizer:
+    """
+    Stands in for the summary model: keeps one line per summarized user message, capped like a real summary.
+    """
+
+    def __init__(self, max_chars: int = 1200):
+        self.max_chars = max_chars
+        self.input_tokens = 0
+        self.calls = 0
+
+    def __call__(self, summary: str, messages: List[Dict]) -> str:
+        self.calls += 1
+        self.input_tokens += count_tokens_approximately([("user", f"{summary}\n{messages}")])
+        lines = [f"- The customer asked: {message['message'][:80]}" for message in messages if message["role"] == "user"]
+        return "\n".join(filter(None, [summary, *lines]))[-self.max_chars:]
+
+    async def asummarize(self, summary: str, messages: List[Dict]) -> str:
+        return self(summary, messages)
+
+
+def stub_statement(_: Any) -> str:
+    rows = "\n".join(
+        f"| {month:>2} | 2024-{month % 12 + 1:02d}-05 | 1,250.00 | 830.{month:02d} | 419.{month:02d} | {98000 - month * 830:,}.00 |"
+        for month in range(1, STATEMENT_ROWS + 1)
+    )
+    return f"Here is your loan statement.\n\n| # | Date | EMI | Principal | Interest | Balance |\n|---|---|---|---|---|---|\n{rows}"
+
+
+def run_conversation(windowed: bool, summarizer: StubSummarizer) -> List[Dict[str, Any]]:
+    services.history_window.HISTORY_WINDOW_ENABLED = windowed
+    services.history_window.summary_cache.clear()
+    model = build_model()
+
+    config = {"configurable": {"thread_id": f"benchmark-{'windowed' if windowed else 'full'}"}}
+    state: Dict[str, Any] = {
+        "customer": {"customerId": "BENCH00001", "customerName": "Customer"},
+        "validated": True,
+        "messages": [],
+        "validation_retries": 3,
+        "current_retries": 0,
+        "loan_statement_generation": False,
+    }
+
+    rows = []
+    for turn in range(1, args.turns + 1):
+        calls_before = len(PROMPT_TOKENS)
+        summary_before = summarizer.input_tokens
+        state["messages"] = list(state["messages"]) + [HumanMessage(content= f"Show my loan statement again please ({turn})")]
+        state = invoke_model(model, input_state= state, config= config)
+        # The summary is refreshed in the background, waiting for it keeps the turns comparable between runs
+        run_in_background(lambda: asyncio.sleep(0), key= services.history_window.summary_key(config["configurable"]["thread_id"])).result()
+        prompts = PROMPT_TOKENS[calls_before:]
+        rows.append({
+            "turn": turn,
+            "messages": len(state["messages"]),
+            "historyTokens": count_tokens_approximately(state["messages"]),
+            "promptTokens": sum(prompts),
+            "largestPrompt": max(prompts),
+            "summaryTokens": summarizer.input_tokens - summary_before,
+        })
+
+    return rows
+
+
+def main() -> None:
+    backend = StubBackend(port= args.port, latency= 0).start()
+    agents.supervisor_agent.model = RecordingChatModel(tool_name= "transfer_to_loan_statement_agent", latency= 0)
+    agents.loan_agent.model = RecordingChatModel(tool_name= "get_loan_statement", latency= 0)
+    tools.loan_statement_tool.loan_statement_chain = RunnableLambda(stub_statement)
+
+    summarizer = StubSummarizer()
+    utils.arolling_summary_generation = summarizer.asummarize
+
+    try:
+        results = {
+            "full": run_conversation(False, summarizer),
+            "windowed": run_conversation(True, summarizer),
+        }
+    finally:
+        backend.stop()
+
+    full, windowed = results["full"], results["windowed"]
+    print(f"Prompt tokens per turn (all LLM calls of the turn), window of {args.window_turns} turns\n")
+    print(f"{'turn':>4} | {'messages':>8} | {'history':>8} | {'full':>7} | {'windowed':>8} | {'largest full':>12} | {'largest win':>11} | {'summary in':>10}")
+    print(f"{'-' * 4}-+-{'-' * 8}-+-{'-' * 8}-+-{'-' * 7}-+-{'-' * 8}-+-{'-' * 12}-+-{'-' * 11}-+-{'-' * 10}")
+    for before, after in zip(full, windowed):
+        if before["turn"] % args.report_every and before is not full[-1]:
+            continue
+        print(
+            f"{before['turn']:>4} | {after['messages']:>8} | {after['historyTokens']:>8} | {before['promptTokens']:>7} "
+            f"| {after['promptTokens']:>8} | {before['largestPrompt']:>12} | {after['largestPrompt']:>11} | {after['summaryTokens']:>10}"
+        )
+
+    for mode, rows in results.items():
+        prompt_tokens = sum(row["promptTokens"] for row in rows)
+        summary_tokens = sum(row["summaryTokens"] for row in rows)
+        print(f"\n{mode:>8}: {prompt_tokens:,} prompt tokens, {summary_tokens:,} summarizer input tokens over {len(rows)} turns")
+    print(f"Summarizer calls: {summarizer.calls}, summary cache: {len(services.history_window.summary_cache)} entries")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Compares dense, sparse & hybrid retrieval on the fixed policy question set in data/rerank/policy_eval.json, for all
+the questions & for the ones hinging on exact terms (form names, fee & payment mode names). Reports where the first
+relevant passage lands among the candidates handed to the reranker, how many candidates that is & the latency.
+
+The passages are indexed like `BaseVectorStore.update_vector_store` does: a temporary embedded Qdrant collection
+plus its BM25 sparse index keyed by the same point ids. `--embeddings local` embeds them with the hashed n-gram
+embedder, so no API key is needed; `--embeddings openai` uses the application's embedding model.
+
+Usage (from the AgenticChatbot directory):
+    python -m scripts.benchmark_hybrid_retrieval --embeddings openai
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+parser = argparse.ArgumentParser(description= __doc__, formatter_class= argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--eval", default= "data/rerank/policy_eval.json")
+parser.add_argument("--embeddings", choices= ["local", "openai"], default= "local")
+parser.add_argument("--hybrid-k", type= int, default= 10, help= "Candidates after fusion")
+args = parser.parse_args()
+
+# The API keys are read when the application modules are imported
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from langchain_qdrant import QdrantVectorStore
+from qdrant_client import QdrantClient
+from qdrant_client.http.models import Distance, VectorParams
+
+from scripts.benchmark_stubs import LocalEmbeddings
+from services.llm_registry import get_embeddings
+from services.sparse_index import SparseIndex, sparse_index_path
+from tools.query_handlers.retrievers import HybridRetriever, ScoredVectorRetriever
+
+COLLECTION = "HybridEval"
+
+
+class SparseRetriever(BaseRetriever):
+    sparse_index: SparseIndex
+    k: int = 10
+
+    model_config = {"arbitrary_types_allowed": True}
+
+    def _get_relevant_documents(self, query: str, *, run_manager) -> List[Document]:
+        return [doc for doc, _ in self.sparse_index.search(query, k= self.k)]
+
+
+def first_relevant(documents: List[Document], relevant: List[str]) -> Optional[int]:
+    for rank, doc in enumerate(documents):
+        if doc.metadata["passageId"] in relevant:
+            return rank
+    return None
+
+
+def evaluate(retriever: BaseRetriever, questions: List[Dict]) -> Dict:
+    timings, ranks, candidates = [], [], []
+    for question in questions:
+        start = time.perf_counter()
+        documents = retriever.invoke(question["question"])
+        timings.append(time.perf_counter() - start)
+        ranks.append(first_relevant(documents, question["relevant"]))
+        candidates.append(len(documents))
+
+    def quality(subset: List[Optional[int]]) -> Dict:
+        found = [rank for rank in subset if rank is not None]
+        return {
+            "hit@1": sum(rank < 1 for rank in found) / len(subset),
+            "hit@3": sum(rank < 3 for rank in found) / len(subset),
+            "recall": len(found) / len(subset),
+            "mrr": sum(1 / (rank + 1) for rank in found) / len(subset),
+        }
+
+    keyword = [rank for rank, question in zip(ranks, questions) if question.get("keyword")]
+    return {
+        "all": quality(ranks),
+        "keyword": quality(keyword),
+        "candidates": statistics.mean(candidates),
+        "mean": statistics.mean(timings),
+    }
+
+
+async def atime_hybrid(retriever: HybridRetriever, questions: List[Dict]) -> float:
+    start = time.perf_counter()
+    for question in questions:
+        await retriever.ainvoke(question["question"])
+    return (time.perf_counter() - start) / len(questions)
+
+
+def main() -> None:
+    with open(args.eval, encoding= "utf-8") as f:
+        data = json.load(f)
+    questions = data["questions"]
+    embeddings = LocalEmbeddings() if args.embeddings == "local" else get_embeddings()
+
+    persist_directory = os.path.join(tempfile.mkdtemp(), "qdrant", COLLECTION)
+    client = QdrantClient(path= persist_directory)
+    client.create_collection(COLLECTION, vectors_config= VectorParams(size= len(embeddings.embed_query("size")), distance= Distance.COSINE))
+    vector_store = QdrantVectorStore(client= client, collection_name= COLLECTION, embedding= embeddings)
+    chunks = [
+        Document(page_content= passage["text"], metadata= {"passageId": passage["id"], "HashCode": passage["collection"]})
+        for passage in data["passages"]
+    ]
+    sparse_index = SparseIndex(sparse_index_path(persist_directory))
+    sparse_index.add(vector_store.add_documents(chunks), chunks)
+
+    hybrid = HybridRetriever(vector_store= vector_store, sparse_index= sparse_index, k= args.hybrid_k)
+    rows = [
+        ("dense k=20", evaluate(ScoredVectorRetriever(vector_store= vector_store, k= 20), questions)),
+        (f"dense k={args.hybrid_k}", evaluate(ScoredVectorRetriever(vector_store= vector_store, k= args.hybrid_k), questions)),
+        (f"sparse k={args.hybrid_k}", evaluate(SparseRetriever(sparse_index= sparse_index, k= args.hybrid_k), questions)),
+        (f"hybrid k={args.hybrid_k}", evaluate(hybrid, questions)),
+    ]
+    hybrid_async = asyncio.run(atime_hybrid(hybrid, questions))
+    sparse_index.close()
+    client.close()
+
+    keyword_count = sum(1 for question in questions if question.get("keyword"))
+    print(f"{len(questions)} questions ({keyword_count} on exact terms) over {len(data['passages'])} passages, {args.embeddings} embeddings")
+    print(f"Hybrid retrieval takes {hybrid_async * 1000:.2f}ms per question with ainvoke, dense & sparse searched concurrently\n")
+    print(f"{'retrieval':>13} | {'questions':>9} | {'hit@1':>5} | {'hit@3':>5} | {'recall':>6} | {'MRR':>5} | {'candidates':>10} | {'mean (ms)':>9}")
+    print(f"{'-' * 13}-+-{'-' * 9}-+-{'-' * 5}-+-{'-' * 5}-+-{'-' * 6}-+-{'-' * 5}-+-{'-' * 10}-+-{'-' * 9}")
+    for name, row in rows:
+        for subset in ("all", "keyword"):
+            quality = row[subset]
+            print(f"{name:>13} | {subset:>9} | {quality['hit@1']:>5.0%} | {quality['hit@3']:>5.0%} | {quality['recall']:>6.0%} | "
+                  f"{quality['mrr']:>5.2f} | {row['candidates']:>10.1f} | {row['mean'] * 1000:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+Compares saving chat messages per turn with the write-behind message queue, against a local stub backend.
+
+Concurrent sessions each hold a conversation of `--turns` turns, pausing `--think-time` seconds between turns:
+- "direct": every turn awaits add_messages_to_chat, as the app originally did
+- "queued": every turn is stored in the SQLite queue, the flusher sends each chat's backlog in one request
+
+Reports the time a turn spends saving its messages, the requests sent to the backend, and checks that every chat
+received all its messages in order. A queue is then filled without flushing & reopened, like after a restart,
+to check the replay. Finally the backend refuses messages for `--outage` seconds while a queue keeps flushing,
+to check that its retries back off & every message is sent once the backend is back.
+
+Usage (from the AgenticChatbot directory):
+    python -m scripts.benchmark_message_queue --sessions 20 --turns 10
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import statistics
+import tempfile
+import time
+from typing import Dict, List
+
+from scripts.benchmark_stubs import StubBackend
+
+parser = argparse.ArgumentParser(description= __doc__, formatter_class= argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--sessions", type= int, default= 20, help= "Concurrent chats")
+parser.add_argument("--turns", type= int, default= 10, help= "Turns per chat")
+parser.add_argument("--think-time", type= float, default= 0.2, help= "Seconds between the turns of a chat")
+parser.add_argument("--latency", type= float, default= 0.05, help= "Seconds per stub backend request")
+parser.add_argument("--flush-interval", type= float, default= 1.0)
+parser.add_argument("--outage", type= float, default= 20.0, help= "Seconds the backend refuses messages")
+parser.add_argument("--port", type= int, default= 8770)
+args = parser.parse_args()
+
+directory = tempfile.mkdtemp()
+# The backend URL & queue settings are read when the application modules are imported
+os.environ["BACKEND_BASE_URL"] = f"http://127.0.0.1:{args.port}"
+os.environ["MESSAGE_QUEUE_PATH"] = os.path.join(directory, "message_queue.sqlite")
+os.environ["MESSAGE_QUEUE_FLUSH_INTERVAL"] = str(args.flush_interval)
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from services import backend_client
+from services.background import run_in_background
+from services.chat_logic import add_messages_to_chat
+from services.message_queue import MessageQueue, SqliteMessageStore, get_message_queue
+
+
+def turn_messages(turn: int) -> List[Dict[str, str]]:
+    return [{"role": "user", "message": f"question {turn}"}, {"role": "assistant", "message": f"answer {turn}"}]
+
+
+def new_chats(backend: StubBackend) -> List[str]:
+    chat_ids = [f"chat-{i}" for i in range(args.sessions)]
+    backend.chats = {chat_id: {"chatId": chat_id, "messages": []} for chat_id in chat_ids}
+    return chat_ids
+
+
+def in_order(backend: StubBackend, chat_ids: List[str]) -> bool:
+    expected = [message["message"] for turn in range(args.turns) for message in turn_messages(turn)]
+    return all([message["message"] for message in backend.chats[chat_id]["messages"]] == expected for chat_id in chat_ids)
+
+
+async def session(chat_id: str, save, timings: List[float]) -> None:
+    for turn in range(args.turns):
+        await asyncio.sleep(args.think_time)
+        start = time.perf_counter()
+        await save(chat_id, turn_messages(turn))
+        timings.append(time.perf_counter() - start)
+
+
+async def run_direct(chat_ids: List[str]) -> List[float]:
+    timings: List[float] = []
+    await asyncio.gather(*(session(chat_id, add_messages_to_chat, timings) for chat_id in chat_ids))
+    await backend_client.close_async_session()
+    return timings
+
+
+async def run_queued(chat_ids: List[str]) -> List[float]:
+    queue = get_message_queue()
+    timings: List[float] = []
+    await asyncio.gather(*(session(chat_id, queue.aenqueue, timings) for chat_id in chat_ids))
+    await asyncio.wrap_future(queue.flush_in_background())
+    await asyncio.wrap_future(run_in_background(backend_client.close_async_session, retries= 0))
+    return timings
+
+
+async def replay(queue: MessageQueue) -> int:
+    sent = await queue.flush()
+    await backend_client.close_async_session()
+    return sent
+
+
+async def ride_out_outage(backend: StubBackend, queue: MessageQueue) -> Dict[str, float]:
+    backend.unavailable = True
+    start = time.perf_counter()
+    while time.perf_counter() - start < args.outage:
+        await queue.flush()
+        await asyncio.sleep(0.1)
+    backend.unavailable = False
+    failed_requests = queue.metrics["failedRequests"]
+
+    # The next attempt of each chat is due at the end of its backoff
+    recovered = time.perf_counter()
+    while queue.stats()["pending"]:
+        await queue.flush()
+        await asyncio.sleep(0.1)
+    await backend_client.close_async_session()
+    return {"failedRequests": failed_requests, "recovery": time.perf_counter() - recovered}
+
+
+def report(name: str, timings: List[float], requests: int, ordered: bool) -> None:
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(
+        f"{name:>6} | {statistics.mean(timings) * 1000:>9.2f} | {p95 * 1000:>8.2f} | {requests:>8} "
+        f"| {'yes' if ordered else 'NO':>8}"
+    )
+
+
+def main() -> None:
+    backend = StubBackend(port= args.port, latency= args.latency).start()
+    results = []
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            for name, run in (("direct", run_direct), ("queued", run_queued)):
+                chat_ids = new_chats(backend)
+                backend.requests = 0
+                timings = asyncio.run(run(chat_ids))
+                results.append((name, timings, backend.requests, in_order(backend, chat_ids)))
+
+            # Turns stored by a process that stopped before flushing are sent by the next one
+            chat_ids = new_chats(backend)
+            replay_path = os.path.join(directory, "replay.sqlite")
+            stopped = MessageQueue(SqliteMessageStore(replay_path))
+            for turn in range(args.turns):
+                for chat_id in chat_ids:
+                    stopped.enqueue(chat_id, turn_messages(turn))
+            restarted = MessageQueue(SqliteMessageStore(replay_path))
+            pending = restarted.stats()["pending"]
+            replayed = asyncio.run(replay(restarted))
+
+            # Messages queued during a backend outage are kept & sent after it
+            outage_ids = new_chats(backend)
+            outage_queue = MessageQueue(SqliteMessageStore(os.path.join(directory, "outage.sqlite")), flush_interval= args.flush_interval)
+            for turn in range(args.turns):
+                for chat_id in outage_ids:
+                    outage_queue.enqueue(chat_id, turn_messages(turn))
+            outage = asyncio.run(ride_out_outage(backend, outage_queue))
+    finally:
+        backend.stop()
+
+    print(f"{args.sessions} sessions x {args.turns} turns, {args.latency * 1000:.0f}ms backend latency\n")
+    print(f"{'mode':>6} | {'save (ms)':>9} | {'p95 (ms)':>8} | {'requests':>8} | {'in order':>8}")
+    print(f"{'-' * 6}-+-{'-' * 9}-+-{'-' * 8}-+-{'-' * 8}-+-{'-' * 8}")
+    for result in results:
+        report(*result)
+    print(f"\nReplay after restart: {pending} pending, {replayed} sent, in order: {in_order(backend, chat_ids)}")
+    print(
+        f"Backend outage of {args.outage:.0f}s: {outage['failedRequests']} failed requests for {args.sessions} chats, "
+        f"{outage_queue.metrics['dropped']} messages dropped, all sent {outage['recovery']:.1f}s after it ended, "
+        f"in order: {in_order(backend, outage_ids)}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""
+Regression benchmark for the message updates emitted by the handoff & loan statement tools.
+
+Runs one conversation of ~200 messages through the multi-agent graph, twice:
+- "full": the tools return the whole history plus the new message, as they originally did
+- "delta": the tools return only the new messages (the current implementation)
+
+For every turn it records the bytes serialized into the checkpointer, split into pending writes (the node &
+tool updates) and the rest, and the time spent in the add_messages reducers of the graph & its agent subgraphs.
+
+Runs against a local stub backend & stub chat models, so no API keys or services are needed.
+Each turn routes supervisor -> loan_statement_agent -> get_loan_statement, whose result ends the turn.
+
+Usage (from the AgenticChatbot directory):
+    python -m scripts.benchmark_message_updates --messages 200
+"""
+import argparse
+import os
+import time
+from typing import Any, Dict, List, Tuple
+
+from scripts.benchmark_stubs import StubBackend, StubChatModel
+
+parser = argparse.ArgumentParser(description= __doc__, formatter_class= argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--messages", type= int, default= 200, help= "Length of the conversation to build")
+parser.add_argument("--report-every", type= int, default= 5, help= "Turns between report rows")
+parser.add_argument("--port", type= int, default= 8768)
+args = parser.parse_args()
+
+# The backend URL & API key are read when the application modules are imported
+os.environ["BACKEND_BASE_URL"] = f"http://127.0.0.1:{args.port}"
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+# Agents see the whole history, the rolling summary would call the real summary model
+os.environ["HISTORY_WINDOW_ENABLED"] = "false"
+# Turns go through the supervisor's handoffs, not the intent router
+os.environ["INTENT_ROUTER_ENABLED"] = "false"
+
+from langchain_core.messages import HumanMessage
+from langchain_core.runnables import RunnableLambda
+from langchain_core.tools import StructuredTool
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from langgraph.pregel import Pregel
+from langgraph.types import Command
+
+import agents.loan_agent
+import agents.supervisor_agent
+import tools.loan_statement_tool
+from graph import build_model, invoke_model
+
+HANDOFF_TOOLS = [
+    "assign_to_update_agent",
+    "assign_to_query_agent",
+    "assign_to_summary_agent",
+    "assign_to_loan_statement_agent",
+    "assign_to_loan_management_agent",
+]
+
+
+class CountingSerializer(JsonPlusSerializer):
+    """
+    Counts the bytes of everything the checkpointer serializes, i.e. what a persistent backend would write.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.bytes = 0
+
+    def dumps_typed(self, obj: Any) -> Tuple[str, bytes]:
+        dumped = super().dumps_typed(obj)
+        self.bytes += len(dumped[1])
+        return dumped
+
+
+class CountingSaver(InMemorySaver):
+    """
+    Splits the serialized bytes into pending writes (the tool & node updates) and checkpoints (channel snapshots).
+    """
+
+    def __init__(self):
+        self.counter = CountingSerializer()
+        super().__init__(serde= self.counter)
+        self.write_bytes = 0
+
+    def put_writes(self, config, writes, task_id, task_path= ""):
+        before = self.counter.bytes
+        super().put_writes(config, writes, task_id, task_path)
+        self.write_bytes += self.counter.bytes - before
+
+
+class ReducerTimer:
+    def __init__(self):
+        self.seconds = 0.0
+
+    def wrap(self, reducer):
+        def timed(left, right):
+            start = time.perf_counter()
+            try:
+                return reducer(left, right)
+            finally:
+                self.seconds += time.perf_counter() - start
+        return timed
+
+
+def time_message_reducers(graph: Pregel, timer: ReducerTimer) -> None:
+    channel = graph.channels.get("messages")
+    if channel is not None and hasattr(channel, "operator"):
+        channel.operator = timer.wrap(channel.operator)
+
+    for node in graph.nodes.values():
+        if isinstance(node.bound, Pregel):
+            time_message_reducers(node.bound, timer)
+
+
+def full_history_tool(delta_tool: StructuredTool) -> StructuredTool:
+    """
+    Recreates the original behaviour of a tool: its Command carries the whole history plus the new messages.
+    """
+    def with_full_history(**kwargs) -> Command:
+        command = delta_tool.func(**kwargs)
+        history = kwargs["state"]["messages"]
+        seen = {message.id for message in history}
+        new_messages = [message for message in command.update["messages"] if message.id not in seen]
+        return Command(
+            goto= command.goto,
+            graph= command.graph,
+            update= {**command.update, "messages": history + new_messages},
+        )
+
+    return delta_tool.model_copy(update= {"func": with_full_history, "coroutine": None})
+
+
+def run_conversation(mode: str) -> List[Dict[str, Any]]:
+    original_handoffs = {name: getattr(agents.supervisor_agent, name) for name in HANDOFF_TOOLS}
+    original_statement_tool = agents.loan_agent.get_loan_statement
+    if mode == "full":
+        for name, handoff in original_handoffs.items():
+            setattr(agents.supervisor_agent, name, full_history_tool(handoff))
+        agents.loan_agent.get_loan_statement = full_history_tool(original_statement_tool)
+
+    saver = CountingSaver()
+    timer = ReducerTimer()
+    try:
+        model = build_model(checkpointer= saver)
+    finally:
+        for name, handoff in original_handoffs.items():
+            setattr(agents.supervisor_agent, name, handoff)
+        agents.loan_agent.get_loan_statement = original_statement_tool
+    time_message_reducers(model, timer)
+
+    config = {"configurable": {"thread_id": f"benchmark-{mode}"}}
+    state: Dict[str, Any] = {
+        "customer": {"customerId": "BENCH00001", "customerName": "Customer"},
+        "validated": True,
+        "messages": [],
+        "validation_retries": 3,
+        "current_retries": 0,
+        "loan_statement_generation": False,
+    }
+
+    rows = []
+    turn = 0
+    while len(state["messages"]) < args.messages:
+        turn += 1
+        bytes_before, writes_before, reducer_before = saver.counter.bytes, saver.write_bytes, timer.seconds
+        state["messages"] = list(state["messages"]) + [HumanMessage(content= f"Show my loan statement ({turn})")]
+        start = time.perf_counter()
+        state = invoke_model(model, input_state= state, config= config)
+        rows.append({
+            "turn": turn,
+            "messages": len(state["messages"]),
+            "bytes": saver.counter.bytes - bytes_before,
+            "writeBytes": saver.write_bytes - writes_before,
+            "reducerMs": (timer.seconds - reducer_before) * 1000,
+            "turnMs": (time.perf_counter() - start) * 1000,
+        })
+
+    return rows
+
+
+def main() -> None:
+    backend = StubBackend(port= args.port, latency= 0).start()
+    agents.supervisor_agent.model = StubChatModel(tool_name= "transfer_to_loan_statement_agent", latency= 0)
+    agents.loan_agent.model = StubChatModel(tool_name= "get_loan_statement", latency= 0)
+    tools.loan_statement_tool.loan_statement_chain = RunnableLambda(lambda _: "Loan statement for the benchmark customer.")
+
+    try:
+        results = {mode: run_conversation(mode) for mode in ("full", "delta")}
+    finally:
+        backend.stop()
+
+    full, delta = results["full"], results["delta"]
+    print("Per turn: KiB of pending writes / KiB serialized in total / ms in message reducers")
+    print(f"{'turn':>4} | {'messages':>8} | {'full writes':>11} | {'delta writes':>12} | {'full total':>10} | {'delta total':>11} | {'full ms':>7} | {'delta ms':>8}")
+    print(f"{'-' * 4}-+-{'-' * 8}-+-{'-' * 11}-+-{'-' * 12}-+-{'-' * 10}-+-{'-' * 11}-+-{'-' * 7}-+-{'-' * 8}")
+    for before, after in zip(full, delta):
+        if before["turn"] % args.report_every and before is not full[-1]:
+            continue
+        print(
+            f"{before['turn']:>4} | {after['messages']:>8} | {before['writeBytes'] / 1024:>11.1f} | {after['writeBytes'] / 1024:>12.1f} "
+            f"| {before['bytes'] / 1024:>10.1f} | {after['bytes'] / 1024:>11.1f} "
+            f"| {before['reducerMs']:>7.2f} | {after['reducerMs']:>8.2f}"
+        )
+
+    for mode, rows in results.items():
+        write_bytes = sum(row["writeBytes"] for row in rows) / 2 ** 20
+        total_bytes = sum(row["bytes"] for row in rows) / 2 ** 20
+        total_reducer = sum(row["reducerMs"] for row in rows)
+        total_turn = sum(row["turnMs"] for row in rows)
+        print(
+            f"\n{mode:>5}: {write_bytes:.2f} MiB of writes, {total_bytes:.2f} MiB serialized in total, "
+            f"{total_reducer:.0f} ms in reducers, {total_turn:.0f} ms total over {len(rows)} turns"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""
+Times a RAG query handler answering a stream of frequently asked questions with & without the answer cache,
+then replaces a document in the collection's index to show the cached answers being dropped.
+
+Runs against a temporary embedded Qdrant collection. Query embeddings are deterministic fakes, the Cohere reranker
+& the answer model are stubs sleeping `--rerank-latency` & `--llm-latency` seconds, so no API keys are needed.
+
+Usage (from the AgenticChatbot directory):
+    python -m scripts.benchmark_rag_answer_cache --queries 200
+"""
+import argparse
+import asyncio
+import csv
+import os
+import random
+import statistics
+import tempfile
+import time
+from typing import Any, List, Optional, Sequence
+
+parser = argparse.ArgumentParser(description= __doc__, formatter_class= argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--queries", type= int, default= 200)
+parser.add_argument("--chunks", type= int, default= 500, help= "Vectors in the collection")
+parser.add_argument("--rerank-latency", type= float, default= 0.2, help= "Seconds per stub rerank call")
+parser.add_argument("--llm-latency", type= float, default= 0.8, help= "Seconds per stub answer")
+args = parser.parse_args()
+
+DIRECTORY = tempfile.mkdtemp()
+# The API keys & the cache path are read when the application modules are imported
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+os.environ.setdefault("COHERE_API_KEY", "benchmark")
+os.environ["RESPONSE_CACHE_PATH"] = os.path.join(DIRECTORY, "response_cache.sqlite")
+os.environ["EMBEDDING_CACHE_DIR"] = ""
+
+import numpy as np
+from langchain_cohere import CohereRerank
+from langchain_core.callbacks import Callbacks
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
+from qdrant_client import QdrantClient
+from qdrant_client.http.models import Distance, PointStruct, VectorParams
+
+import tools.query_handlers.RAG as rag_module
+import tools.query_handlers.rerankers as rerankers
+from tools.query_handlers.payments_query_handler import payments_prompt
+from tools.query_handlers.rag_service import RAGService
+
+COLLECTION = "Benchmark"
+DIMENSIONS = 256
+
+QUESTIONS = [
+    "What payment modes are accepted?",
+    "Can I pay my EMI with a credit card?",
+    "Is there a fee for late payment?",
+    "How do I set up auto debit?",
+    "How long does a payment take to reflect?",
+    "Can I pay through UPI?",
+    "What happens if I miss a payment?",
+    "How do I download my payment receipt?",
+    "Can I prepay my loan?",
+    "Why was my payment declined?",
+]
+
+model_calls = {"rerank": 0, "answer": 0}
+
+
+class StubRerank(CohereRerank):
+    """
+    Built like the real reranker, keeps the first `top_n` documents after a network-like delay.
+    """
+
+    def compress_documents(self, documents: Sequence[Document], query: str, callbacks: Optional[Callbacks] = None) -> Sequence[Document]:
+        model_calls["rerank"] += 1
+        time.sleep(args.rerank_latency)
+        return list(documents)[:self.top_n]
+
+    async def acompress_documents(self, documents: Sequence[Document], query: str, callbacks: Optional[Callbacks] = None) -> Sequence[Document]:
+        model_calls["rerank"] += 1
+        await asyncio.sleep(args.rerank_latency)
+        return list(documents)[:self.top_n]
+
+
+def stub_chat_model(role: str, **overrides: Any) -> RunnableLambda:
+    def answer(_) -> AIMessage:
+        model_calls["answer"] += 1
+        time.sleep(args.llm_latency)
+        return AIMessage(content= "Payments are accepted by UPI, net banking & auto debit.")
+
+    async def aanswer(_) -> AIMessage:
+        model_calls["answer"] += 1
+        await asyncio.sleep(args.llm_latency)
+        return AIMessage(content= "Payments are accepted by UPI, net banking & auto debit.")
+
+    model = RunnableLambda(answer, afunc= aanswer)
+    model.model_name = "stub"
+    return model
+
+
+def create_collection(path: str) -> None:
+    rng = np.random.default_rng(7)
+    client = QdrantClient(path= path)
+    client.create_collection(COLLECTION, vectors_config= VectorParams(size= DIMENSIONS, distance= Distance.COSINE))
+    vectors = rng.normal(size= (args.chunks, DIMENSIONS)).astype(np.float32)
+    client.upsert(COLLECTION, points= [
+        PointStruct(id= i, vector= vector.tolist(), payload= {"page_content": f"Chunk {i}", "metadata": {}})
+        for i, vector in enumerate(vectors)
+    ])
+    client.close()
+
+
+def write_index(path: str, hash_codes: List[str]) -> None:
+    # The layout `BaseVectorStore.update_vector_store` writes
+    with open(path, "w", newline= "") as f:
+        writer = csv.writer(f)
+        writer.writerow(["HashCode", "Source"])
+        writer.writerows([hash_code, f"docs/Payments/{i}.pdf"] for i, hash_code in enumerate(hash_codes))
+
+
+def workload(rng: random.Random, count: int) -> List[str]:
+    weights = [1 / (rank + 1) for rank in range(len(QUESTIONS))]
+    questions = rng.choices(QUESTIONS, weights= weights, k= count)
+    return [rng.choice([q, q.lower(), q.rstrip("?")]) for q in questions]
+
+
+def run(service: RAGService, queries: List[str]) -> dict:
+    before = dict(model_calls)
+    timings = []
+    for query in queries:
+        start = time.perf_counter()
+        service.invoke(query)
+        timings.append(time.perf_counter() - start)
+    return {
+        "timings": timings,
+        "answers": model_calls["answer"] - before["answer"],
+        "reranks": model_calls["rerank"] - before["rerank"],
+    }
+
+
+def main() -> None:
+    rerankers.CohereRerank = StubRerank
+    rag_module.get_chat_model = stub_chat_model
+    qdrant_path = os.path.join(DIRECTORY, "qdrant")
+    index_path = os.path.join(DIRECTORY, "index.csv")
+    create_collection(qdrant_path)
+    write_index(index_path, ["a1", "b2", "c3"])
+
+    rng = random.Random(7)
+    queries = workload(rng, args.queries)
+    embeddings = DeterministicFakeEmbedding(size= DIMENSIONS)
+    rows = []
+
+    uncached = RAGService(COLLECTION, qdrant_path, payments_prompt, embeddings= embeddings)
+    rows.append(("uncached", run(uncached, queries)))
+    uncached.close()
+
+    cached = RAGService(COLLECTION, qdrant_path, payments_prompt, embeddings= embeddings, index_path= index_path)
+    rows.append(("cached", run(cached, queries)))
+    rows.append(("repeat", run(cached, queries)))
+
+    # A document replaced by `update_vector_store`: the index lists a new hash, every question is answered again once
+    write_index(index_path, ["a1", "b2", "d4"])
+    rows.append(("new docs", run(cached, queries)))
+    stats = cached.rag.answer_cache.stats()
+    cached.close()
+
+    print(f"{args.queries} queries over {len(QUESTIONS)} questions, {args.rerank_latency * 1000:.0f}ms per rerank, "
+          f"{args.llm_latency * 1000:.0f}ms per answer, corpus version {stats['corpusVersion']}\n")
+    print(f"{'mode':>9} | {'answers':>7} | {'reranks':>7} | {'mean (ms)':>9} | {'p50 (ms)':>8} | {'total (s)':>9}")
+    print(f"{'-' * 9}-+-{'-' * 7}-+-{'-' * 7}-+-{'-' * 9}-+-{'-' * 8}-+-{'-' * 9}")
+    for name, row in rows:
+        timings = row["timings"]
+        print(f"{name:>9} | {row['answers']:>7} | {row['reranks']:>7} | {statistics.mean(timings) * 1000:>9.2f} | "
+              f"{statistics.median(timings) * 1000:>8.3f} | {sum(timings):>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
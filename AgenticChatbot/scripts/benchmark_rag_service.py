@@ -0,0 +1,127 @@
+"""
+Compares the per-query latency of the RAG query handlers when every query builds its own pipeline ("cold", as the
+handlers originally did: open the embedded Qdrant store, wrap the vector store, build the RAG & compile its graph,
+then close it all) with the shared, warmed up RAGService ("warm").
+
+Runs against a temporary embedded Qdrant collection of `--chunks` random vectors. Query embeddings are deterministic
+fakes, the Cohere reranker keeps the top documents & the answer model is a stub, so no API keys are needed and
+the timings show the pipeline overhead only.
+
+Usage (from the AgenticChatbot directory):
+    python -m scripts.benchmark_rag_service --chunks 2000 --queries 20
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from typing import Any, List, Optional, Sequence
+
+parser = argparse.ArgumentParser(description= __doc__, formatter_class= argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--chunks", type= int, default= 2000, help= "Vectors in the collection")
+parser.add_argument("--dimensions", type= int, default= 3072, help= "Size of the vectors, 3072 for text-embedding-3-large")
+parser.add_argument("--queries", type= int, default= 20)
+args = parser.parse_args()
+
+# The API keys are read when the application modules are imported
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+os.environ.setdefault("COHERE_API_KEY", "benchmark")
+
+import numpy as np
+from langchain_cohere import CohereRerank
+from langchain_core.callbacks import Callbacks
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
+from qdrant_client import QdrantClient
+from qdrant_client.http.models import Distance, PointStruct, VectorParams
+
+import tools.query_handlers.RAG as rag_module
+import tools.query_handlers.rerankers as rerankers
+from tools.query_handlers.profile_query_handler import profile_prompt
+from tools.query_handlers.rag_service import RAGService
+
+COLLECTION = "Benchmark"
+
+
+class StubRerank(CohereRerank):
+    """
+    Built like the real reranker, but keeps the first `top_n` documents instead of calling Cohere.
+    """
+
+    def compress_documents(self, documents: Sequence[Document], query: str, callbacks: Optional[Callbacks] = None) -> Sequence[Document]:
+        return list(documents)[:self.top_n]
+
+    async def acompress_documents(self, documents: Sequence[Document], query: str, callbacks: Optional[Callbacks] = None) -> Sequence[Document]:
+        return list(documents)[:self.top_n]
+
+
+def stub_chat_model(role: str, **overrides: Any) -> RunnableLambda:
+    return RunnableLambda(lambda _: AIMessage(content= "Stub answer."))
+
+
+def create_collection(path: str) -> None:
+    rng = np.random.default_rng(7)
+    client = QdrantClient(path= path)
+    client.create_collection(COLLECTION, vectors_config= VectorParams(size= args.dimensions, distance= Distance.COSINE))
+    for start in range(0, args.chunks, 500):
+        vectors = rng.normal(size= (min(500, args.chunks - start), args.dimensions)).astype(np.float32)
+        client.upsert(COLLECTION, points= [
+            PointStruct(id= start + i, vector= vector.tolist(), payload= {"page_content": f"Chunk {start + i}", "metadata": {}})
+            for i, vector in enumerate(vectors)
+        ])
+    client.close()
+
+
+def new_service(path: str) -> RAGService:
+    return RAGService(COLLECTION, path, profile_prompt, embeddings= DeterministicFakeEmbedding(size= args.dimensions))
+
+
+def time_queries(run) -> List[float]:
+    timings = []
+    for i in range(args.queries):
+        start = time.perf_counter()
+        run(f"What does my profile say about item {i}?")
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main() -> None:
+    rerankers.CohereRerank = StubRerank
+    rag_module.get_chat_model = stub_chat_model
+    path = os.path.join(tempfile.mkdtemp(), "qdrant")
+    create_collection(path)
+
+    def cold(query: str) -> None:
+        service = new_service(path)
+        service.invoke(query)
+        service.close()
+
+    # The embedded store admits one client at a time, so the cold queries run before the shared service opens it
+    rows = [("cold", time_queries(cold))]
+    warm_service = new_service(path)
+    warm_up = warm_service.warm_up()
+    rows.append(("warm", time_queries(warm_service.invoke)))
+
+    async def run_async() -> List[float]:
+        timings = []
+        for i in range(args.queries):
+            start = time.perf_counter()
+            await warm_service.ainvoke(f"What does my profile say about item {i}?")
+            timings.append(time.perf_counter() - start)
+        return timings
+
+    rows.append(("warm async", asyncio.run(run_async())))
+    warm_service.close()
+
+    print(f"{args.chunks} chunks of {args.dimensions} dimensions, {args.queries} queries, warm-up took {warm_up * 1000:.0f}ms\n")
+    print(f"{'mode':>10} | {'mean (ms)':>9} | {'p50 (ms)':>8} | {'max (ms)':>8}")
+    print(f"{'-' * 10}-+-{'-' * 9}-+-{'-' * 8}-+-{'-' * 8}")
+    for name, timings in rows:
+        print(f"{name:>10} | {statistics.mean(timings) * 1000:>9.1f} | {statistics.median(timings) * 1000:>8.1f} | {max(timings) * 1000:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Compares the rerankers of the RAG pipelines on retrieval quality & latency over the fixed policy question set
+in data/rerank/policy_eval.json: every question's vector search candidates are reranked by each reranker & the
+kept documents are checked against the passages labelled relevant.
+
+The passages are indexed into a temporary embedded Qdrant collection. `--embeddings local` embeds them with the
+hashed n-gram embedder, so no API key is needed; `--embeddings openai` uses the application's embedding model.
+The Cohere reranker needs COHERE_API_KEY & the cross encoder needs the sentence-transformers package, a reranker
+that cannot run is reported as unavailable.
+
+Usage (from the AgenticChatbot directory):
+    python -m scripts.benchmark_rerankers --rerankers none,lexical,cross_encoder,cohere --skip-margin 0.05
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+parser = argparse.ArgumentParser(description= __doc__, formatter_class= argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--eval", default= "data/rerank/policy_eval.json")
+parser.add_argument("--rerankers", default= "none,lexical,cross_encoder,cohere", help= "Comma separated names of RERANKERS")
+parser.add_argument("--embeddings", choices= ["local", "openai"], default= "local")
+parser.add_argument("--top-k", type= int, default= 20, help= "Candidates of the vector search")
+parser.add_argument("--top-n", type= int, default= 3, help= "Documents kept by the reranker")
+parser.add_argument("--skip-margin", type= float, default= None, help= "Also runs every reranker skipping decisive vector rankings")
+args = parser.parse_args()
+
+# The API keys are read when the application modules are imported
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_qdrant import QdrantVectorStore
+from qdrant_client import QdrantClient
+from qdrant_client.http.models import Distance, VectorParams
+
+from scripts.benchmark_stubs import LocalEmbeddings
+from services.llm_registry import get_embeddings
+from tools.query_handlers.rerankers import DecisiveScoreSkip, get_reranker
+from tools.query_handlers.retrievers import ScoredVectorRetriever
+
+COLLECTION = "RerankEval"
+
+
+def build_retriever(passages: List[Dict], embeddings: Embeddings) -> ScoredVectorRetriever:
+    client = QdrantClient(path= os.path.join(tempfile.mkdtemp(), "qdrant"))
+    client.create_collection(COLLECTION, vectors_config= VectorParams(size= len(embeddings.embed_query("size")), distance= Distance.COSINE))
+    vector_store = QdrantVectorStore(client= client, collection_name= COLLECTION, embedding= embeddings)
+    vector_store.add_texts(
+        [passage["text"] for passage in passages],
+        metadatas= [{"passageId": passage["id"], "collection": passage["collection"]} for passage in passages],
+    )
+    return ScoredVectorRetriever(vector_store= vector_store, k= args.top_k)
+
+
+def first_relevant(documents: List[Document], relevant: List[str]) -> Optional[int]:
+    for rank, doc in enumerate(documents):
+        if doc.metadata["passageId"] in relevant:
+            return rank
+    return None
+
+
+def evaluate(name: str, reranker, questions: List[Dict], candidates: List[List[Document]]) -> Dict:
+    timings, ranks = [], []
+    for question, documents in zip(questions, candidates):
+        start = time.perf_counter()
+        kept = list(reranker.compress_documents(documents, question["question"]))
+        timings.append(time.perf_counter() - start)
+        ranks.append(first_relevant(kept, question["relevant"]))
+
+    found = [rank for rank in ranks if rank is not None]
+    row = {
+        "name": name,
+        "hitRate": len(found) / len(ranks),
+        "mrr": sum(1 / (rank + 1) for rank in found) / len(ranks),
+        "mean": statistics.mean(timings),
+        "p95": sorted(timings)[int(0.95 * (len(timings) - 1))],
+    }
+    if isinstance(reranker, DecisiveScoreSkip):
+        row["skipped"] = reranker.metrics["skipped"]
+    return row
+
+
+def main() -> None:
+    with open(args.eval, encoding= "utf-8") as f:
+        data = json.load(f)
+    questions = data["questions"]
+    embeddings = LocalEmbeddings() if args.embeddings == "local" else get_embeddings()
+    retriever = build_retriever(data["passages"], embeddings)
+
+    # Every reranker reranks the same candidates
+    retrieval_timings, candidates = [], []
+    for question in questions:
+        start = time.perf_counter()
+        candidates.append(retriever.invoke(question["question"]))
+        retrieval_timings.append(time.perf_counter() - start)
+    candidate_ranks = [first_relevant(docs, q["relevant"]) for q, docs in zip(questions, candidates)]
+    candidate_recall = sum(rank is not None for rank in candidate_ranks) / len(questions)
+
+    rows, unavailable = [], []
+    for name in args.rerankers.split(","):
+        margins = [None] if args.skip_margin is None or name == "none" else [None, args.skip_margin]
+        for margin in margins:
+            label = name if margin is None else f"{name}+skip"
+            try:
+                reranker = get_reranker(name, top_n= args.top_n, skip_margin= margin)
+                rows.append(evaluate(label, reranker, questions, candidates))
+            except Exception as e:
+                unavailable.append((label, f"{type(e).__name__}: {str(e).splitlines()[0] if str(e) else ''}"))
+
+    print(f"{len(questions)} questions over {len(data['passages'])} passages, {args.embeddings} embeddings, "
+          f"top {args.top_k} candidates reranked to {args.top_n}")
+    print(f"Vector search: {statistics.mean(retrieval_timings) * 1000:.1f}ms mean, "
+          f"a relevant passage in the candidates for {candidate_recall:.0%} of the questions\n")
+    print(f"{'reranker':>19} | {f'hit@{args.top_n}':>6} | {'MRR':>5} | {'mean (ms)':>9} | {'p95 (ms)':>8} | {'skipped':>7}")
+    print(f"{'-' * 19}-+-{'-' * 6}-+-{'-' * 5}-+-{'-' * 9}-+-{'-' * 8}-+-{'-' * 7}")
+    for row in rows:
+        skipped = str(row["skipped"]) if "skipped" in row else "-"
+        print(f"{row['name']:>19} | {row['hitRate']:>6.0%} | {row['mrr']:>5.2f} | {row['mean'] * 1000:>9.2f} | {row['p95'] * 1000:>8.2f} | {skipped:>7}")
+    for label, reason in unavailable:
+        print(f"{label:>19} | unavailable, {reason}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Replays a synthetic log of helper LLM calls through the response caches and reports their hit rates & the model calls
+avoided. The log mimics production traffic: sessions open with a few common first prompts (varying in case &
+punctuation), assistant replies are re-spoken by the IVR, chats are summarised again while unchanged, and loan
+answers are phrased for the same figures whenever a customer repeats a question.
+
+The chains are replaced with stubs counting their calls, the caches use a temporary SQLite file.
+
+Usage (from the AgenticChatbot directory):
+    python -m scripts.benchmark_response_cache --sessions 500
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from collections import Counter
+
+parser = argparse.ArgumentParser(description= __doc__, formatter_class= argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--sessions", type= int, default= 500, help= "Sessions replayed")
+parser.add_argument("--customers", type= int, default= 60, help= "Distinct customers, i.e. distinct loans & chats")
+parser.add_argument("--llm-latency", type= float, default= 0.0, help= "Seconds per stub LLM call")
+parser.add_argument("--seed", type= int, default= 7)
+args = parser.parse_args()
+
+directory = tempfile.mkdtemp()
+# The cache settings & API key are read when the application modules are imported
+os.environ["RESPONSE_CACHE_PATH"] = os.path.join(directory, "response_cache.sqlite")
+os.environ["LOAN_TOOLS_LLM_PHRASING"] = "true"
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from langchain_core.runnables import RunnableLambda
+
+import tools.loan_management_tools
+import utils
+from services.response_cache import response_cache_stats
+
+FIRST_PROMPTS = [
+    "show my loan statement",
+    "what is my outstanding balance",
+    "update my email",
+    "how much to close my loan",
+    "what did I do last week",
+    "what documents are needed for kyc",
+    "part payment of 50000",
+]
+REPLIES = [
+    "Your outstanding balance is $84,200.00 with 71 EMIs remaining.",
+    "Your email address has been updated successfully.",
+    "Here is your loan statement.",
+    "Payment reminders have been turned on.",
+]
+
+calls = Counter()
+
+
+def stub(name: str, response: str):
+    def call(_):
+        calls[name] += 1
+        time.sleep(args.llm_latency)
+        return response
+    return RunnableLambda(call)
+
+
+def vary(prompt: str, rng: random.Random) -> str:
+    return rng.choice([prompt, prompt.capitalize(), f"{prompt}?", f"{prompt.capitalize()} please"])
+
+
+def main() -> None:
+    rng = random.Random(args.seed)
+    utils.title_chain = stub("title", "Loan Assistance")
+    utils.ivr_chain = stub("ivr", "Short IVR message.")
+    utils.summary_chain = stub("summary", "The customer checked their loan.")
+    tools.loan_management_tools.financial_calculator_chain = lambda instruction: stub("financial_calculator", "Phrased answer.")
+
+    requested = Counter()
+    start = time.perf_counter()
+    for _ in range(args.sessions):
+        customer = rng.randrange(args.customers)
+        # Popular openers dominate, like in the chat logs
+        prompt = FIRST_PROMPTS[min(int(rng.expovariate(0.6)), len(FIRST_PROMPTS) - 1)]
+        utils.chat_title_generation(vary(prompt, rng))
+        requested["title"] += 1
+
+        for _ in range(rng.randint(1, 3)):
+            utils.ivr_message_generation(rng.choice(REPLIES))
+            requested["ivr"] += 1
+
+        balance = 100000 - customer * 750
+        tools.loan_management_tools.phrase_result(
+            f"Your outstanding balance is ${balance:,.2f}.", {"outstandingBalance": balance, "customerIndex": customer}
+        )
+        requested["financial_calculator"] += 1
+
+        # The summary agent summarises the customer's recent chats, most of them unchanged since the last request
+        chat = [{"role": "user", "message": f"Chat {customer}-{rng.randrange(3)}"}]
+        utils.chat_summary_generation(chat)
+        requested["summary"] += 1
+    elapsed = time.perf_counter() - start
+
+    stats = response_cache_stats()
+    print(f"{args.sessions} sessions, {args.customers} customers, replayed in {elapsed:.2f}s\n")
+    print(f"{'helper':>20} | {'requests':>8} | {'LLM calls':>9} | {'memory':>6} | {'disk':>4} | {'similar':>7} | {'hit rate':>8}")
+    print(f"{'-' * 20}-+-{'-' * 8}-+-{'-' * 9}-+-{'-' * 6}-+-{'-' * 4}-+-{'-' * 7}-+-{'-' * 8}")
+    for name, count in requested.items():
+        cache = stats[name]
+        print(
+            f"{name:>20} | {count:>8} | {calls[name]:>9} | {cache['memoryHits']:>6} | {cache['diskHits']:>4} "
+            f"| {cache['similarHits']:>7} | {cache['hitRate']:>8.1%}"
+        )
+    total, made = sum(requested.values()), sum(calls.values())
+    print(f"\n{total - made} of {total} helper LLM calls avoided ({(total - made) / total:.1%})")
+
+
+if __name__ == "__main__":
+    main()
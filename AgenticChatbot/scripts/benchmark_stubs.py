@@ -0,0 +1,242 @@
+"""
+Local stand-ins for the backend API & the chat models, used by the benchmark scripts.
+Nothing here is imported by the application.
+"""
+import asyncio
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+from uuid import uuid4
+
+from aiohttp import web
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from services.text_embedding import HashedNgramEmbedder
+
+
+def loan_statement_payload(customer_id: str, payments: int = 12) -> Dict[str, Any]:
+    principal = 500000.0
+    rate = 7.5
+    emi = 10018.97
+    start = datetime(2024, 1, 1, tzinfo= timezone.utc)
+
+    history = []
+    for i in range(payments):
+        interest = principal * rate / 1200
+        principal_paid = emi - interest
+        history.append({
+            "paymentDate": (start + timedelta(days= 30 * i)).isoformat(),
+            "paymentAmount": emi,
+            "interestPaid": round(interest, 2),
+            "principalPaid": round(principal_paid, 2),
+            "previousPrincipal": round(principal, 2),
+            "currentPrincipal": round(principal - principal_paid, 2),
+            "paymentMode": "UPI",
+            "transactionId": f"TXN{i:04d}",
+        })
+        principal -= principal_paid
+
+    return {
+        "success": True,
+        "statusCode": 200,
+        "errors": None,
+        "customerId": customer_id,
+        "loanAccountNumber": f"LN-{customer_id}",
+        "loanSummary": {
+            "loanAmount": 500000,
+            "interestRate": rate,
+            "tenureMonths": 60,
+            "emiAmount": emi,
+            "startDate": start.isoformat(),
+            "status": "Active",
+        },
+        "paymentHistory": history,
+    }
+
+
+class StubBackend:
+    """
+    Serves the backend endpoints used by the chatbot from memory on a background thread.
+    Every response is delayed by `latency` seconds to mimic the network & database round trip.
+    While `unavailable` is set, adding messages answers 503 like a backend outage.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8765, latency: float = 0.05):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.requests = 0
+        self.unavailable = False
+        self.chats: Dict[str, Dict[str, Any]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._runner: Optional[web.AppRunner] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def _delay(self) -> None:
+        self.requests += 1
+        await asyncio.sleep(self.latency)
+
+    async def loan_statement(self, request: web.Request) -> web.Response:
+        await self._delay()
+        return web.json_response(loan_statement_payload(request.headers.get("customerId", "")))
+
+    async def chats_for_customer(self, request: web.Request) -> web.Response:
+        await self._delay()
+        customer_id = request.headers.get("customerId")
+        created_after = request.headers.get("createdAfter")
+        chats = [
+            {
+                **{key: chat[key] for key in ("chatId", "chatTitle", "createdAt")},
+                "messageCount": len(chat["messages"]),
+                "lastMessageAt": chat["messages"][-1].get("timestamp") if chat["messages"] else None,
+            }
+            for chat in self.chats.values()
+            if chat["customerId"] == customer_id
+            and (created_after is None or datetime.fromisoformat(chat["createdAt"]) > datetime.fromisoformat(created_after))
+        ]
+        return web.json_response({"success": True, "chats": chats})
+
+    async def chat_by_id(self, request: web.Request) -> web.Response:
+        await self._delay()
+        chat = self.chats.get(request.match_info["chatId"])
+        if chat is None:
+            return web.json_response({"success": False, "errors": ["Chat not found"]}, status= 404)
+        messages = chat["messages"]
+        if "take" in request.query:
+            take = int(request.query["take"])
+            skip = int(request.query["skip"]) if "skip" in request.query else max(0, len(messages) - take)
+            chat = {**chat, "messages": messages[skip:skip + take]}
+        return web.json_response({"success": True, "chat": chat, "messageCount": len(messages)})
+
+    async def create_chat(self, request: web.Request) -> web.Response:
+        await self._delay()
+        # Like the API, the customer & title are sent as headers
+        chat_id = uuid4().hex
+        self.chats[chat_id] = {
+            "chatId": chat_id,
+            "customerId": request.headers.get("customerId"),
+            "chatTitle": request.headers.get("chatTitle", ""),
+            "createdAt": datetime.now(timezone.utc).isoformat(),
+            "summary": "",
+            "messages": [],
+        }
+        return web.json_response({"success": True, "chatId": chat_id}, status= 201)
+
+    async def add_messages(self, request: web.Request) -> web.Response:
+        await self._delay()
+        if self.unavailable:
+            return web.json_response({"success": False, "errors": ["Service unavailable"]}, status= 503)
+        body = await request.json()
+        chat = self.chats.get(body.get("chatId"))
+        if chat is None:
+            return web.json_response({"success": False, "errors": ["Chat not found"]}, status= 404)
+        chat["messages"].extend(body.get("messages", []))
+        return web.json_response({"success": True}, status= 201)
+
+    async def set_summary(self, request: web.Request) -> web.Response:
+        await self._delay()
+        body = await request.json()
+        chat = self.chats.get(body.get("chatId"))
+        if chat is not None:
+            chat["summary"] = body.get("summary", "")
+        return web.json_response({"success": True}, status= 201)
+
+    async def set_title(self, request: web.Request) -> web.Response:
+        await self._delay()
+        body = await request.json()
+        chat = self.chats.get(body.get("chatId"))
+        if chat is None:
+            return web.json_response({"success": False, "errors": ["ChatId could not be found"]}, status= 400)
+        chat["chatTitle"] = body.get("chatTitle", "")
+        return web.json_response({"success": True, "chat": chat}, status= 201)
+
+    def start(self) -> "StubBackend":
+        app = web.Application()
+        app.router.add_get("/api/LoanStatement", self.loan_statement)
+        app.router.add_get("/api/Chat/GetChatsForCustomer", self.chats_for_customer)
+        app.router.add_post("/api/Chat/CreateChat", self.create_chat)
+        app.router.add_post("/api/Chat/AddMesssages", self.add_messages)
+        app.router.add_post("/api/Chat/SetChatSummary", self.set_summary)
+        app.router.add_post("/api/Chat/SetChatTitle", self.set_title)
+        app.router.add_get("/api/Chat/{chatId}", self.chat_by_id)
+
+        self._loop = asyncio.new_event_loop()
+        self._runner = web.AppRunner(app, access_log= None)
+        self._loop.run_until_complete(self._runner.setup())
+        self._loop.run_until_complete(web.TCPSite(self._runner, self.host, self.port).start())
+        threading.Thread(target= self._loop.run_forever, daemon= True).start()
+        return self
+
+    def stop(self) -> None:
+        if self._loop is None or self._runner is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+
+class StubChatModel(BaseChatModel):
+    """
+    A chat model that calls `tool_name` once per user turn and answers with plain text afterwards.
+    Each call sleeps for `latency` seconds, blocking in `invoke` & yielding in `ainvoke`, like a real LLM request.
+    """
+
+    tool_name: Optional[str] = None
+    tool_args: Dict[str, Any] = {}
+    reply: str = "Here is the information you requested."
+    latency: float = 0.2
+
+    @property
+    def _llm_type(self) -> str:
+        return "stub-chat-model"
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "StubChatModel":
+        return self
+
+    def _respond(self, messages: List[BaseMessage]) -> ChatResult:
+        called = False
+        for message in reversed(messages):
+            if isinstance(message, HumanMessage):
+                break
+            if isinstance(message, ToolMessage) and message.name == self.tool_name:
+                called = True
+                break
+
+        if self.tool_name and not called:
+            message = AIMessage(
+                content= "",
+                tool_calls= [{"name": self.tool_name, "args": dict(self.tool_args), "id": f"call_{uuid4().hex[:12]}"}],
+            )
+        else:
+            message = AIMessage(content= self.reply)
+
+        return ChatResult(generations= [ChatGeneration(message= message)])
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        time.sleep(self.latency)
+        return self._respond(messages)
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        await asyncio.sleep(self.latency)
+        return self._respond(messages)
+
+
+class LocalEmbeddings(Embeddings):
+    """
+    The hashed n-gram embedder of the intent router, a local stand-in for the embedding model.
+    """
+
+    def __init__(self, dimensions: int = 1024):
+        self.embedder = HashedNgramEmbedder(dimensions= dimensions)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self.embedder.embed(text).tolist() for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embedder.embed(text).tolist()
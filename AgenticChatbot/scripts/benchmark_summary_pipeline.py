@@ -0,0 +1,121 @@
+"""
+Times the summary agent's `setup_summary_cache` tool for a customer with many chats this week, none summarised yet.
+
+Every chat is fetched from a local stub backend & summarised by a stub summary chain sleeping `--llm-latency`
+seconds, so the run shows how the pipeline overlaps the chats. It runs once with a concurrency of 1, i.e. one chat
+after another, and once with SUMMARY_MAX_CONCURRENCY, for both the sync tool & its async implementation.
+
+Usage (from the AgenticChatbot directory):
+    python -m scripts.benchmark_summary_pipeline --chats 20
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import time
+from datetime import datetime, timedelta, timezone
+
+from scripts.benchmark_stubs import StubBackend
+
+parser = argparse.ArgumentParser(description= __doc__, formatter_class= argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--chats", type= int, default= 20, help= "Chats of the customer this week")
+parser.add_argument("--latency", type= float, default= 0.05, help= "Seconds per stub backend request")
+parser.add_argument("--llm-latency", type= float, default= 0.5, help= "Seconds per stub summary")
+parser.add_argument("--port", type= int, default= 8771)
+args = parser.parse_args()
+
+# The backend URL & API key are read when the application modules are imported
+os.environ["BACKEND_BASE_URL"] = f"http://127.0.0.1:{args.port}"
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+# Every run must summarise, not reuse the previous run's summaries
+os.environ["RESPONSE_CACHE_ENABLED"] = "false"
+os.environ["SUMMARY_CACHE_PATH"] = ""
+
+from langchain_core.runnables import RunnableLambda
+
+import agents.summary_agent as summary_agent
+import utils
+from services import backend_client
+from services.background import run_in_background
+
+CUSTOMER_ID = "benchmark-customer"
+
+
+def stub_summary(_) -> str:
+    time.sleep(args.llm_latency)
+    return "The customer checked their loan."
+
+
+async def astub_summary(_) -> str:
+    await asyncio.sleep(args.llm_latency)
+    return "The customer checked their loan."
+
+
+def reset(backend: StubBackend) -> None:
+    now = datetime.now(timezone.utc)
+    backend.chats = {
+        f"chat-{i}": {
+            "chatId": f"chat-{i}",
+            "customerId": CUSTOMER_ID,
+            "chatTitle": f"Chat {i}",
+            "createdAt": (now - timedelta(hours= i)).isoformat(),
+            "summary": "",
+            "messages": [{"role": "user", "message": f"question {i}"}, {"role": "assistant", "message": f"answer {i}"}],
+        }
+        for i in range(args.chats)
+    }
+    summary_agent.summary_cache.clear()
+
+
+def wait_for_saved_summaries(backend: StubBackend, timeout: float = 10) -> int:
+    """
+    Waits for the background writes of the generated summaries, returns the number saved.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        saved = sum(1 for chat in backend.chats.values() if chat["summary"])
+        if saved == len(backend.chats) or time.monotonic() > deadline:
+            return saved
+        time.sleep(0.05)
+
+
+async def run_async(state) -> int:
+    chats = await summary_agent.asetup_summary_cache(state)
+    await backend_client.close_async_session()
+    return len(chats)
+
+
+def main() -> None:
+    utils.summary_chain = RunnableLambda(stub_summary, afunc= astub_summary)
+    state = {"customer": {"customerId": CUSTOMER_ID}}
+    backend = StubBackend(port= args.port, latency= args.latency).start()
+
+    rows = []
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            for concurrency in (1, summary_agent.SUMMARY_MAX_CONCURRENCY):
+                summary_agent.SUMMARY_MAX_CONCURRENCY = concurrency
+                for mode in ("sync", "async"):
+                    reset(backend)
+                    start = time.perf_counter()
+                    if mode == "sync":
+                        count = len(summary_agent.setup_summary_cache.func(state))
+                    else:
+                        count = asyncio.run(run_async(state))
+                    elapsed = time.perf_counter() - start
+                    # The summaries are written back in the background, after the tool returned
+                    rows.append((mode, concurrency, count, elapsed, wait_for_saved_summaries(backend)))
+    finally:
+        run_in_background(backend_client.close_async_session, retries= 0).result()
+        backend.stop()
+
+    print(f"{args.chats} chats, {args.latency * 1000:.0f}ms backend latency, {args.llm_latency * 1000:.0f}ms per summary\n")
+    print(f"{'mode':>5} | {'concurrency':>11} | {'chats':>5} | {'time (s)':>8} | {'summaries saved':>15}")
+    print(f"{'-' * 5}-+-{'-' * 11}-+-{'-' * 5}-+-{'-' * 8}-+-{'-' * 15}")
+    for mode, concurrency, count, elapsed, saved in rows:
+        print(f"{mode:>5} | {concurrency:>11} | {count:>5} | {elapsed:>8.2f} | {saved:>15}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Evaluates the intent router on a labelled utterance set (JSON lines with "text" & "label").
+
+A turn the router sends straight to an agent skips the supervisor's routing call (one gpt-4o round trip).
+A turn it sends to the wrong agent costs a wasted agent run, a turn it defers is routed by the supervisor as before.
+The latency saved is estimated from --supervisor-latency, the measured classification time is subtracted.
+
+Usage (from the AgenticChatbot directory):
+    python -m scripts.evaluate_intent_router --supervisor-latency 1.5
+"""
+import argparse
+import json
+import os
+import time
+from collections import Counter, defaultdict
+
+from agents.intent_router import INTENT_ROUTER_UTTERANCES, SUPERVISOR, IntentRouter
+
+parser = argparse.ArgumentParser(description= __doc__, formatter_class= argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--utterances", default= os.path.join("data", "intents", "eval.jsonl"), help= "Labelled evaluation set")
+parser.add_argument("--train", default= INTENT_ROUTER_UTTERANCES, help= "Labelled utterances the router is built from")
+parser.add_argument("--supervisor-latency", type= float, default= 1.5, help= "Seconds of one supervisor routing call")
+parser.add_argument("--min-similarity", type= float, default= None)
+parser.add_argument("--min-margin", type= float, default= None)
+parser.add_argument("--verbose", action= "store_true", help= "Print every misrouted or deferred utterance")
+args = parser.parse_args()
+
+
+def main() -> None:
+    thresholds = {
+        key: value for key, value in {"min_similarity": args.min_similarity, "min_margin": args.min_margin}.items()
+        if value is not None
+    }
+    start = time.perf_counter()
+    router = IntentRouter.from_file(args.train, **thresholds)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    with open(args.utterances, "r", encoding= "utf-8") as file:
+        samples = [json.loads(line) for line in file if line.strip()]
+
+    per_label = defaultdict(Counter)
+    sources = Counter()
+    correct = routed = routed_correct = misrouted = deferred_routable = 0
+    classify_seconds = 0.0
+
+    for sample in samples:
+        start = time.perf_counter()
+        decision = router.route(sample["text"])
+        classify_seconds += time.perf_counter() - start
+
+        label = sample["label"]
+        sources[decision.source] += 1
+        per_label[label]["total"] += 1
+        if decision.agent == label:
+            correct += 1
+            per_label[label]["correct"] += 1
+
+        if decision.confident:
+            routed += 1
+            if decision.agent == label:
+                routed_correct += 1
+            else:
+                misrouted += 1
+                if args.verbose:
+                    print(f"[MISROUTED] {sample['text']!r}: {label} -> {decision.agent} ({decision.source}, {decision.confidence:.2f})")
+        elif label != SUPERVISOR:
+            deferred_routable += 1
+            if args.verbose:
+                print(f"[DEFERRED] {sample['text']!r}: {label} ({decision.confidence:.2f})")
+
+    total = len(samples)
+    routable = total - per_label[SUPERVISOR]["total"]
+    classify_ms = classify_seconds / total * 1000
+    saved = routed_correct * args.supervisor_latency - classify_seconds
+
+    print(f"Router built in {build_ms:.1f} ms, {total} labelled utterances ({routable} for an agent)\n")
+    print(f"{'label':>22} | {'accuracy':>8}")
+    print(f"{'-' * 22}-+-{'-' * 8}")
+    for label, counts in sorted(per_label.items()):
+        print(f"{label:>22} | {counts['correct'] / counts['total']:>8.0%}")
+
+    print(f"\nAccuracy (deferring to the supervisor counts as correct only for '{SUPERVISOR}' labels): {correct / total:.1%}")
+    print(f"Routed directly: {routed}/{total}, precision {routed_correct / max(routed, 1):.1%}, {misrouted} misrouted")
+    print(f"Agent turns deferred to the supervisor: {deferred_routable}/{routable}")
+    print(f"Decisions by source: {dict(sources)}")
+    print(f"Classification: {classify_ms:.3f} ms per utterance")
+    print(
+        f"Estimated latency saved: {saved:.1f}s over {total} turns "
+        f"({saved / total * 1000:.0f} ms per turn at {args.supervisor_latency}s per supervisor routing call)"
+    )
+
+
+if __name__ == "__main__":
+    main()
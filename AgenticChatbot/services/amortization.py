@@ -0,0 +1,304 @@
+import numpy as np
+import pandas as pd
+from typing import Optional, Sequence, Union
+
+from models.loan import (
+    LoanSummary,
+    LoanPayment,
+    LoanClosureQuote,
+    TenureReductionQuote,
+    PartPaymentQuote,
+)
+
+ArrayLike = Union[float, int, np.ndarray]
+
+FORECLOSURE_CHARGE_PERCENT = 2.0
+
+# Tolerance used when rounding fractional tenures up to whole instalments
+_TENURE_EPSILON = 1e-9
+
+
+def _to_output(value: np.ndarray) -> ArrayLike:
+    """Returns plain python scalars for 0-d results and arrays otherwise."""
+    return value.item() if np.ndim(value) == 0 else value
+
+
+def monthly_rate(annual_rate: ArrayLike) -> np.ndarray:
+    """
+    Converts an annual interest rate expressed in percent (e.g. 7.5) to a monthly rate.
+    """
+    return np.asarray(annual_rate, dtype= np.float64) / 1200.0
+
+
+def calculate_emi(principal: ArrayLike, annual_rate: ArrayLike, months: ArrayLike) -> ArrayLike:
+    """
+    Computes the equated monthly instalment for a fully amortizing loan.
+    All arguments broadcast against each other, so grids of scenarios are computed in one pass.
+
+    Args:
+        principal: The outstanding principal.
+        annual_rate: The annual interest rate in percent.
+        months: The number of monthly instalments left to repay the principal.
+
+    Returns:
+        The EMI for each principal / rate / tenure combination. Non-positive tenures yield NaN.
+    """
+    P = np.asarray(principal, dtype= np.float64)
+    r = monthly_rate(annual_rate)
+    n = np.asarray(months, dtype= np.float64)
+
+    with np.errstate(divide= "ignore", invalid= "ignore"):
+        factor = np.power(1.0 + r, n)
+        amortizing = P * r * factor / (factor - 1.0)
+        flat = P / n
+        emi = np.where(r == 0, flat, amortizing)
+
+    return _to_output(np.where(n > 0, emi, np.nan))
+
+
+def calculate_tenure(principal: ArrayLike, annual_rate: ArrayLike, emi: ArrayLike) -> ArrayLike:
+    """
+    Computes the number of instalments needed to repay the principal at a fixed EMI.
+    The final instalment may be smaller than the EMI, so fractional tenures are rounded up.
+
+    Returns:
+        Whole months for each combination. An EMI that does not cover the monthly interest yields inf.
+    """
+    P = np.asarray(principal, dtype= np.float64)
+    r = monthly_rate(annual_rate)
+    A = np.asarray(emi, dtype= np.float64)
+
+    with np.errstate(divide= "ignore", invalid= "ignore"):
+        ratio = r * P / A
+        amortizing = -np.log1p(-ratio) / np.log1p(r)
+        flat = P / A
+        months = np.where(r == 0, flat, amortizing)
+        months = np.where((r > 0) & (ratio >= 1.0), np.inf, months)
+
+    months = np.ceil(months - _TENURE_EPSILON)
+    return _to_output(np.where(P <= 0, 0.0, months))
+
+
+def balance_after(principal: ArrayLike, annual_rate: ArrayLike, emi: ArrayLike, payments: ArrayLike) -> ArrayLike:
+    """
+    Computes the outstanding principal after a number of EMI payments (closed form).
+    """
+    P = np.asarray(principal, dtype= np.float64)
+    r = monthly_rate(annual_rate)
+    A = np.asarray(emi, dtype= np.float64)
+    k = np.asarray(payments, dtype= np.float64)
+
+    with np.errstate(divide= "ignore", invalid= "ignore"):
+        growth = np.power(1.0 + r, k)
+        amortizing = P * growth - A * (growth - 1.0) / r
+        flat = P - A * k
+        balance = np.where(r == 0, flat, amortizing)
+
+    return _to_output(balance)
+
+
+def calculate_total_interest(principal: ArrayLike, annual_rate: ArrayLike, emi: ArrayLike) -> ArrayLike:
+    """
+    Computes the total interest paid when repaying the principal at a fixed EMI,
+    accounting for the smaller final instalment.
+    """
+    P = np.asarray(principal, dtype= np.float64)
+    r = monthly_rate(annual_rate)
+    A = np.asarray(emi, dtype= np.float64)
+
+    months = np.asarray(calculate_tenure(P, annual_rate, A), dtype= np.float64)
+    finite = np.isfinite(months) & (months > 0)
+    safe_months = np.where(finite, months, 1.0)
+
+    last_balance = np.asarray(balance_after(P, annual_rate, A, safe_months - 1.0), dtype= np.float64)
+    final_payment = last_balance * (1.0 + r)
+    total_paid = A * (safe_months - 1.0) + final_payment
+    interest = np.where(finite, total_paid - P, np.where(P <= 0, 0.0, np.inf))
+
+    return _to_output(interest)
+
+
+def remaining_tenure(tenure_months: int, payments_made: int, principal: float, annual_rate: float, emi: float) -> int:
+    """
+    Computes the number of instalments left on the loan: the contractual instalments remaining,
+    capped by the tenure implied by the current principal & EMI when the loan is ahead of schedule.
+    """
+    contractual = tenure_months - payments_made
+    implied = calculate_tenure(principal, annual_rate, emi)
+
+    if not np.isfinite(implied):
+        return max(int(contractual), 0)
+    if contractual <= 0:
+        return int(implied)
+    return int(min(contractual, implied))
+
+
+def quote_loan_closure(
+    principal: float,
+    annual_rate: float,
+    foreclosure_charge_percent: float = FORECLOSURE_CHARGE_PERCENT,
+) -> LoanClosureQuote:
+    """
+    Computes the amount required to foreclose the loan today: the outstanding principal,
+    one month of simple interest and the foreclosure charge on the principal.
+    """
+    accrued_interest = float(principal * monthly_rate(annual_rate))
+    foreclosure_charge = principal * foreclosure_charge_percent / 100.0
+
+    return LoanClosureQuote(
+        outstandingPrincipal= round(principal, 2),
+        interestRate= annual_rate,
+        accruedInterest= round(accrued_interest, 2),
+        foreclosureChargePercent= foreclosure_charge_percent,
+        foreclosureCharge= round(foreclosure_charge, 2),
+        totalClosureAmount= round(principal + accrued_interest + foreclosure_charge, 2),
+    )
+
+
+def quote_tenure_reduction(
+    principal: float,
+    annual_rate: float,
+    current_emi: float,
+    remaining_months: int,
+    reduce_by_months: int,
+) -> TenureReductionQuote:
+    """
+    Computes the EMI needed to repay the outstanding principal `reduce_by_months` earlier.
+
+    Raises:
+        ValueError: If the reduction leaves no instalments to repay the loan or the current EMI never repays it.
+    """
+    new_tenure = remaining_months - reduce_by_months
+    if new_tenure <= 0:
+        raise ValueError(f"Tenure can be reduced by at most {remaining_months - 1} months.")
+
+    current_interest = float(calculate_total_interest(principal, annual_rate, current_emi))
+    if not np.isfinite(current_interest):
+        raise ValueError("The current EMI does not cover the monthly interest on the loan.")
+
+    new_emi = float(calculate_emi(principal, annual_rate, new_tenure))
+    new_interest = new_emi * new_tenure - principal
+
+    return TenureReductionQuote(
+        principal= round(principal, 2),
+        interestRate= annual_rate,
+        remainingMonths= remaining_months,
+        newTenureMonths= new_tenure,
+        currentEmi= round(current_emi, 2),
+        newEmi= round(new_emi, 2),
+        emiIncrease= round(new_emi - current_emi, 2),
+        currentTotalInterest= round(current_interest, 2),
+        newTotalInterest= round(new_interest, 2),
+        interestSaved= round(current_interest - new_interest, 2),
+    )
+
+
+def quote_part_payment(
+    principal: float,
+    annual_rate: float,
+    current_emi: float,
+    remaining_months: int,
+    part_payment: float,
+) -> PartPaymentQuote:
+    """
+    Computes the impact of a lump-sum part payment for both repayment options:
+    keeping the tenure and lowering the EMI, or keeping the EMI and shortening the tenure.
+
+    Raises:
+        ValueError: If the part payment clears the whole outstanding principal or the current EMI never repays it.
+    """
+    new_principal = principal - part_payment
+    if new_principal <= 0:
+        raise ValueError("The part payment covers the entire outstanding principal.")
+
+    current_interest = float(calculate_total_interest(principal, annual_rate, current_emi))
+    if not np.isfinite(current_interest):
+        raise ValueError("The current EMI does not cover the monthly interest on the loan.")
+
+    reduced_emi = float(calculate_emi(new_principal, annual_rate, remaining_months))
+    reduced_emi_interest = reduced_emi * remaining_months - new_principal
+
+    reduced_tenure = int(calculate_tenure(new_principal, annual_rate, current_emi))
+    reduced_tenure_interest = float(calculate_total_interest(new_principal, annual_rate, current_emi))
+
+    return PartPaymentQuote(
+        principal= round(principal, 2),
+        partPayment= round(part_payment, 2),
+        newPrincipal= round(new_principal, 2),
+        interestRate= annual_rate,
+        currentEmi= round(current_emi, 2),
+        remainingMonths= remaining_months,
+        currentTotalInterest= round(current_interest, 2),
+        reducedEmi= round(reduced_emi, 2),
+        reducedEmiTotalInterest= round(reduced_emi_interest, 2),
+        reducedEmiInterestSaved= round(current_interest - reduced_emi_interest, 2),
+        reducedTenureMonths= reduced_tenure,
+        reducedTenureTotalInterest= round(reduced_tenure_interest, 2),
+        reducedTenureInterestSaved= round(current_interest - reduced_tenure_interest, 2),
+        monthsSaved= max(remaining_months - reduced_tenure, 0),
+    )
+
+
+def sweep_scenarios(
+    summary: LoanSummary,
+    latest: LoanPayment,
+    part_payments: Sequence[float],
+    tenure_reductions: Sequence[int],
+    remaining_months: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    Evaluates every part payment x tenure reduction combination in a single broadcast pass.
+
+    For each combination the table holds the EMI needed to repay the reduced principal over the reduced tenure,
+    as well as the tenure needed when the current EMI is kept. Combinations that close the loan or leave
+    no tenure are dropped.
+
+    Args:
+        summary: The loan summary holding the interest rate & contractual EMI.
+        latest: The most recent payment, whose current principal is the outstanding principal.
+        part_payments: The lump-sum amounts to evaluate. Include 0 to compare against no part payment.
+        tenure_reductions: The tenure reductions in months to evaluate. Include 0 to keep the tenure.
+        remaining_months: The instalments left on the loan, derived from the current EMI when omitted.
+
+    Returns:
+        pd.DataFrame: One row per valid scenario, sorted by part payment and tenure reduction.
+    """
+    principal = latest.currentPrincipal
+    rate = summary.interestRate
+    emi = summary.emiAmount
+    if remaining_months is None:
+        remaining_months = int(calculate_tenure(principal, rate, emi))
+
+    current_interest = float(calculate_total_interest(principal, rate, emi))
+    if not np.isfinite(current_interest):
+        raise ValueError("The current EMI does not cover the monthly interest on the loan.")
+
+    amounts = np.asarray(part_payments, dtype= np.float64)[:, None]
+    reductions = np.asarray(tenure_reductions, dtype= np.int64)[None, :]
+    amounts, reductions = np.broadcast_arrays(amounts, reductions)
+
+    new_principal = principal - amounts
+    new_tenure = remaining_months - reductions
+    new_emi = np.asarray(calculate_emi(new_principal, rate, new_tenure), dtype= np.float64)
+    new_interest = new_emi * new_tenure - new_principal
+
+    tenure_at_emi = np.asarray(calculate_tenure(new_principal, rate, emi), dtype= np.float64)
+    interest_at_emi = np.asarray(calculate_total_interest(new_principal, rate, emi), dtype= np.float64)
+
+    valid = (new_principal > 0) & (new_tenure > 0)
+    table = pd.DataFrame({
+        "partPayment": amounts[valid],
+        "tenureReductionMonths": reductions[valid],
+        "newPrincipal": new_principal[valid],
+        "tenureMonths": new_tenure[valid],
+        "emi": new_emi[valid],
+        "emiChange": new_emi[valid] - emi,
+        "totalInterest": new_interest[valid],
+        "interestSaved": current_interest - new_interest[valid],
+        "tenureAtCurrentEmi": tenure_at_emi[valid].astype(np.int64),
+        "interestSavedAtCurrentEmi": current_interest - interest_at_emi[valid],
+    })
+
+    money_columns = ["partPayment", "newPrincipal", "emi", "emiChange", "totalInterest", "interestSaved", "interestSavedAtCurrentEmi"]
+    table[money_columns] = table[money_columns].round(2)
+    return table.sort_values(["partPayment", "tenureReductionMonths"], ignore_index= True)
@@ -0,0 +1,132 @@
+import os
+import csv
+import json
+import hashlib
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from dotenv import load_dotenv, find_dotenv
+
+from services.embedding_cache import normalise_query
+from services.response_cache import ResponseCache, SqliteResponseStore, get_response_store
+
+load_dotenv(find_dotenv())
+
+# Answers of the RAG pipelines are reused for the same question until their collection's documents change
+RAG_ANSWER_CACHE_ENABLED = os.getenv("RAG_ANSWER_CACHE_ENABLED", "true").lower() == "true"
+# Cosine similarity above which a stored question's answer is reused, empty to reuse exact questions only
+_similarity = os.getenv("RAG_ANSWER_CACHE_SIMILARITY", "")
+RAG_ANSWER_CACHE_SIMILARITY = float(_similarity) if _similarity else None
+
+
+def corpus_version(index_path: str) -> Optional[str]:
+    """
+    Hash of the document hashes listed in a collection's `index.csv`, None when the collection has no index.
+    `BaseVectorStore.update_vector_store` rewrites the index whenever it adds or removes documents.
+    """
+    try:
+        with open(index_path, newline= "", encoding= "utf-8") as f:
+            hash_codes = sorted(row["HashCode"] for row in csv.DictReader(f))
+    except (OSError, KeyError) as e:
+        print(f"[ERROR] Could not read the document index {index_path}: {e}")
+        return None
+    return hashlib.sha256("\n".join(hash_codes).encode("utf-8")).hexdigest()[:16]
+
+
+def settings_fingerprint(settings: Dict[str, Any]) -> str:
+    """
+    Hash of the pipeline settings an answer depends on besides the question & the documents.
+    """
+    text = json.dumps(settings, sort_keys= True, default= str)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:12]
+
+
+class RAGAnswerCache:
+    """
+    Answers of one RAG collection keyed by the pipeline settings, the corpus version & the normalised question.
+    Every settings & corpus version pair has its own response cache namespace, so answers from replaced documents or
+    from another prompt, reranker or retrieval depth are never returned, not even by the similarity tier, and are
+    deleted once a new pair is seen.
+    """
+
+    def __init__(
+        self,
+        collection: str,
+        index_path: str,
+        model: str,
+        similarity_threshold: Optional[float] = RAG_ANSWER_CACHE_SIMILARITY,
+        store: Optional[SqliteResponseStore] = None,
+        settings: Optional[Dict[str, Any]] = None,
+    ):
+        self.collection = collection
+        self.index_path = index_path
+        self.model = model
+        self.settings = settings_fingerprint(settings or {})
+        self.similarity_threshold = similarity_threshold
+        self._store = store
+        self._lock = threading.Lock()
+        self._index_stat: Optional[Tuple[int, int]] = None
+        # The missing index is reported once, not on every question
+        self._warned = False
+        self._version: Optional[str] = None
+        self._cache: Optional[ResponseCache] = None
+
+    @property
+    def prefix(self) -> str:
+        return f"rag_answer:{self.collection}:"
+
+    def _current(self) -> Optional[ResponseCache]:
+        """
+        Returns the cache of the current corpus version, None when the corpus version is unknown.
+        """
+        try:
+            stat = os.stat(self.index_path)
+            index_stat = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            index_stat = None
+
+        with self._lock:
+            if index_stat is None:
+                if self._index_stat is not None or not self._warned:
+                    print(f"[ERROR] No document index at {self.index_path}, answers of '{self.collection}' are not cached")
+                    self._warned = True
+                self._index_stat, self._version, self._cache = None, None, None
+                return None
+            # The index is only read again after it was rewritten
+            if index_stat == self._index_stat:
+                return self._cache
+
+            self._index_stat = index_stat
+            version = corpus_version(self.index_path)
+            if version is not None and version != self._version:
+                store = self._store or get_response_store()
+                namespace = f"{self.prefix}{self.settings}:{version}"
+                dropped = store.drop_namespaces(self.prefix, keep= namespace)
+                if self._version is not None or dropped:
+                    print(f"[INFO] Documents or settings of '{self.collection}' changed, {dropped} cached answers dropped")
+                self._cache = ResponseCache(namespace, self.model, similarity_threshold= self.similarity_threshold, store= store)
+            elif version is None:
+                self._cache = None
+            self._version = version
+            return self._cache
+
+    def get_or_compute(self, question: str, compute: Callable[[], str]) -> str:
+        cache = self._current() if RAG_ANSWER_CACHE_ENABLED else None
+        if cache is None:
+            return compute()
+        return cache.get_or_compute({"question": normalise_query(question)}, compute)
+
+    async def aget_or_compute(self, question: str, compute: Callable[[], Awaitable[str]]) -> str:
+        cache = self._current() if RAG_ANSWER_CACHE_ENABLED else None
+        if cache is None:
+            return await compute()
+        return await cache.aget_or_compute({"question": normalise_query(question)}, compute)
+
+    def stats(self) -> Dict[str, Any]:
+        cache = self._cache
+        return {
+            "collection": self.collection,
+            "corpusVersion": self._version,
+            "settings": self.settings,
+            **(cache.stats() if cache is not None else {}),
+        }
@@ -0,0 +1,182 @@
+import os
+import json
+import asyncio
+import threading
+import weakref
+from typing import Any, Optional
+
+import aiohttp
+import requests
+import urllib3
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from dotenv import load_dotenv, find_dotenv
+
+urllib3.disable_warnings()
+load_dotenv(find_dotenv())
+
+# Connection pool & retry settings shared by every call to the backend API
+BACKEND_POOL_SIZE = int(os.getenv("BACKEND_POOL_SIZE", "20"))
+BACKEND_CONNECT_TIMEOUT = float(os.getenv("BACKEND_CONNECT_TIMEOUT", "3"))
+BACKEND_TIMEOUT = float(os.getenv("BACKEND_TIMEOUT", "15"))
+BACKEND_MAX_RETRIES = int(os.getenv("BACKEND_MAX_RETRIES", "3"))
+BACKEND_BACKOFF_FACTOR = float(os.getenv("BACKEND_BACKOFF_FACTOR", "0.3"))
+BACKEND_KEEPALIVE_SECONDS = float(os.getenv("BACKEND_KEEPALIVE_SECONDS", "60"))
+
+RETRY_STATUSES = (502, 503, 504)
+
+# Only idempotent requests are retried after the request may have reached the server
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+
+class BackendError(Exception):
+    def __init__(self, status_code: int, message: str):
+        super().__init__(f"Backend request failed with status {status_code}: {message}")
+        self.status_code = status_code
+
+
+class BackendResponse:
+    """
+    The body & status of an async backend response, read before the connection is released to the pool.
+    Mirrors the parts of `requests.Response` used by the chatbot.
+    """
+
+    def __init__(self, status_code: int, text: str):
+        self.status_code = status_code
+        self.text = text
+
+    @property
+    def status(self) -> int:
+        return self.status_code
+
+    def json(self) -> Any:
+        return json.loads(self.text) if self.text else None
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise BackendError(self.status_code, self.text)
+
+
+def _backoff(attempt: int) -> float:
+    return BACKEND_BACKOFF_FACTOR * (2 ** attempt)
+
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """
+    Returns the process wide `requests.Session` whose keep-alive pool is shared by all sync backend calls.
+    """
+    global _session
+    if _session is not None:
+        return _session
+
+    with _session_lock:
+        if _session is None:
+            retry = Retry(
+                total= BACKEND_MAX_RETRIES,
+                connect= BACKEND_MAX_RETRIES,
+                read= BACKEND_MAX_RETRIES,
+                status= BACKEND_MAX_RETRIES,
+                backoff_factor= BACKEND_BACKOFF_FACTOR,
+                status_forcelist= RETRY_STATUSES,
+                allowed_methods= IDEMPOTENT_METHODS,
+                raise_on_status= False,
+            )
+            adapter = HTTPAdapter(
+                pool_connections= BACKEND_POOL_SIZE,
+                pool_maxsize= BACKEND_POOL_SIZE,
+                max_retries= retry,
+            )
+            session = requests.Session()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.verify = False
+            _session = session
+
+    return _session
+
+
+def request(method: str, url: str, **kwargs) -> requests.Response:
+    kwargs.setdefault("timeout", (BACKEND_CONNECT_TIMEOUT, BACKEND_TIMEOUT))
+    return get_session().request(method, url, **kwargs)
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    return request("GET", url, **kwargs)
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    return request("POST", url, **kwargs)
+
+
+# aiohttp sessions are bound to the event loop they were created on, so one pool is kept per loop
+_async_sessions: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aiohttp.ClientSession]" = weakref.WeakKeyDictionary()
+
+
+def get_async_session() -> aiohttp.ClientSession:
+    """
+    Returns the `aiohttp.ClientSession` whose keep-alive pool is shared by all async backend calls on the running loop.
+    """
+    loop = asyncio.get_running_loop()
+    session = _async_sessions.get(loop)
+    if session is None or session.closed:
+        connector = aiohttp.TCPConnector(
+            limit= BACKEND_POOL_SIZE,
+            keepalive_timeout= BACKEND_KEEPALIVE_SECONDS,
+            ssl= False,
+        )
+        session = aiohttp.ClientSession(
+            connector= connector,
+            timeout= aiohttp.ClientTimeout(total= BACKEND_TIMEOUT, connect= BACKEND_CONNECT_TIMEOUT),
+        )
+        _async_sessions[loop] = session
+
+    return session
+
+
+async def arequest(method: str, url: str, **kwargs) -> BackendResponse:
+    """
+    Sends a request through the pooled async session, retrying connection failures with exponential backoff.
+    Timeouts and retryable statuses are only retried for idempotent methods.
+    """
+    method = method.upper()
+    idempotent = method in IDEMPOTENT_METHODS
+    session = get_async_session()
+
+    attempt = 0
+    while True:
+        last_attempt = attempt >= BACKEND_MAX_RETRIES
+        try:
+            async with session.request(method, url, **kwargs) as response:
+                if response.status not in RETRY_STATUSES or not idempotent or last_attempt:
+                    return BackendResponse(response.status, await response.text())
+                await response.read()
+        except aiohttp.ClientConnectorError:
+            if last_attempt:
+                raise
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+            if last_attempt or not idempotent:
+                raise
+
+        await asyncio.sleep(_backoff(attempt))
+        attempt += 1
+
+
+async def aget(url: str, **kwargs) -> BackendResponse:
+    return await arequest("GET", url, **kwargs)
+
+
+async def apost(url: str, **kwargs) -> BackendResponse:
+    return await arequest("POST", url, **kwargs)
+
+
+async def close_async_session() -> None:
+    """
+    Closes the pooled session of the running loop. Call before the loop shuts down.
+    """
+    session = _async_sessions.pop(asyncio.get_running_loop(), None)
+    if session is not None and not session.closed:
+        await session.close()
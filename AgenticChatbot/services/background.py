@@ -0,0 +1,104 @@
+import os
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Optional,
+    TypeVar,
+)
+
+from dotenv import load_dotenv, find_dotenv
+
+load_dotenv(find_dotenv())
+
+BACKGROUND_MAX_RETRIES = int(os.getenv("BACKGROUND_MAX_RETRIES", "3"))
+BACKGROUND_BACKOFF_FACTOR = float(os.getenv("BACKGROUND_BACKOFF_FACTOR", "0.5"))
+
+T = TypeVar("T")
+
+
+class BackgroundJobError(Exception):
+    """
+    Raised by a job whose work did not go through, e.g. a backend call answering with an error status, to have it retried.
+    """
+
+
+class BackgroundWorker:
+    """
+    Runs coroutines on a dedicated event loop thread, so they outlive the Streamlit rerun that submitted them.
+    Failed jobs are retried with exponential backoff. Jobs sharing a key run one after another, in submission order.
+    """
+
+    def __init__(self, name: str = "background-worker"):
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target= self._loop.run_forever, name= name, daemon= True)
+        self._thread.start()
+        # Last job submitted per key, only touched on the worker loop
+        self._tails: Dict[str, asyncio.Task] = {}
+
+    def submit(
+        self,
+        job: Callable[[], Awaitable[T]],
+        key: Optional[str] = None,
+        retries: int = BACKGROUND_MAX_RETRIES,
+        description: str = "background job",
+    ) -> "Future[T]":
+        """
+        Schedules `job` on the worker loop & returns a future of its result, usable from any thread or loop.
+
+        Args:
+            job (Callable[[], Awaitable[T]]): Creates the coroutine to run, called again for every attempt.
+            key (Optional[str]): Jobs with the same key start only once the previous one has finished, successfully or not.
+            retries (int): Attempts made after the first one fails.
+            description (str): Names the job in the logs.
+        """
+        return asyncio.run_coroutine_threadsafe(self._run(job, key, retries, description), self._loop)
+
+    async def _run(self, job: Callable[[], Awaitable[T]], key: Optional[str], retries: int, description: str) -> T:
+        current = asyncio.current_task()
+        previous = self._tails.get(key) if key else None
+        if key:
+            self._tails[key] = current
+
+        try:
+            if previous is not None:
+                await asyncio.wait([previous])
+            return await self._with_retries(job, retries, description)
+        finally:
+            if key and self._tails.get(key) is current:
+                del self._tails[key]
+
+    async def _with_retries(self, job: Callable[[], Awaitable[T]], retries: int, description: str) -> T:
+        for attempt in range(retries + 1):
+            try:
+                return await job()
+            except Exception as e:
+                if attempt == retries:
+                    print(f"[ERROR] {description} failed after {attempt + 1} attempts: {e}")
+                    raise
+                delay = BACKGROUND_BACKOFF_FACTOR * (2 ** attempt)
+                print(f"[EXCEPTION] {description} failed, retrying in {delay:.1f}s: {e}")
+                await asyncio.sleep(delay)
+
+    def stop(self) -> None:
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+
+_worker: Optional[BackgroundWorker] = None
+_worker_lock = threading.Lock()
+
+
+def get_background_worker() -> BackgroundWorker:
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = BackgroundWorker()
+        return _worker
+
+
+def run_in_background(job: Callable[[], Awaitable[T]], **kwargs: Any) -> "Future[T]":
+    return get_background_worker().submit(job, **kwargs)
@@ -0,0 +1,52 @@
+import re
+import math
+from collections import Counter
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from how i if in is it me my of on or the this to was what when "
+    "where which who why will with you your".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lower case words & numbers without stopwords. Codes like "NEFT" or "Form 15G" keep their terms.
+    """
+    return [token for token in re.findall(r"[a-z0-9]+", text.lower()) if token not in STOPWORDS]
+
+
+class BM25:
+    """
+    Okapi BM25 over an inverted index of tokenized documents. Scoring a query only visits the postings of its terms.
+    """
+
+    def __init__(self, documents: Sequence[Sequence[str]], k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, List[Tuple[int, int]]] = {}
+        self.lengths = np.array([len(tokens) for tokens in documents], dtype= np.float32)
+        for doc, tokens in enumerate(documents):
+            for term, frequency in Counter(tokens).items():
+                self.postings.setdefault(term, []).append((doc, frequency))
+        self.average_length = float(self.lengths.mean()) if len(self.lengths) else 0.0
+
+    def __len__(self) -> int:
+        return len(self.lengths)
+
+    def idf(self, term: str) -> float:
+        frequency = len(self.postings.get(term, ()))
+        return math.log(1 + (len(self) - frequency + 0.5) / (frequency + 0.5))
+
+    def scores(self, query: Sequence[str]) -> np.ndarray:
+        scores = np.zeros(len(self), dtype= np.float32)
+        if not len(self) or not self.average_length:
+            return scores
+        norms = self.k1 * (1 - self.b + self.b * self.lengths / self.average_length)
+        for term in set(query):
+            idf = self.idf(term)
+            for doc, frequency in self.postings.get(term, ()):
+                scores[doc] += idf * frequency * (self.k1 + 1) / (frequency + norms[doc])
+        return scores
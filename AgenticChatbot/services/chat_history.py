@@ -0,0 +1,91 @@
+import os
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from dotenv import load_dotenv, find_dotenv
+
+from services.chat_logic import fetch_all_chats_by_customer_id
+from services.chat_persistence import PLACEHOLDER_CHAT_TITLE, ChatPersistence
+
+load_dotenv(find_dotenv())
+
+CHAT_HISTORY_PAGE_SIZE = int(os.getenv("CHAT_HISTORY_PAGE_SIZE", "20"))
+# Seconds between two checks for chats created outside of this session
+CHAT_HISTORY_REFRESH_SECONDS = float(os.getenv("CHAT_HISTORY_REFRESH_SECONDS", "30"))
+
+
+class ChatHistory:
+    """
+    A session's list of the customer's chats, newest first. The first refresh fetches every chat, the following
+    ones only the chats created after the newest one fetched. Chats created by the session itself are added locally,
+    with their title once it has been generated.
+    """
+
+    def __init__(self, customer_id: str, refresh_seconds: float = CHAT_HISTORY_REFRESH_SECONDS):
+        self.customer_id = customer_id
+        self.refresh_seconds = refresh_seconds
+        self.chats: List[Dict[str, Any]] = []
+        self._by_id: Dict[str, Dict[str, Any]] = {}
+        # createdAt of the newest chat returned by the backend, never a local one
+        self._newest: Optional[str] = None
+        self._refreshed_at: Optional[float] = None
+        self._tracked: List[ChatPersistence] = []
+
+    async def refresh(self, force: bool = False) -> None:
+        stale = self._refreshed_at is None or time.monotonic() - self._refreshed_at >= self.refresh_seconds
+        if force or stale:
+            fetched = await fetch_all_chats_by_customer_id(self.customer_id, created_after= self._newest)
+            self._refreshed_at = time.monotonic()
+            if fetched:
+                self._newest = fetched[0]["createdAt"]
+                self._merge(fetched)
+        self._apply_tracked()
+
+    def _merge(self, fetched: List[Dict[str, Any]]) -> None:
+        new_chats = []
+        for chat in fetched:
+            known = self._by_id.get(chat["chatId"])
+            if known is None:
+                new_chats.append(chat)
+                self._by_id[chat["chatId"]] = chat
+            else:
+                known.update(chat)
+        self.chats[:0] = new_chats
+
+    def track(self, chat: ChatPersistence) -> None:
+        """
+        Shows a chat created by this session, before the next refresh could return it.
+        """
+        self._tracked.append(chat)
+        self._apply_tracked()
+
+    def _apply_tracked(self) -> None:
+        pending = []
+        for chat in self._tracked:
+            if chat.chat_id.done() and chat.chat_id.exception() is not None:
+                continue
+            chat_id = chat.known_chat_id()
+            if chat_id is None:
+                pending.append(chat)
+                continue
+
+            entry = self._by_id.get(chat_id)
+            if entry is None:
+                entry = {"chatId": chat_id, "chatTitle": PLACEHOLDER_CHAT_TITLE, "createdAt": datetime.now(timezone.utc).isoformat()}
+                self._by_id[chat_id] = entry
+                self.chats.insert(0, entry)
+
+            if chat.title is None or (chat.title.done() and chat.title.exception() is not None):
+                continue
+            if chat.title.done():
+                entry["chatTitle"] = chat.title.result()
+            else:
+                pending.append(chat)
+        self._tracked = pending
+
+    def page_count(self, page_size: int = CHAT_HISTORY_PAGE_SIZE) -> int:
+        return max(1, -(-len(self.chats) // page_size))
+
+    def page(self, number: int, page_size: int = CHAT_HISTORY_PAGE_SIZE) -> List[Dict[str, Any]]:
+        return self.chats[number * page_size:(number + 1) * page_size]
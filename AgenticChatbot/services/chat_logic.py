@@ -1,61 +1,68 @@
+import asyncio
 import aiohttp
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 from endpoints import Endpoints
+from services import backend_client
 
 
-async def fetch_all_chats_by_customer_id(customer_id: str) -> List[Dict[str, Any]]:
+async def fetch_all_chats_by_customer_id(customer_id: str, created_after: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Returns the customer's chats, newest first. With `created_after`, the `createdAt` of the newest chat already
+    known, only the chats created since are returned.
+    """
     url = Endpoints.GET_CHAT_BY_CUSTOMER_ID
     headers = {'customerId': customer_id}
+    if created_after:
+        headers['createdAfter'] = created_after
     
-    async with aiohttp.ClientSession() as session:
-        try:
-            async with session.get(
-                url, 
-                headers= headers, 
-                ssl=False,
-            ) as response:
-                data = await response.json()
-                status = response.status
-                if status == 200:
-                    chats = data.get('chats', [])
-                    sorted_chats = sorted(
-                        chats, 
-                        key= lambda x: datetime.fromisoformat(x['createdAt'].replace('Z', '+00:00')), 
-                        reverse=True
-                    )
-
-                    return sorted_chats
-                else:
-                    print(f"[ERROR] fetch_all_chats failed with status {response.status}: {data['errors']}")
-                    return []
-        except aiohttp.ClientError as e:
-            print(f"[EXCEPTION] fetch_all_chats_by_customer_id failed: {e}")
+    try:
+        response = await backend_client.aget(
+            url, 
+            headers= headers, 
+        )
+        data = response.json()
+        status = response.status
+        if status == 404:
+            # The customer has no chats yet
+            return []
+        if status == 200:
+            chats = data.get('chats', [])
+            sorted_chats = sorted(
+                chats, 
+                key= lambda x: datetime.fromisoformat(x['createdAt'].replace('Z', '+00:00')), 
+                reverse=True
+            )
+
+            return sorted_chats
+        else:
+            print(f"[ERROR] fetch_all_chats failed with status {response.status}: {data['errors']}")
             return []
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        print(f"[EXCEPTION] fetch_all_chats_by_customer_id failed: {e}")
+        return []
 
 
 async def create_new_chat(customer_id: str, chat_title: str) -> str:
     url = Endpoints.CREATE_NEW_CHAT
     headers = {'customerId': customer_id, "chatTitle": chat_title}
 
-    async with aiohttp.ClientSession() as session:
-        try:
-            async with session.post(
-                url, 
-                headers=headers, 
-                ssl=False,
-            ) as response:
-                data = await response.json()
-                status = response.status
-                if status == 201:
-                    print(f"[INFO] New chat created successfully for customer {customer_id}")
-                    return data.get('chatId', "")
-                else:
-                    print(f"[ERROR] create_new_chat failed with status {response.status}: {data['errors']}")
-                    return ""
-        except aiohttp.ClientError as e:
-            print(f"[EXCEPTION] create_new_chat failed: {e}")
+    try:
+        response = await backend_client.apost(
+            url, 
+            headers=headers, 
+        )
+        data = response.json()
+        status = response.status
+        if status == 201:
+            print(f"[INFO] New chat created successfully for customer {customer_id}")
+            return data.get('chatId', "")
+        else:
+            print(f"[ERROR] create_new_chat failed with status {response.status}: {data['errors']}")
             return ""
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        print(f"[EXCEPTION] create_new_chat failed: {e}")
+        return ""
 
 
 async def add_messages_to_chat(chat_id: str, messages: List[dict]) -> bool:
@@ -76,48 +83,93 @@ async def add_messages_to_chat(chat_id: str, messages: List[dict]) -> bool:
     }
 
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                url, 
-                headers= headers,
-                json= body, 
-                ssl= False,
-            ) as response:
-                print(response.status)
-                if response.status == 201:
-                    print(f"[INFO] Successfully added {len(messages)} messages to chat {chat_id}")
-                    return True
-                else:
-                    data = await response.json()
-                    print(f"[ERROR] add_messages_to_chat failed with status {response.status}: {data['errors']}")
-                    return False
-    except aiohttp.ClientError as e:
+        response = await backend_client.apost(
+            url, 
+            headers= headers,
+            json= body, 
+        )
+        print(response.status)
+        if response.status == 201:
+            print(f"[INFO] Successfully added {len(messages)} messages to chat {chat_id}")
+            return True
+        else:
+            data = response.json()
+            print(f"[ERROR] add_messages_to_chat failed with status {response.status}: {data['errors']}")
+            return False
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
         print(f"[EXCEPTION] add_messages_to_chat failed: {e}")
         return False
 
 
-async def fetch_messages_by_chat_id(chat_id: str) -> List[Dict[str, Any]]:
-    url = Endpoints.GET_MESSAGES_BY_CHAT_ID.format(chatId= chat_id)
-
-    async with aiohttp.ClientSession() as session:
-        try:
-            async with session.get(
-                url, 
-                ssl=False,
-            ) as response:
-                data = await response.json()
-                if response.status == 200:
-                    return data['chat']['messages']
-                else:
-                    print(f"[ERROR] fetch_messages_by_chat_id failed with status {response.status}: {data['errors']}")
-                    return []
-        except aiohttp.ClientError as e:
-            print(f"[EXCEPTION] fetch_messages_by_chat_id failed: {e}")
-            return []
+async def set_chat_title(chat_id: str, chat_title: str) -> bool:
+    url = Endpoints.SET_CHAT_TITLE
+    headers = {
+        'accept': '*/*',
+        'Content-Type': 'application/json'}
+    body = {
+        "chatId": chat_id,
+        "chatTitle": chat_title
+    }
 
+    try:
+        response = await backend_client.apost(
+            url, 
+            headers= headers,
+            json= body, 
+        )
+        if response.status == 201:
+            print(f"[INFO] Title of chat {chat_id} set to '{chat_title}'")
+            return True
+        else:
+            data = response.json()
+            print(f"[ERROR] set_chat_title failed with status {response.status}: {data['errors']}")
+            return False
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        print(f"[EXCEPTION] set_chat_title failed: {e}")
+        return False
 
 
+async def fetch_messages_by_chat_id(chat_id: str) -> List[Dict[str, Any]]:
+    url = Endpoints.GET_MESSAGES_BY_CHAT_ID.format(chatId= chat_id)
 
+    try:
+        response = await backend_client.aget(
+            url, 
+        )
+        data = response.json()
+        if response.status == 200:
+            return data['chat']['messages']
+        else:
+            print(f"[ERROR] fetch_messages_by_chat_id failed with status {response.status}: {data['errors']}")
+            return []
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        print(f"[EXCEPTION] fetch_messages_by_chat_id failed: {e}")
+        return []
 
 
+async def fetch_messages_page(chat_id: str, take: int, skip: Optional[int] = None) -> Tuple[List[Dict[str, Any]], int, str]:
+    """
+    Fetches `take` messages of a chat starting at index `skip`, or its last `take` messages without `skip`.
+    Returns the messages, the number of messages in the whole chat & the chat summary.
+    """
+    url = Endpoints.GET_MESSAGES_BY_CHAT_ID.format(chatId= chat_id)
+    params = {'take': take}
+    if skip is not None:
+        params['skip'] = skip
 
+    try:
+        response = await backend_client.aget(
+            url, 
+            params= params,
+        )
+        data = response.json()
+        if response.status == 200:
+            chat = data['chat']
+            return chat['messages'], data.get('messageCount', len(chat['messages'])), chat.get('summary') or ""
+        else:
+            print(f"[ERROR] fetch_messages_page failed with status {response.status}: {data['errors']}")
+            return [], 0, ""
+    # An empty or non JSON body, or JSON without the expected fields, counts as a failed fetch
+    except (aiohttp.ClientError, asyncio.TimeoutError, ValueError, KeyError, TypeError) as e:
+        print(f"[EXCEPTION] fetch_messages_page failed: {e}")
+        return [], 0, ""
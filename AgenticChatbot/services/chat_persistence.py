@@ -0,0 +1,78 @@
+import asyncio
+from concurrent.futures import Future
+from typing import Dict, List, Optional
+from uuid import uuid4
+
+from services.background import BackgroundJobError, run_in_background
+from services.chat_logic import add_messages_to_chat, create_new_chat, set_chat_title
+from services.message_queue import MESSAGE_QUEUE_ENABLED, get_message_queue
+from utils import achat_title_generation
+
+# Shown in the chat history until the generated title is saved
+PLACEHOLDER_CHAT_TITLE = "New Chat"
+
+
+def resolved(value: str) -> "Future[str]":
+    future: "Future[str]" = Future()
+    future.set_result(value)
+    return future
+
+
+class ChatPersistence:
+    """
+    Saves a chat to the backend from the background worker, off the path of the user's answer.
+    A new chat is created with a placeholder title that is replaced once the title is generated from the first prompt.
+    Each turn's messages are added in order once the chat exists, through the write-behind message queue when enabled.
+    """
+
+    def __init__(self, chat_id: "Future[str]", title: Optional["Future[str]"] = None):
+        self.chat_id = chat_id
+        # The generated title of a new chat, None for chats opened from the history
+        self.title = title
+        self.key = f"chat:{uuid4()}"
+
+    @classmethod
+    def create(cls, customer_id: str, first_prompt: str) -> "ChatPersistence":
+        async def create_chat() -> str:
+            chat_id = await create_new_chat(customer_id, PLACEHOLDER_CHAT_TITLE)
+            if not chat_id:
+                raise BackgroundJobError(f"Could not create a chat for customer {customer_id}")
+            return chat_id
+
+        chat = cls(run_in_background(create_chat, description= f"Creating a chat for customer {customer_id}"))
+        chat.title = run_in_background(lambda: chat._set_title(first_prompt), description= "Setting the chat title")
+        return chat
+
+    @classmethod
+    def existing(cls, chat_id: str) -> "ChatPersistence":
+        return cls(resolved(chat_id))
+
+    def known_chat_id(self) -> Optional[str]:
+        """
+        Returns the chat id once the chat has been created, without waiting for it.
+        """
+        if self.chat_id.done() and self.chat_id.exception() is None:
+            return self.chat_id.result()
+        return None
+
+    async def _set_title(self, prompt: str) -> str:
+        chat_id = await asyncio.wrap_future(self.chat_id)
+        title = await achat_title_generation(prompt)
+        if not await set_chat_title(chat_id, title):
+            raise BackgroundJobError(f"Could not set the title of chat {chat_id}")
+        return title
+
+    async def _add_messages(self, messages: List[Dict]) -> None:
+        chat_id = await asyncio.wrap_future(self.chat_id)
+        if MESSAGE_QUEUE_ENABLED:
+            await get_message_queue().aenqueue(chat_id, messages)
+            return
+        if not await add_messages_to_chat(chat_id, messages):
+            raise BackgroundJobError(f"Could not add {len(messages)} messages to chat {chat_id}")
+
+    def add_messages(self, messages: List[Dict]) -> "Future[None]":
+        return run_in_background(
+            lambda: self._add_messages(messages),
+            key= self.key,
+            description= f"Saving {len(messages)} messages",
+        )
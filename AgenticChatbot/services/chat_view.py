@@ -0,0 +1,45 @@
+import os
+from typing import Any, Dict, List
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+from dotenv import load_dotenv, find_dotenv
+
+load_dotenv(find_dotenv())
+
+# Messages fetched when a chat is opened & for every "Load earlier messages"
+CHAT_PAGE_SIZE = int(os.getenv("CHAT_PAGE_SIZE", "20"))
+# Messages rendered in the chat view, earlier ones are shown on demand
+CHAT_RENDER_WINDOW = int(os.getenv("CHAT_RENDER_WINDOW", "40"))
+# Messages of an opened chat given to the agents, the chat summary stands in for the older ones
+CHAT_GRAPH_WINDOW = int(os.getenv("CHAT_GRAPH_WINDOW", "10"))
+
+
+def to_display(messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Converts stored chat messages into the messages rendered by the chat view.
+    """
+    return [
+        {"role": msg["role"], "content": msg["message"]}
+        for msg in messages if msg["role"] in ("user", "assistant")
+    ]
+
+
+def graph_window(messages: List[Dict[str, Any]], summary: str = "", has_older: bool = False) -> List[BaseMessage]:
+    """
+    Returns the graph messages of an opened chat: its last CHAT_GRAPH_WINDOW messages, starting at a user message,
+    preceded by the chat summary when older messages are left out.
+    """
+    window = [msg for msg in messages if msg["role"] in ("user", "assistant")]
+    if len(window) > CHAT_GRAPH_WINDOW:
+        window = window[-CHAT_GRAPH_WINDOW:]
+        has_older = True
+    while window and window[0]["role"] != "user":
+        window = window[1:]
+
+    graph_messages: List[BaseMessage] = []
+    if has_older and summary:
+        graph_messages.append(SystemMessage(content= f"Summary of the earlier conversation:\n{summary}"))
+    for msg in window:
+        message_type = HumanMessage if msg["role"] == "user" else AIMessage
+        graph_messages.append(message_type(content= msg["message"]))
+    return graph_messages
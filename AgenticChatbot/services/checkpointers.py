@@ -0,0 +1,427 @@
+import os
+import time
+import sqlite3
+import asyncio
+import threading
+from collections import OrderedDict, defaultdict
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterator,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+)
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.checkpoint.sqlite import SqliteSaver
+from dotenv import load_dotenv, find_dotenv
+
+load_dotenv(find_dotenv())
+
+# "memory" keeps checkpoints in process with LRU eviction, "sqlite" persists them to CHECKPOINTER_SQLITE_PATH
+CHECKPOINTER_BACKEND = os.getenv("CHECKPOINTER_BACKEND", "memory").lower()
+CHECKPOINTER_SQLITE_PATH = os.getenv("CHECKPOINTER_SQLITE_PATH", "./checkpoints.sqlite")
+CHECKPOINTER_MAX_THREADS = int(os.getenv("CHECKPOINTER_MAX_THREADS", "1000"))
+CHECKPOINTER_IDLE_TTL = float(os.getenv("CHECKPOINTER_IDLE_TTL", "3600"))
+CHECKPOINTER_MAX_CHECKPOINTS = int(os.getenv("CHECKPOINTER_MAX_CHECKPOINTS", "10"))
+
+ROOT_NAMESPACE = ""
+
+# Subgraph (agent) checkpoints are stored under "<node>:<task id>" namespaces, a new one for every agent call.
+# Once the parent graph saves its next checkpoint those subgraph runs have completed & their checkpoints are dropped.
+
+
+class BoundedMemorySaver(InMemorySaver):
+    """
+    An `InMemorySaver` whose memory use stays bounded as sessions come and go.
+
+    - Threads idle for longer than `idle_ttl_seconds`, or beyond the `max_threads` most recently used, are deleted.
+    - Only the newest `max_checkpoints_per_thread` checkpoints of a thread are retained, along with their writes & channel values.
+    - Subgraph checkpoints are dropped once the parent graph moves on.
+
+    An evicted thread simply starts over: the app passes the full conversation state with every turn.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_threads: int = CHECKPOINTER_MAX_THREADS,
+        idle_ttl_seconds: Optional[float] = CHECKPOINTER_IDLE_TTL,
+        max_checkpoints_per_thread: int = CHECKPOINTER_MAX_CHECKPOINTS,
+        clock: Callable[[], float] = time.monotonic,
+        serde: Any = None,
+    ):
+        super().__init__(serde= serde)
+        self.max_threads = max_threads
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.max_checkpoints_per_thread = max(1, max_checkpoints_per_thread)
+        self._clock = clock
+        self._lock = threading.RLock()
+        self._last_used: "OrderedDict[str, float]" = OrderedDict()
+        # Indexes over the parent's storage, keyed by (thread id, checkpoint namespace)
+        self._namespaces: Dict[str, Set[str]] = defaultdict(set)
+        self._versions: Dict[Tuple[str, str], Dict[str, ChannelVersions]] = defaultdict(dict)
+        self._blob_keys: Dict[Tuple[str, str], Set[tuple]] = defaultdict(set)
+        self._write_keys: Dict[Tuple[str, str], Set[tuple]] = defaultdict(set)
+        self.evicted_threads = 0
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        key = (thread_id, checkpoint_ns)
+
+        with self._lock:
+            saved = super().put(config, checkpoint, metadata, new_versions)
+
+            self._namespaces[thread_id].add(checkpoint_ns)
+            self._blob_keys[key].update((thread_id, checkpoint_ns, k, v) for k, v in new_versions.items())
+            self._versions[key][checkpoint["id"]] = dict(checkpoint["channel_versions"])
+
+            if checkpoint_ns == ROOT_NAMESPACE:
+                for namespace in list(self._namespaces[thread_id]):
+                    if namespace != ROOT_NAMESPACE:
+                        self._drop_namespace(thread_id, namespace)
+
+            self._trim(thread_id, checkpoint_ns)
+            self._touch(thread_id)
+            self._evict()
+
+        return saved
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+
+        with self._lock:
+            super().put_writes(config, writes, task_id, task_path)
+            self._namespaces[thread_id].add(checkpoint_ns)
+            self._write_keys[(thread_id, checkpoint_ns)].add((thread_id, checkpoint_ns, checkpoint_id))
+            self._touch(thread_id)
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        with self._lock:
+            result = super().get_tuple(config)
+            self._track_lookup(config, [result] if result else [])
+            return result
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        # Materialized under the lock, other threads may evict while the caller iterates
+        with self._lock:
+            results = list(super().list(config, filter= filter, before= before, limit= limit))
+            if config is not None:
+                self._track_lookup(config, results)
+        yield from results
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock:
+            namespaces = self._namespaces.pop(thread_id, set()) | set(self.storage.get(thread_id, {}))
+            for namespace in namespaces:
+                self._drop_namespace(thread_id, namespace)
+            self.storage.pop(thread_id, None)
+            self._last_used.pop(thread_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "threads": len(self._last_used),
+                "maxThreads": self.max_threads,
+                "checkpoints": sum(len(saved) for namespaces in self.storage.values() for saved in namespaces.values()),
+                "blobs": len(self.blobs),
+                "writes": len(self.writes),
+                "evictedThreads": self.evicted_threads,
+            }
+
+    def _touch(self, thread_id: str) -> None:
+        self._last_used[thread_id] = self._clock()
+        self._last_used.move_to_end(thread_id)
+
+    def _evict(self) -> None:
+        now = self._clock()
+        while len(self._last_used) > 1:
+            thread_id, last_used = next(iter(self._last_used.items()))
+            idle = self.idle_ttl_seconds is not None and now - last_used > self.idle_ttl_seconds
+            if len(self._last_used) <= self.max_threads and not idle:
+                break
+
+            self.delete_thread(thread_id)
+            self.evicted_threads += 1
+
+    def _trim(self, thread_id: str, checkpoint_ns: str) -> None:
+        key = (thread_id, checkpoint_ns)
+        saved = self.storage[thread_id][checkpoint_ns]
+        if len(saved) <= self.max_checkpoints_per_thread:
+            return
+
+        # Checkpoint ids are time ordered, the oldest sort first
+        for checkpoint_id in sorted(saved)[:-self.max_checkpoints_per_thread]:
+            del saved[checkpoint_id]
+            self._versions[key].pop(checkpoint_id, None)
+            write_key = (thread_id, checkpoint_ns, checkpoint_id)
+            self.writes.pop(write_key, None)
+            self._write_keys[key].discard(write_key)
+
+        referenced = {
+            (thread_id, checkpoint_ns, channel, version)
+            for versions in self._versions[key].values()
+            for channel, version in versions.items()
+        }
+        for blob_key in self._blob_keys[key] - referenced:
+            self.blobs.pop(blob_key, None)
+        self._blob_keys[key] &= referenced
+
+    def _drop_namespace(self, thread_id: str, checkpoint_ns: str) -> None:
+        key = (thread_id, checkpoint_ns)
+        if thread_id in self.storage:
+            self.storage[thread_id].pop(checkpoint_ns, None)
+        for write_key in self._write_keys.pop(key, ()):
+            self.writes.pop(write_key, None)
+        for blob_key in self._blob_keys.pop(key, ()):
+            self.blobs.pop(blob_key, None)
+        self._versions.pop(key, None)
+        self._namespaces.get(thread_id, set()).discard(checkpoint_ns)
+
+    def _track_lookup(self, config: RunnableConfig, results: Sequence[CheckpointTuple]) -> None:
+        # The parent's defaultdicts create empty entries on lookups, which have to be tracked or dropped
+        thread_id = config["configurable"].get("thread_id")
+        if thread_id is None:
+            return
+
+        if thread_id not in self._last_used:
+            if not any(self.storage.get(thread_id, {}).values()):
+                self.storage.pop(thread_id, None)
+            for result in results:
+                self.writes.pop(self._write_key(result), None)
+            return
+
+        for result in results:
+            write_key = self._write_key(result)
+            self._namespaces[thread_id].add(write_key[1])
+            self._write_keys[(thread_id, write_key[1])].add(write_key)
+
+    @staticmethod
+    def _write_key(result: CheckpointTuple) -> tuple:
+        configurable = result.config["configurable"]
+        return (configurable["thread_id"], configurable["checkpoint_ns"], configurable["checkpoint_id"])
+
+
+class BoundedSqliteSaver(SqliteSaver):
+    """
+    A `SqliteSaver` running in WAL mode that persists checkpoints across restarts while keeping the database bounded.
+
+    - Only the newest `max_checkpoints_per_thread` checkpoints of a thread, and their writes, are retained.
+    - Subgraph checkpoints are dropped once the parent graph moves on.
+    - Threads idle for longer than `idle_ttl_seconds` are deleted, checked at most every `prune_interval_seconds`.
+
+    The async methods run the sync implementation in a worker thread, so the saver works with `ainvoke` & `astream`
+    without binding its connection to an event loop.
+    """
+
+    def __init__(
+        self,
+        conn: sqlite3.Connection,
+        *,
+        max_checkpoints_per_thread: int = CHECKPOINTER_MAX_CHECKPOINTS,
+        idle_ttl_seconds: Optional[float] = CHECKPOINTER_IDLE_TTL,
+        prune_interval_seconds: float = 60,
+        serde: Any = None,
+    ):
+        super().__init__(conn, serde= serde)
+        self.max_checkpoints_per_thread = max(1, max_checkpoints_per_thread)
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.prune_interval_seconds = prune_interval_seconds
+        self._last_prune = time.time()
+
+    @classmethod
+    def from_path(cls, path: str, **kwargs: Any) -> "BoundedSqliteSaver":
+        """
+        Opens a saver on the SQLite file at `path` that lives as long as the process.
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok= True)
+        conn = sqlite3.connect(path, check_same_thread= False, timeout= 30)
+        return cls(conn, **kwargs)
+
+    def setup(self) -> None:
+        if self.is_setup:
+            return
+
+        super().setup()
+        self.conn.executescript(
+            """
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            CREATE TABLE IF NOT EXISTS thread_activity (
+                thread_id TEXT PRIMARY KEY,
+                updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS thread_activity_updated_at ON thread_activity (updated_at);
+            """
+        )
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        saved = super().put(config, checkpoint, metadata, new_versions)
+        thread_id = str(config["configurable"]["thread_id"])
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+
+        with self.cursor() as cur:
+            cur.execute(
+                "INSERT INTO thread_activity (thread_id, updated_at) VALUES (?, ?) "
+                "ON CONFLICT(thread_id) DO UPDATE SET updated_at = excluded.updated_at",
+                (thread_id, time.time()),
+            )
+            if checkpoint_ns == ROOT_NAMESPACE:
+                cur.execute("DELETE FROM checkpoints WHERE thread_id = ? AND checkpoint_ns != ''", (thread_id,))
+                cur.execute("DELETE FROM writes WHERE thread_id = ? AND checkpoint_ns != ''", (thread_id,))
+
+            cur.execute(
+                """
+                DELETE FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id NOT IN (
+                    SELECT checkpoint_id FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ?
+                    ORDER BY checkpoint_id DESC LIMIT ?
+                )
+                """,
+                (thread_id, checkpoint_ns, thread_id, checkpoint_ns, self.max_checkpoints_per_thread),
+            )
+            cur.execute(
+                """
+                DELETE FROM writes WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id NOT IN (
+                    SELECT checkpoint_id FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ?
+                )
+                """,
+                (thread_id, checkpoint_ns, thread_id, checkpoint_ns),
+            )
+
+        if time.time() - self._last_prune > self.prune_interval_seconds:
+            self.prune_idle_threads()
+
+        return saved
+
+    def delete_thread(self, thread_id: str) -> None:
+        super().delete_thread(thread_id)
+        with self.cursor() as cur:
+            cur.execute("DELETE FROM thread_activity WHERE thread_id = ?", (str(thread_id),))
+
+    def prune_idle_threads(self) -> int:
+        """
+        Deletes the threads that have been idle for longer than `idle_ttl_seconds`.
+
+        Returns:
+            int: The number of threads deleted.
+        """
+        self._last_prune = time.time()
+        if self.idle_ttl_seconds is None:
+            return 0
+
+        cutoff = time.time() - self.idle_ttl_seconds
+        with self.cursor() as cur:
+            cur.execute("SELECT thread_id FROM thread_activity WHERE updated_at < ?", (cutoff,))
+            idle_threads = [row[0] for row in cur.fetchall()]
+
+        for thread_id in idle_threads:
+            self.delete_thread(thread_id)
+
+        return len(idle_threads)
+
+    def stats(self) -> Dict[str, Any]:
+        with self.cursor(transaction= False) as cur:
+            threads = cur.execute("SELECT COUNT(*) FROM thread_activity").fetchone()[0]
+            checkpoints = cur.execute("SELECT COUNT(*) FROM checkpoints").fetchone()[0]
+            writes = cur.execute("SELECT COUNT(*) FROM writes").fetchone()[0]
+        return {
+            "threads": threads,
+            "checkpoints": checkpoints,
+            "writes": writes,
+        }
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        results = await asyncio.to_thread(
+            lambda: list(self.list(config, filter= filter, before= before, limit= limit))
+        )
+        for result in results:
+            yield result
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+
+def get_checkpointer(backend: Optional[str] = None) -> BaseCheckpointSaver:
+    """
+    Builds the checkpointer selected by `backend`, or by the CHECKPOINTER_BACKEND env variable.
+
+    Args:
+        backend (Optional[str]): "memory" or "sqlite".
+    """
+    backend = (backend or CHECKPOINTER_BACKEND).lower()
+    if backend == "sqlite":
+        print(f"[INFO] Persisting checkpoints to {CHECKPOINTER_SQLITE_PATH}")
+        return BoundedSqliteSaver.from_path(CHECKPOINTER_SQLITE_PATH)
+    if backend == "memory":
+        return BoundedMemorySaver()
+
+    raise ValueError(f"Unknown checkpointer backend '{backend}', expected 'memory' or 'sqlite'")
@@ -0,0 +1,218 @@
+import os
+import re
+import time
+import asyncio
+import hashlib
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from dotenv import load_dotenv, find_dotenv
+
+from services.cache import TTLCache
+from services.llm_registry import EMBEDDING_MODEL, get_embeddings
+
+load_dotenv(find_dotenv())
+
+# Query embeddings of the RAG retrievers are reused for repeated questions
+EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() == "true"
+EMBEDDING_CACHE_MEMORY_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MEMORY_ENTRIES", "1024"))
+# Vectors outlive restarts in a memory-mapped file under this folder, an empty path keeps them in memory only
+EMBEDDING_CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR", "./embedding_cache")
+EMBEDDING_CACHE_DISK_ENTRIES = int(os.getenv("EMBEDDING_CACHE_DISK_ENTRIES", "20000"))
+
+# The vector file grows by this many rows at a time
+GROW_ROWS = 1024
+
+
+def normalise_query(text: str) -> str:
+    """
+    Case, spacing & trailing punctuation do not change what a question asks, so they do not change its key.
+    """
+    return " ".join(text.casefold().split()).rstrip("?!. ")
+
+
+def query_key(model: str, text: str) -> str:
+    return hashlib.sha256(f"{model}\x00{normalise_query(text)}".encode("utf-8")).hexdigest()
+
+
+class MemmapEmbeddingStore:
+    """
+    On-disk tier of one embedding model: the vectors are float32 rows of a memory-mapped file & a SQLite table maps
+    each key to its row. Once `max_entries` rows are held, the least recently used row is overwritten.
+    """
+
+    def __init__(self, directory: str, model: str, max_entries: int = EMBEDDING_CACHE_DISK_ENTRIES):
+        os.makedirs(directory, exist_ok= True)
+        name = re.sub(r"[^A-Za-z0-9_.-]", "_", model)
+        self.vectors_path = os.path.join(directory, f"{name}.f32")
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._vectors: Optional[np.memmap] = None
+        self.conn = sqlite3.connect(os.path.join(directory, f"{name}.sqlite"), check_same_thread= False)
+        with self._lock, self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            self.conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    key TEXT PRIMARY KEY,
+                    row INTEGER NOT NULL UNIQUE,
+                    accessed_at REAL NOT NULL
+                )
+                """
+            )
+            self.conn.execute("CREATE INDEX IF NOT EXISTS embeddings_accessed_at ON embeddings (accessed_at)")
+            row = self.conn.execute("SELECT value FROM meta WHERE name = 'dimensions'").fetchone()
+        self.dimensions: Optional[int] = row[0] if row else None
+        if self.dimensions and os.path.exists(self.vectors_path):
+            self._map(os.path.getsize(self.vectors_path) // (self.dimensions * 4))
+
+    def _map(self, rows: int) -> None:
+        if self._vectors is not None:
+            self._vectors.flush()
+        with open(self.vectors_path, "ab") as f:
+            f.truncate(rows * self.dimensions * 4)
+        self._vectors = np.memmap(self.vectors_path, dtype= np.float32, mode= "r+", shape= (rows, self.dimensions)) if rows else None
+
+    def _rows(self) -> int:
+        return 0 if self._vectors is None else self._vectors.shape[0]
+
+    def get(self, key: str) -> Optional[List[float]]:
+        with self._lock, self.conn:
+            row = self.conn.execute("SELECT row FROM embeddings WHERE key = ?", (key,)).fetchone()
+            if row is None or row[0] >= self._rows():
+                return None
+            self.conn.execute("UPDATE embeddings SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            return self._vectors[row[0]].tolist()
+
+    def put(self, key: str, vector: List[float]) -> None:
+        with self._lock, self.conn:
+            if self.dimensions is None:
+                self.dimensions = len(vector)
+                self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('dimensions', ?)", (self.dimensions,))
+            elif len(vector) != self.dimensions:
+                print(f"[ERROR] Embedding of {len(vector)} dimensions not cached, the store holds {self.dimensions}")
+                return
+
+            existing = self.conn.execute("SELECT row FROM embeddings WHERE key = ?", (key,)).fetchone()
+            if existing is not None:
+                row = existing[0]
+            else:
+                count = self.conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+                if count < self.max_entries:
+                    row = count
+                else:
+                    row = self.conn.execute("SELECT row FROM embeddings ORDER BY accessed_at LIMIT 1").fetchone()[0]
+                    self.conn.execute("DELETE FROM embeddings WHERE row = ?", (row,))
+
+            if row >= self._rows():
+                self._map(min(max(row + 1, self._rows() + GROW_ROWS), self.max_entries))
+            # The vector is written before its row is committed, a reader never sees a key without its vector
+            self._vectors[row] = np.asarray(vector, dtype= np.float32)
+            self.conn.execute("INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?)", (key, row, time.time()))
+
+    def count(self) -> int:
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            if self._vectors is not None:
+                self._vectors.flush()
+            self.conn.close()
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Embeddings answering repeated queries from an in-memory LRU, then the on-disk store, before calling the model.
+    Documents are embedded once when a collection is built, so they go straight to the model.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        model: str,
+        store: Optional[MemmapEmbeddingStore] = None,
+        memory_entries: int = EMBEDDING_CACHE_MEMORY_ENTRIES,
+    ):
+        self.embeddings = embeddings
+        self.model = model
+        self.store = store
+        self.memory: TTLCache[List[float]] = TTLCache(max_size= memory_entries, ttl_seconds= None)
+        self.metrics = {"diskHits": 0, "modelCalls": 0}
+
+    def _from_disk(self, key: str) -> Optional[List[float]]:
+        vector = self.store.get(key) if self.store is not None else None
+        if vector is not None:
+            self.metrics["diskHits"] += 1
+            self.memory.set(key, vector)
+        return vector
+
+    def _store(self, key: str, vector: List[float]) -> None:
+        self.metrics["modelCalls"] += 1
+        self.memory.set(key, vector)
+        if self.store is not None:
+            self.store.put(key, vector)
+
+    def embed_query(self, text: str) -> List[float]:
+        key = query_key(self.model, text)
+        vector = self.memory.get(key) or self._from_disk(key)
+        if vector is None:
+            vector = self.embeddings.embed_query(text)
+            self._store(key, vector)
+        return vector
+
+    async def aembed_query(self, text: str) -> List[float]:
+        key = query_key(self.model, text)
+        vector = self.memory.get(key)
+        if vector is None and self.store is not None:
+            vector = await asyncio.to_thread(self._from_disk, key)
+        if vector is None:
+            vector = await self.embeddings.aembed_query(text)
+            if self.store is None:
+                self._store(key, vector)
+            else:
+                await asyncio.to_thread(self._store, key, vector)
+        return vector
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embeddings.embed_documents(texts)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await self.embeddings.aembed_documents(texts)
+
+    def clear(self) -> None:
+        """
+        Empties the in-memory tier, the on-disk store keeps its vectors.
+        """
+        self.memory.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.memory.stats(),
+            **self.metrics,
+            "diskEntries": self.store.count() if self.store is not None else 0,
+            "persistent": self.store is not None,
+        }
+
+
+_query_embeddings: Dict[str, Embeddings] = {}
+_query_embeddings_lock = threading.Lock()
+
+
+def get_query_embeddings(model: str = EMBEDDING_MODEL) -> Embeddings:
+    """
+    Returns the embeddings the RAG retrievers embed their questions with, cached unless EMBEDDING_CACHE_ENABLED is false.
+    """
+    with _query_embeddings_lock:
+        if model not in _query_embeddings:
+            if EMBEDDING_CACHE_ENABLED:
+                store = MemmapEmbeddingStore(EMBEDDING_CACHE_DIR, model) if EMBEDDING_CACHE_DIR else None
+                _query_embeddings[model] = CachedEmbeddings(get_embeddings(model), model, store= store)
+            else:
+                _query_embeddings[model] = get_embeddings(model)
+        return _query_embeddings[model]
@@ -0,0 +1,199 @@
+import os
+from dataclasses import dataclass
+from typing import (
+    Any,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+from langchain_core.messages.utils import count_tokens_approximately, trim_messages
+from langchain_core.runnables import RunnableConfig, RunnableLambda
+from dotenv import load_dotenv, find_dotenv
+
+import utils
+from services.background import run_in_background
+from services.cache import TTLCache
+
+load_dotenv(find_dotenv())
+
+# Agents see the last HISTORY_WINDOW_TURNS user turns verbatim & a rolling summary of everything before them
+HISTORY_WINDOW_ENABLED = os.getenv("HISTORY_WINDOW_ENABLED", "true").lower() == "true"
+HISTORY_WINDOW_TURNS = int(os.getenv("HISTORY_WINDOW_TURNS", "4"))
+HISTORY_SUMMARY_ENABLED = os.getenv("HISTORY_SUMMARY_ENABLED", "true").lower() == "true"
+HISTORY_SUMMARY_TTL = float(os.getenv("HISTORY_SUMMARY_TTL", "3600"))
+
+# Messages are cut to this many characters before being summarized, loan statements & tables can be long
+SUMMARY_MESSAGE_CHARS = 2000
+
+# Token budget of the verbatim window of each agent, on top of its system prompt & the summary.
+# Overridden per agent with HISTORY_TOKEN_BUDGET_<AGENT NAME>, e.g. HISTORY_TOKEN_BUDGET_SUPERVISOR
+DEFAULT_TOKEN_BUDGET = int(os.getenv("HISTORY_TOKEN_BUDGET", "4000"))
+AGENT_TOKEN_BUDGETS = {
+    "supervisor": 3000,
+    "query_agent": 2000,
+    "summary_agent": 2000,
+    "update_agent": 2000,
+    "loan_statement_agent": 6000,
+    "loan_management_agent": 4000,
+}
+
+ROLES = {"human": "user", "ai": "assistant", "tool": "tool", "system": "system"}
+
+
+def token_budget(agent_name: str) -> int:
+    default = AGENT_TOKEN_BUDGETS.get(agent_name, DEFAULT_TOKEN_BUDGET)
+    return int(os.getenv(f"HISTORY_TOKEN_BUDGET_{agent_name.upper()}", default))
+
+
+@dataclass(frozen= True)
+class RollingSummary:
+    covered: int
+    last_message_id: Optional[str]
+    text: str
+
+
+# Keyed by thread id & shared by its agents, the summary covers the longest prefix any of them left out of its window
+summary_cache: TTLCache[RollingSummary] = TTLCache(max_size= 2048, ttl_seconds= HISTORY_SUMMARY_TTL)
+
+
+def split_turns(messages: Sequence[BaseMessage], turns: int) -> Tuple[List[BaseMessage], List[BaseMessage]]:
+    """
+    Splits the history into the older messages & the last `turns` user turns, a turn starting at a user message.
+    Cutting at user messages keeps tool calls & their results together.
+    """
+    human_indexes = [i for i, message in enumerate(messages) if isinstance(message, HumanMessage)]
+    if len(human_indexes) <= turns:
+        return [], list(messages)
+
+    cut = human_indexes[-turns] if turns > 0 else human_indexes[-1]
+    return list(messages[:cut]), list(messages[cut:])
+
+
+def fit_budget(messages: List[BaseMessage], budget: int) -> List[BaseMessage]:
+    """
+    Drops the oldest turns of the window until it fits the token budget. The current turn is always kept.
+    """
+    if count_tokens_approximately(messages) <= budget:
+        return messages
+
+    trimmed = trim_messages(
+        messages,
+        max_tokens= budget,
+        token_counter= count_tokens_approximately,
+        strategy= "last",
+        start_on= "human",
+        allow_partial= False,
+    )
+    if trimmed:
+        return trimmed
+
+    last_human = max((i for i, message in enumerate(messages) if isinstance(message, HumanMessage)), default= 0)
+    return messages[last_human:]
+
+
+def summary_input(messages: Sequence[BaseMessage]) -> List[Dict[str, str]]:
+    entries = []
+    for message in messages:
+        content = message.content if isinstance(message.content, str) else str(message.content)
+        if content:
+            entries.append({"role": ROLES.get(message.type, message.type), "message": content[:SUMMARY_MESSAGE_CHARS]})
+    return entries
+
+
+def summary_key(thread_id: str) -> str:
+    """
+    Key of a thread's summary refreshes on the background worker, they run one after another.
+    """
+    return f"history_summary:{thread_id}"
+
+
+def current_summary(thread_id: str, messages: Sequence[BaseMessage]) -> Optional[RollingSummary]:
+    """
+    The thread's cached summary, if it summarizes a prefix of `messages`.
+    """
+    cached = summary_cache.get(thread_id)
+    if cached and cached.covered <= len(messages) and messages[cached.covered - 1].id == cached.last_message_id:
+        return cached
+    return None
+
+
+async def refresh_summary(thread_id: str, older: List[BaseMessage]) -> None:
+    """
+    Extends the thread's summary to cover `older`, unless another refresh already did.
+    """
+    cached = current_summary(thread_id, older)
+    if cached and cached.covered >= len(older):
+        return
+
+    pending = older[cached.covered:] if cached else older
+    text = await utils.arolling_summary_generation(cached.text if cached else "", summary_input(pending))
+    summary_cache.set(thread_id, RollingSummary(covered= len(older), last_message_id= older[-1].id, text= text))
+
+
+class HistoryWindow:
+    """
+    Pre-model hook limiting the history an agent's LLM sees. The state itself is left untouched.
+
+    The summary of the older turns is refreshed on the background worker & the model call uses the last one available.
+    Older turns it does not cover yet are kept verbatim after it, until a refresh summarizes them.
+    """
+
+    def __init__(self, agent_name: str, turns: int, budget: int):
+        self.agent_name = agent_name
+        self.turns = turns
+        self.budget = budget
+
+    def _window(self, messages: Sequence[BaseMessage], config: Optional[RunnableConfig]) -> Dict[str, Any]:
+        older, recent = split_turns(messages, self.turns)
+        window = fit_budget(recent, self.budget)
+        # Turns dropped to fit the budget are summarized along with the older ones
+        older = older + recent[:len(recent) - len(window)]
+
+        thread_id = ((config or {}).get("configurable") or {}).get("thread_id")
+        if not older or not HISTORY_SUMMARY_ENABLED or not thread_id:
+            return self._compose("", window)
+
+        cached = current_summary(thread_id, messages)
+        uncovered = older[cached.covered:] if cached else older
+        if uncovered:
+            run_in_background(
+                lambda: refresh_summary(thread_id, older),
+                key= summary_key(thread_id),
+                description= f"History summary of thread {thread_id}",
+            )
+        return self._compose(cached.text if cached else "", uncovered + window)
+
+    def _compose(self, summary: str, window: List[BaseMessage]) -> Dict[str, Any]:
+        if not summary:
+            return {"llm_input_messages": window}
+        return {"llm_input_messages": [SystemMessage(content= f"Summary of the earlier conversation:\n{summary}"), *window]}
+
+    def invoke(self, state: Dict[str, Any], config: RunnableConfig) -> Dict[str, Any]:
+        return self._window(state["messages"], config)
+
+    async def ainvoke(self, state: Dict[str, Any], config: RunnableConfig) -> Dict[str, Any]:
+        return self._window(state["messages"], config)
+
+
+def history_window_hook(agent_name: str, turns: Optional[int] = None, budget: Optional[int] = None) -> Optional[RunnableLambda]:
+    """
+    Builds the pre-model hook of an agent, or None when windowing is disabled.
+
+    Args:
+        agent_name (str): The agent's name, used for its token budget.
+        turns (Optional[int]): User turns kept verbatim, defaults to HISTORY_WINDOW_TURNS.
+        budget (Optional[int]): Token budget of the verbatim window, defaults to the agent's budget.
+    """
+    if not HISTORY_WINDOW_ENABLED:
+        return None
+
+    window = HistoryWindow(
+        agent_name,
+        turns= HISTORY_WINDOW_TURNS if turns is None else turns,
+        budget= token_budget(agent_name) if budget is None else budget,
+    )
+    return RunnableLambda(window.invoke, afunc= window.ainvoke, name= f"{agent_name}_history_window")
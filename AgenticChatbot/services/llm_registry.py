@@ -0,0 +1,249 @@
+import os
+import asyncio
+import threading
+import weakref
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass, replace
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+)
+
+import httpx
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatGenerationChunk, ChatResult
+from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+from pydantic import SecretStr
+from dotenv import load_dotenv, find_dotenv
+
+load_dotenv(find_dotenv())
+
+# Connection pool shared by every OpenAI call of the process
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "50"))
+LLM_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", "20"))
+LLM_KEEPALIVE_SECONDS = float(os.getenv("LLM_KEEPALIVE_SECONDS", "60"))
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "5"))
+
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-3-large")
+
+
+@dataclass(frozen= True)
+class ModelRole:
+    """
+    Settings of a named model role. Every field can be overridden with LLM_<ROLE>_<FIELD>, e.g. LLM_TITLE_MODEL.
+    A `max_concurrency` of 0 leaves the role's calls unlimited.
+    """
+    model: str
+    temperature: float = 0
+    max_tokens: Optional[int] = None
+    timeout: float = 60
+    max_retries: int = 2
+    streaming: bool = False
+    max_concurrency: int = 0
+
+
+ROLES: Dict[str, ModelRole] = {
+    # The supervisor, picking the agent for a turn
+    "router": ModelRole(model= "gpt-4o"),
+    # The specialised react agents
+    "agent": ModelRole(model= "gpt-4o", streaming= True),
+    # The welcome & customer id validation agents, their replies are not streamed
+    "onboarding": ModelRole(model= "gpt-4o"),
+    # Formats tool results: loan statements & the financial calculator
+    "tool_formatter": ModelRole(model= "gpt-4o", streaming= True),
+    "summarizer": ModelRole(model= "gpt-4.1-mini"),
+    "title": ModelRole(model= "gpt-4.1-nano", temperature= 0.5, max_tokens= 50, timeout= 20),
+    "ivr": ModelRole(model= "gpt-4.1-nano", timeout= 20),
+    "rag_answer": ModelRole(model= "gpt-4o-mini"),
+    "data_query": ModelRole(model= "gpt-4.1-nano", streaming= True),
+    # Offline scripts: reminders & payment date predictions
+    "batch": ModelRole(model= "gpt-4o", timeout= 120),
+}
+
+
+def role_config(role: str) -> ModelRole:
+    if role not in ROLES:
+        raise ValueError(f"Unknown model role '{role}', expected one of {list(ROLES)}")
+
+    config = ROLES[role]
+    overrides: Dict[str, Any] = {}
+    for field, default in vars(config).items():
+        value = os.getenv(f"LLM_{role.upper()}_{field.upper()}")
+        if value is None:
+            continue
+        if isinstance(default, bool):
+            overrides[field] = value.lower() == "true"
+        elif field == "max_tokens":
+            overrides[field] = int(value) if value else None
+        else:
+            overrides[field] = type(default)(value)
+    return replace(config, **overrides)
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections= LLM_MAX_CONNECTIONS,
+        max_keepalive_connections= LLM_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry= LLM_KEEPALIVE_SECONDS,
+    )
+
+
+class LoopLocalTransport(httpx.AsyncBaseTransport):
+    """
+    Async transport keeping one connection pool per event loop. Pooled connections cannot outlive the loop
+    they were opened on, and the app runs every rerun on a new loop.
+    """
+
+    def __init__(self):
+        self._transports: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncHTTPTransport]" = weakref.WeakKeyDictionary()
+
+    def _transport(self) -> httpx.AsyncHTTPTransport:
+        loop = asyncio.get_running_loop()
+        transport = self._transports.get(loop)
+        if transport is None:
+            transport = httpx.AsyncHTTPTransport(limits= _limits())
+            self._transports[loop] = transport
+        return transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self._transport().handle_async_request(request)
+
+    async def aclose_loop(self) -> None:
+        transport = self._transports.pop(asyncio.get_running_loop(), None)
+        if transport is not None:
+            await transport.aclose()
+
+
+_timeout = httpx.Timeout(None, connect= LLM_CONNECT_TIMEOUT)
+http_client = httpx.Client(limits= _limits(), timeout= _timeout)
+async_transport = LoopLocalTransport()
+http_async_client = httpx.AsyncClient(transport= async_transport, timeout= _timeout)
+
+
+async def close_async_clients() -> None:
+    """
+    Closes the OpenAI connection pool of the running loop. Call before the loop shuts down.
+    """
+    await async_transport.aclose_loop()
+
+
+class ConcurrencyLimit:
+    """
+    Caps the calls in flight for a role, across threads for sync calls & per event loop for async calls.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._semaphore = threading.BoundedSemaphore(limit) if limit else None
+        self._async_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        if self._semaphore is None:
+            yield
+            return
+        with self._semaphore:
+            yield
+
+    @asynccontextmanager
+    async def aslot(self) -> AsyncIterator[None]:
+        if not self.limit:
+            yield
+            return
+        loop = asyncio.get_running_loop()
+        semaphore = self._async_semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._async_semaphores.setdefault(loop, asyncio.Semaphore(self.limit))
+        async with semaphore:
+            yield
+
+
+_limits_by_role: Dict[str, ConcurrencyLimit] = {}
+_limits_lock = threading.Lock()
+
+
+def concurrency_limit(role: str) -> ConcurrencyLimit:
+    with _limits_lock:
+        if role not in _limits_by_role:
+            _limits_by_role[role] = ConcurrencyLimit(role_config(role).max_concurrency)
+        return _limits_by_role[role]
+
+
+class RoleChatOpenAI(ChatOpenAI):
+    """
+    ChatOpenAI holding a slot of its role's concurrency limit for every request.
+    """
+    role: str = ""
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        with concurrency_limit(self.role).slot():
+            return super()._generate(messages, stop= stop, run_manager= run_manager, **kwargs)
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        async with concurrency_limit(self.role).aslot():
+            return await super()._agenerate(messages, stop= stop, run_manager= run_manager, **kwargs)
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        with concurrency_limit(self.role).slot():
+            yield from super()._stream(messages, stop= stop, run_manager= run_manager, **kwargs)
+
+    async def _astream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        async with concurrency_limit(self.role).aslot():
+            async for chunk in super()._astream(messages, stop= stop, run_manager= run_manager, **kwargs):
+                yield chunk
+
+
+_models: Dict[Any, RoleChatOpenAI] = {}
+_models_lock = threading.Lock()
+
+
+def get_chat_model(role: str, **overrides: Any) -> RoleChatOpenAI:
+    """
+    Returns the chat model of a role, shared by every caller asking for the same role & overrides.
+
+    Args:
+        role (str): One of ROLES.
+        **overrides: ModelRole fields to change for this caller, e.g. temperature= 0.5.
+    """
+    key = (role, tuple(sorted(overrides.items())))
+    with _models_lock:
+        if key in _models:
+            return _models[key]
+
+        config = replace(role_config(role), **overrides)
+        model = RoleChatOpenAI(
+            role= role,
+            model= config.model,
+            temperature= config.temperature,
+            max_tokens= config.max_tokens,
+            timeout= config.timeout,
+            max_retries= config.max_retries,
+            streaming= config.streaming,
+            api_key= SecretStr(os.getenv("OPENAI_API_KEY", "")),
+            http_client= http_client,
+            http_async_client= http_async_client,
+        )
+        _models[key] = model
+        return model
+
+
+_embeddings: Dict[str, OpenAIEmbeddings] = {}
+
+
+def get_embeddings(model: str = EMBEDDING_MODEL) -> OpenAIEmbeddings:
+    """
+    Returns the embedding model shared by the vector stores & RAG pipelines, on the pooled clients.
+    """
+    with _models_lock:
+        if model not in _embeddings:
+            _embeddings[model] = OpenAIEmbeddings(
+                model= model,
+                api_key= SecretStr(os.getenv("OPENAI_API_KEY", "")),
+                http_client= http_client,
+                http_async_client= http_async_client,
+            )
+        return _embeddings[model]
@@ -1,14 +1,85 @@
-import requests
+import os
+from typing import Dict, Any
 from models.loan import LoanStatementResponse
 from endpoints import Endpoints
+from services.cache import TTLCache
+from services import backend_client
 
-def fetch_loan_statement(customer_id: str) -> LoanStatementResponse:
+# Loan statements are cached per customer so repeat tool calls within a session are served from memory
+LOAN_STATEMENT_CACHE_TTL = float(os.getenv("LOAN_STATEMENT_CACHE_TTL", "300"))
+LOAN_STATEMENT_CACHE_SIZE = int(os.getenv("LOAN_STATEMENT_CACHE_SIZE", "512"))
+
+statement_cache: TTLCache[LoanStatementResponse] = TTLCache(
+    max_size= LOAN_STATEMENT_CACHE_SIZE,
+    ttl_seconds= LOAN_STATEMENT_CACHE_TTL,
+)
+
+
+def fetch_loan_statement(customer_id: str, force_refresh: bool = False) -> LoanStatementResponse:
+    """
+    Fetches the loan statement of a customer, serving it from the statement cache when possible.
+    The payment history of the returned statement is parsed & sorted by payment date. Cached statements
+    are shared between callers and must not be mutated.
+
+    Args:
+        customer_id (str): The customer whose statement is fetched.
+        force_refresh (bool): Bypass the cache & refetch the statement from the API.
+    """
+
+    if not force_refresh:
+        cached = statement_cache.get(customer_id)
+        if cached is not None:
+            return cached
 
     headers = {
-        "customerId": customer_id 
+        "customerId": customer_id
     }
 
-    response = requests.get(Endpoints.FETCH_LOAN_STATEMENT, headers=headers, verify= False)
+    response = backend_client.get(Endpoints.FETCH_LOAN_STATEMENT, headers=headers)
     response.raise_for_status()
-    data = response.json()
-    return LoanStatementResponse(**data)
\ No newline at end of file
+    return cache_loan_statement(customer_id, response.json())
+
+
+async def afetch_loan_statement(customer_id: str, force_refresh: bool = False) -> LoanStatementResponse:
+    """
+    Async counterpart of `fetch_loan_statement` sharing the same statement cache.
+    """
+
+    if not force_refresh:
+        cached = statement_cache.get(customer_id)
+        if cached is not None:
+            return cached
+
+    headers = {
+        "customerId": customer_id
+    }
+
+    response = await backend_client.aget(Endpoints.FETCH_LOAN_STATEMENT, headers=headers)
+    response.raise_for_status()
+    return cache_loan_statement(customer_id, response.json())
+
+
+def cache_loan_statement(customer_id: str, data: Dict[str, Any]) -> LoanStatementResponse:
+    statement = LoanStatementResponse(**data)
+
+    if statement.paymentHistory:
+        statement.paymentHistory.sort(key= lambda p: p.paymentDate)
+    if statement.success:
+        statement_cache.set(customer_id, statement)
+
+    return statement
+
+
+def invalidate_loan_statement(customer_id: str) -> bool:
+    """
+    Drops the cached statement of a customer, e.g. after a payment or when a new chat session starts.
+    """
+    return statement_cache.invalidate(customer_id)
+
+
+def clear_loan_statement_cache() -> None:
+    statement_cache.clear()
+
+
+def loan_statement_cache_stats() -> Dict[str, Any]:
+    return statement_cache.stats()
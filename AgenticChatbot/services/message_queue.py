@@ -0,0 +1,240 @@
+import os
+import json
+import time
+import asyncio
+import sqlite3
+import threading
+from collections import defaultdict
+from concurrent.futures import Future
+from typing import (
+    Any,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+)
+
+from dotenv import load_dotenv, find_dotenv
+
+from services.background import run_in_background
+from services.chat_logic import add_messages_to_chat
+
+load_dotenv(find_dotenv())
+
+# Chat messages are written to a local queue & sent to the backend in batches, one request per chat
+MESSAGE_QUEUE_ENABLED = os.getenv("MESSAGE_QUEUE_ENABLED", "true").lower() == "true"
+MESSAGE_QUEUE_PATH = os.getenv("MESSAGE_QUEUE_PATH", "./message_queue.sqlite")
+MESSAGE_QUEUE_FLUSH_INTERVAL = float(os.getenv("MESSAGE_QUEUE_FLUSH_INTERVAL", "2"))
+MESSAGE_QUEUE_BATCH_SIZE = int(os.getenv("MESSAGE_QUEUE_BATCH_SIZE", "50"))
+# A chat whose send failed is retried after flush interval x 2^(failures - 1) seconds, at most MESSAGE_QUEUE_MAX_BACKOFF
+MESSAGE_QUEUE_MAX_BACKOFF = float(os.getenv("MESSAGE_QUEUE_MAX_BACKOFF", "300"))
+# Messages are kept until the backend stored them or they are this old, a week by default
+MESSAGE_QUEUE_MAX_AGE = float(os.getenv("MESSAGE_QUEUE_MAX_AGE", str(7 * 24 * 3600)))
+
+
+class SqliteMessageStore:
+    """
+    Messages waiting to be sent, in the order they were queued. Rows are deleted once the backend stored them,
+    or once they are older than the queue's maximum age.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread= False)
+        with self._lock, self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS pending_messages (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    chat_id TEXT NOT NULL,
+                    message TEXT NOT NULL,
+                    queued_at REAL NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0
+                )
+                """
+            )
+
+    def append(self, chat_id: str, messages: List[Dict[str, Any]]) -> None:
+        now = time.time()
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "INSERT INTO pending_messages (chat_id, message, queued_at) VALUES (?, ?, ?)",
+                [(chat_id, json.dumps(message), now) for message in messages],
+            )
+
+    def pending(self) -> Dict[str, List[Tuple[int, Dict[str, Any]]]]:
+        """
+        Returns the queued messages grouped by chat, each with its row id.
+        """
+        with self._lock:
+            rows = self.conn.execute("SELECT id, chat_id, message FROM pending_messages ORDER BY id").fetchall()
+        chats: Dict[str, List[Tuple[int, Dict[str, Any]]]] = defaultdict(list)
+        for row_id, chat_id, message in rows:
+            chats[chat_id].append((row_id, json.loads(message)))
+        return chats
+
+    def count(self) -> int:
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM pending_messages").fetchone()[0]
+
+    def remove(self, row_ids: List[int]) -> None:
+        with self._lock, self.conn:
+            self.conn.executemany("DELETE FROM pending_messages WHERE id = ?", [(row_id,) for row_id in row_ids])
+
+    def failures(self) -> Dict[str, int]:
+        """
+        Returns the failed sends of every chat with queued messages, counted on its most retried message.
+        """
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT chat_id, MAX(attempts) FROM pending_messages GROUP BY chat_id HAVING MAX(attempts) > 0"
+            ).fetchall()
+        return dict(rows)
+
+    def record_failure(self, row_ids: List[int]) -> None:
+        with self._lock, self.conn:
+            self.conn.executemany("UPDATE pending_messages SET attempts = attempts + 1 WHERE id = ?", [(row_id,) for row_id in row_ids])
+
+    def expire(self, max_age: float) -> int:
+        """
+        Drops the messages queued more than `max_age` seconds ago. Returns the number of messages dropped.
+        """
+        with self._lock, self.conn:
+            return self.conn.execute("DELETE FROM pending_messages WHERE queued_at < ?", (time.time() - max_age,)).rowcount
+
+
+class MessageQueue:
+    """
+    Write-behind queue of chat messages. Turns are stored locally as they end, and a flusher on the background worker
+    sends everything queued for a chat in one request, every `flush_interval` seconds or as soon as `batch_size`
+    messages are waiting. Messages left by a previous run are sent by the first flush.
+
+    A chat whose send fails is skipped by the following flushes for an exponentially growing delay, so an outage
+    of the backend costs a few requests per chat & its messages are sent once it is back.
+    """
+
+    def __init__(
+        self,
+        store: SqliteMessageStore,
+        flush_interval: float = MESSAGE_QUEUE_FLUSH_INTERVAL,
+        batch_size: int = MESSAGE_QUEUE_BATCH_SIZE,
+        max_backoff: float = MESSAGE_QUEUE_MAX_BACKOFF,
+        max_age: float = MESSAGE_QUEUE_MAX_AGE,
+    ):
+        self.store = store
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_backoff = max_backoff
+        self.max_age = max_age
+        self._queued = store.count()
+        # Consecutive failed sends & the time of the next attempt per chat, only touched on the worker loop.
+        # Failures of a previous run carry over, its messages are sent by the first flush & back off from there
+        self._failures: Dict[str, int] = store.failures()
+        self._retry_at: Dict[str, float] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._flush_lock = asyncio.Lock()
+        self.metrics = {"queued": 0, "sent": 0, "requests": 0, "failedRequests": 0, "dropped": 0}
+
+    def start(self) -> None:
+        run_in_background(self._run, retries= 0, description= "Flushing the message queue")
+
+    async def _run(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout= self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"[EXCEPTION] Message queue flush failed: {e}")
+
+    def enqueue(self, chat_id: str, messages: List[Dict[str, Any]]) -> None:
+        """
+        Stores the messages of a turn for the next flush. Safe to call from any thread.
+        """
+        if not messages:
+            return
+        self.store.append(chat_id, messages)
+        self.metrics["queued"] += len(messages)
+        self._queued += len(messages)
+        if self._queued >= self.batch_size and self._loop is not None:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    async def aenqueue(self, chat_id: str, messages: List[Dict[str, Any]]) -> None:
+        await asyncio.to_thread(self.enqueue, chat_id, messages)
+
+    async def flush(self) -> int:
+        """
+        Sends the queued messages of every chat not waiting out a backoff, one request each.
+        Returns the number of messages sent.
+        """
+        async with self._flush_lock:
+            expired = await asyncio.to_thread(self.store.expire, self.max_age)
+            if expired:
+                self.metrics["dropped"] += expired
+                print(f"[ERROR] Dropped {expired} queued messages older than {self.max_age:.0f}s")
+
+            chats = await asyncio.to_thread(self.store.pending)
+            self._queued = sum(len(rows) for rows in chats.values())
+            now = time.monotonic()
+            due = {chat_id: rows for chat_id, rows in chats.items() if self._retry_at.get(chat_id, 0) <= now}
+            if not due:
+                return 0
+
+            results = await asyncio.gather(*(self._send(chat_id, rows) for chat_id, rows in due.items()))
+            sent = sum(results)
+            self._queued -= sent
+            return sent
+
+    def flush_in_background(self) -> "Future[int]":
+        """
+        Flushes on the background worker without waiting for the timer, e.g. before shutting down.
+        """
+        return run_in_background(self.flush, retries= 0, description= "Flushing the message queue")
+
+    async def _send(self, chat_id: str, rows: List[Tuple[int, Dict[str, Any]]]) -> int:
+        row_ids = [row_id for row_id, _ in rows]
+        self.metrics["requests"] += 1
+        if await add_messages_to_chat(chat_id, [message for _, message in rows]):
+            await asyncio.to_thread(self.store.remove, row_ids)
+            self._failures.pop(chat_id, None)
+            self._retry_at.pop(chat_id, None)
+            self.metrics["sent"] += len(rows)
+            return len(rows)
+
+        self.metrics["failedRequests"] += 1
+        await asyncio.to_thread(self.store.record_failure, row_ids)
+        failures = self._failures.get(chat_id, 0) + 1
+        delay = min(self.flush_interval * 2 ** (failures - 1), self.max_backoff)
+        self._failures[chat_id] = failures
+        self._retry_at[chat_id] = time.monotonic() + delay
+        print(f"[EXCEPTION] Sending {len(rows)} messages of chat {chat_id} failed {failures} times, retrying in {delay:.0f}s")
+        return 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.metrics, "pending": self._queued}
+
+
+_queue: Optional[MessageQueue] = None
+_queue_lock = threading.Lock()
+
+
+def get_message_queue() -> MessageQueue:
+    """
+    Returns the process wide queue, started on first use. The app gets it at startup so messages left
+    by a previous run are replayed.
+    """
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = MessageQueue(SqliteMessageStore(MESSAGE_QUEUE_PATH))
+            _queue.start()
+        return _queue
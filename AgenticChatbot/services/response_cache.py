@@ -0,0 +1,301 @@
+import os
+import json
+import time
+import asyncio
+import hashlib
+import sqlite3
+import threading
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+)
+
+import numpy as np
+from dotenv import load_dotenv, find_dotenv
+
+from services.cache import TTLCache
+from services.text_embedding import HashedNgramEmbedder
+
+load_dotenv(find_dotenv())
+
+# Responses of the helper LLM calls (titles, IVR messages, summaries, loan answers) are reused for identical prompts
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+RESPONSE_CACHE_PATH = os.getenv("RESPONSE_CACHE_PATH", "./response_cache.sqlite")
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", str(7 * 24 * 3600)))
+RESPONSE_CACHE_MEMORY_ENTRIES = int(os.getenv("RESPONSE_CACHE_MEMORY_ENTRIES", "512"))
+RESPONSE_CACHE_DISK_ENTRIES = int(os.getenv("RESPONSE_CACHE_DISK_ENTRIES", "20000"))
+
+# Stored prompts kept embedded in memory per namespace for the similarity tier
+SIMILARITY_INDEX_ENTRIES = 2000
+
+# Expired & surplus rows are pruned once every this many stores
+PRUNE_EVERY = 100
+
+
+def template_fingerprint(template: Any) -> str:
+    """
+    Short hash of a prompt template's text, prompt templates are hashed through their pretty representation.
+    """
+    text = template.pretty_repr() if hasattr(template, "pretty_repr") else str(template)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:12]
+
+
+def prompt_key(namespace: str, model: str, inputs: Dict[str, Any]) -> Tuple[str, str]:
+    """
+    Returns the canonical text of a prompt's inputs & its hash, which also covers the namespace & model.
+    """
+    text = json.dumps(inputs, sort_keys= True, default= str, ensure_ascii= False)
+    digest = hashlib.sha256(f"{namespace}\x00{model}\x00{text}".encode("utf-8")).hexdigest()
+    return text, digest
+
+
+class SqliteResponseStore:
+    """
+    On-disk tier shared by every response cache of the process, with TTL & size bounded eviction per namespace.
+    """
+
+    def __init__(self, path: str, ttl_seconds: float = RESPONSE_CACHE_TTL, max_entries: int = RESPONSE_CACHE_DISK_ENTRIES):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._stores = 0
+        self.conn = sqlite3.connect(path, check_same_thread= False)
+        with self._lock, self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS response_cache (
+                    key TEXT PRIMARY KEY,
+                    namespace TEXT NOT NULL,
+                    prompt TEXT NOT NULL,
+                    response TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+                """
+            )
+            self.conn.execute("CREATE INDEX IF NOT EXISTS response_cache_namespace ON response_cache (namespace, accessed_at)")
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock, self.conn:
+            row = self.conn.execute(
+                "SELECT response FROM response_cache WHERE key = ? AND created_at >= ?", (key, now - self.ttl_seconds)
+            ).fetchone()
+            if row is not None:
+                self.conn.execute("UPDATE response_cache SET accessed_at = ? WHERE key = ?", (now, key))
+        return row[0] if row else None
+
+    def put(self, key: str, namespace: str, prompt: str, response: str) -> None:
+        now = time.time()
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO response_cache VALUES (?, ?, ?, ?, ?, ?)", (key, namespace, prompt, response, now, now)
+            )
+            self._stores += 1
+            if self._stores % PRUNE_EVERY == 0:
+                self._prune(namespace, now)
+
+    def _prune(self, namespace: str, now: float) -> None:
+        self.conn.execute("DELETE FROM response_cache WHERE created_at < ?", (now - self.ttl_seconds,))
+        self.conn.execute(
+            """
+            DELETE FROM response_cache WHERE namespace = ? AND key NOT IN (
+                SELECT key FROM response_cache WHERE namespace = ? ORDER BY accessed_at DESC LIMIT ?
+            )
+            """,
+            (namespace, namespace, self.max_entries),
+        )
+
+    def recent(self, namespace: str, limit: int) -> List[Tuple[str, str, str]]:
+        with self._lock:
+            return self.conn.execute(
+                "SELECT key, prompt, response FROM response_cache WHERE namespace = ? AND created_at >= ? ORDER BY accessed_at DESC LIMIT ?",
+                (namespace, time.time() - self.ttl_seconds, limit),
+            ).fetchall()
+
+    def drop_namespaces(self, prefix: str, keep: str) -> int:
+        """
+        Deletes the responses of every namespace starting with `prefix` except `keep`, returns the rows deleted.
+        """
+        with self._lock, self.conn:
+            return self.conn.execute(
+                "DELETE FROM response_cache WHERE substr(namespace, 1, ?) = ? AND namespace != ?", (len(prefix), prefix, keep)
+            ).rowcount
+
+    def count(self, namespace: str) -> int:
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM response_cache WHERE namespace = ?", (namespace,)).fetchone()[0]
+
+
+_store: Optional[SqliteResponseStore] = None
+_store_lock = threading.Lock()
+
+
+def get_response_store() -> SqliteResponseStore:
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = SqliteResponseStore(RESPONSE_CACHE_PATH)
+        return _store
+
+
+class ResponseCache:
+    """
+    Cache of one helper call's responses: an in-process LRU, then the SQLite store, then optionally the most similar
+    stored prompt. Responses are stored under the namespace & the fingerprint of the call's prompt template, so a
+    prompt edit starts from an empty cache. The similarity tier keeps digits apart, yet prompts differing in a few
+    words still match, so it only suits inputs that carry no customer data.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        model: str,
+        similarity_threshold: Optional[float] = None,
+        store: Optional[SqliteResponseStore] = None,
+        memory_entries: int = RESPONSE_CACHE_MEMORY_ENTRIES,
+        ttl_seconds: float = RESPONSE_CACHE_TTL,
+        template: Optional[Any] = None,
+    ):
+        self.namespace = namespace
+        self.partition = f"{namespace}:{template_fingerprint(template)}" if template is not None else namespace
+        self.model = model
+        self.similarity_threshold = similarity_threshold
+        self._store = store
+        self.memory: TTLCache[str] = TTLCache(max_size= memory_entries, ttl_seconds= ttl_seconds)
+        self.embedder = HashedNgramEmbedder(dimensions= 1024, mask_digits= False) if similarity_threshold is not None else None
+        # Ring buffer of the embedded prompts, filled from the store on first use
+        self._index_lock = threading.Lock()
+        self._index_loaded = False
+        self._index_vectors: Optional[np.ndarray] = None
+        self._index_responses: List[Optional[str]] = [None] * SIMILARITY_INDEX_ENTRIES
+        self._index_size = 0
+        self._index_next = 0
+        self.metrics = {"memoryHits": 0, "diskHits": 0, "similarHits": 0, "misses": 0}
+
+    @property
+    def store(self) -> SqliteResponseStore:
+        if self._store is None:
+            self._store = get_response_store()
+        return self._store
+
+    def _load_index(self) -> None:
+        if self._index_loaded:
+            return
+        self._index_loaded = True
+        self._index_vectors = np.zeros((SIMILARITY_INDEX_ENTRIES, self.embedder.dimensions), dtype= np.float32)
+        for _, prompt, response in reversed(self.store.recent(self.partition, SIMILARITY_INDEX_ENTRIES)):
+            self._add_to_index(prompt, response)
+
+    def _add_to_index(self, prompt: str, response: str) -> None:
+        self._index_vectors[self._index_next] = self.embedder.embed(prompt)
+        self._index_responses[self._index_next] = response
+        self._index_next = (self._index_next + 1) % SIMILARITY_INDEX_ENTRIES
+        self._index_size = min(self._index_size + 1, SIMILARITY_INDEX_ENTRIES)
+
+    def _most_similar(self, prompt: str) -> Optional[str]:
+        with self._index_lock:
+            self._load_index()
+            if not self._index_size:
+                return None
+            similarities = self._index_vectors[:self._index_size] @ self.embedder.embed(prompt)
+            best = int(np.argmax(similarities))
+            return self._index_responses[best] if similarities[best] >= self.similarity_threshold else None
+
+    def lookup(self, inputs: Dict[str, Any]) -> Tuple[str, str, Optional[str]]:
+        """
+        Returns the prompt text, its key & the cached response, None on a miss.
+        """
+        prompt, key = prompt_key(self.partition, self.model, inputs)
+        response = self.memory.get(key)
+        if response is not None:
+            self.metrics["memoryHits"] += 1
+            return prompt, key, response
+
+        response = self.store.get(key)
+        if response is not None:
+            self.metrics["diskHits"] += 1
+        elif self.similarity_threshold is not None:
+            response = self._most_similar(prompt)
+            if response is not None:
+                self.metrics["similarHits"] += 1
+
+        if response is None:
+            self.metrics["misses"] += 1
+        else:
+            self.memory.set(key, response)
+        return prompt, key, response
+
+    def store_response(self, prompt: str, key: str, response: str) -> None:
+        self.memory.set(key, response)
+        self.store.put(key, self.partition, prompt, response)
+        if self.similarity_threshold is not None:
+            with self._index_lock:
+                self._load_index()
+                self._add_to_index(prompt, response)
+
+    def get_or_compute(self, inputs: Dict[str, Any], compute: Callable[[], str]) -> str:
+        if not RESPONSE_CACHE_ENABLED:
+            return compute()
+
+        prompt, key, response = self.lookup(inputs)
+        if response is None:
+            response = compute()
+            self.store_response(prompt, key, response)
+        return response
+
+    async def aget_or_compute(self, inputs: Dict[str, Any], compute: Callable[[], Awaitable[str]]) -> str:
+        if not RESPONSE_CACHE_ENABLED:
+            return await compute()
+
+        # Memory hits are answered on the loop, the SQLite tiers run on a worker thread
+        _, key = prompt_key(self.partition, self.model, inputs)
+        response = self.memory.get(key)
+        if response is not None:
+            self.metrics["memoryHits"] += 1
+            return response
+
+        prompt, key, response = await asyncio.to_thread(self.lookup, inputs)
+        if response is None:
+            response = await compute()
+            await asyncio.to_thread(self.store_response, prompt, key, response)
+        return response
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = sum(self.metrics.values())
+        hits = lookups - self.metrics["misses"]
+        return {
+            **self.metrics,
+            "lookups": lookups,
+            "hitRate": hits / lookups if lookups else 0.0,
+            "memoryEntries": len(self.memory),
+        }
+
+
+_caches: Dict[str, ResponseCache] = {}
+
+
+def response_cache(namespace: str, model: str, similarity_threshold: Optional[float] = None, template: Optional[Any] = None) -> ResponseCache:
+    """
+    Returns the shared cache of a helper call, `template` being the call's prompt template.
+    RESPONSE_CACHE_<NAMESPACE>_SIMILARITY overrides the similarity threshold, e.g. RESPONSE_CACHE_IVR_SIMILARITY=0.95,
+    an empty value disables the similarity tier.
+    """
+    if namespace not in _caches:
+        threshold = os.getenv(f"RESPONSE_CACHE_{namespace.upper()}_SIMILARITY")
+        if threshold is not None:
+            similarity_threshold = float(threshold) if threshold else None
+        _caches[namespace] = ResponseCache(namespace, model, similarity_threshold= similarity_threshold, template= template)
+    return _caches[namespace]
+
+
+def response_cache_stats() -> Dict[str, Dict[str, Any]]:
+    return {namespace: cache.stats() for namespace, cache in _caches.items()}
@@ -0,0 +1,111 @@
+import os
+import json
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+
+from services.bm25 import BM25, tokenize
+
+
+def sparse_index_path(persist_directory: str) -> str:
+    """
+    The sparse index of a Qdrant collection is kept next to its storage folder, e.g. ./qdrant/Profile.sparse.sqlite.
+    """
+    return os.path.normpath(persist_directory) + ".sparse.sqlite"
+
+
+class SparseIndex:
+    """
+    BM25 index of a collection's chunks, written at ingestion alongside the dense vectors & keyed by the same
+    point ids. The chunks are stored in SQLite, the inverted index is built in memory on first search & again
+    whenever another connection, e.g. an ingestion run, changed the chunks.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread= False)
+        with self._lock, self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS chunks (
+                    id TEXT PRIMARY KEY,
+                    hash_code TEXT,
+                    page_content TEXT NOT NULL,
+                    metadata TEXT NOT NULL
+                )
+                """
+            )
+            self.conn.execute("CREATE INDEX IF NOT EXISTS chunks_hash_code ON chunks (hash_code)")
+        self._bm25: Optional[BM25] = None
+        self._ids: List[str] = []
+        self._chunks: List[Tuple[str, Dict[str, Any]]] = []
+        self._data_version: Optional[int] = None
+
+    def add(self, ids: Sequence[Any], documents: Sequence[Document]) -> None:
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO chunks VALUES (?, ?, ?, ?)",
+                [
+                    (str(id), doc.metadata.get("HashCode"), doc.page_content, json.dumps(doc.metadata, default= str))
+                    for id, doc in zip(ids, documents)
+                ],
+            )
+            self._bm25 = None
+
+    def delete_source(self, hash_code: str) -> int:
+        """
+        Removes the chunks of a source document, returns the number removed.
+        """
+        with self._lock, self.conn:
+            self._bm25 = None
+            return self.conn.execute("DELETE FROM chunks WHERE hash_code = ?", (hash_code,)).rowcount
+
+    def count(self) -> int:
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+
+    def _load(self) -> BM25:
+        # data_version changes when another connection commits
+        data_version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+        if self._bm25 is None or data_version != self._data_version:
+            rows = self.conn.execute("SELECT id, page_content, metadata FROM chunks ORDER BY rowid").fetchall()
+            self._ids = [row[0] for row in rows]
+            self._chunks = [(row[1], json.loads(row[2])) for row in rows]
+            self._bm25 = BM25([tokenize(content) for content, _ in self._chunks])
+            self._data_version = data_version
+        return self._bm25
+
+    def search(self, query: str, k: int = 10) -> List[Tuple[Document, float]]:
+        """
+        Returns up to `k` chunks sharing terms with the query, best first, with their BM25 scores.
+        """
+        with self._lock:
+            scores = self._load().scores(tokenize(query))
+            top = [i for i in np.argsort(-scores, kind= "stable")[:k] if scores[i] > 0]
+            return [
+                (Document(page_content= self._chunks[i][0], metadata= {**self._chunks[i][1], "_id": self._ids[i]}), float(scores[i]))
+                for i in top
+            ]
+
+    def close(self) -> None:
+        with self._lock:
+            self.conn.close()
+
+
+def open_sparse_index(persist_directory: str) -> Optional[SparseIndex]:
+    """
+    Returns the sparse index of a collection, None when its ingestion did not build one.
+    """
+    path = sparse_index_path(persist_directory)
+    if not os.path.exists(path):
+        return None
+    index = SparseIndex(path)
+    if not index.count():
+        index.close()
+        return None
+    return index
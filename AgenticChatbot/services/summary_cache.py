@@ -0,0 +1,100 @@
+import os
+import json
+import asyncio
+import hashlib
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from dotenv import load_dotenv, find_dotenv
+
+from services.cache import TTLCache
+from services.response_cache import SqliteResponseStore
+
+load_dotenv(find_dotenv())
+
+SUMMARY_CACHE_MEMORY_ENTRIES = int(os.getenv("SUMMARY_CACHE_MEMORY_ENTRIES", "2000"))
+SUMMARY_CACHE_TTL = float(os.getenv("SUMMARY_CACHE_TTL", str(8 * 24 * 3600)))
+# Summaries outlive restarts in this SQLite file, an empty path keeps them in memory only
+SUMMARY_CACHE_PATH = os.getenv("SUMMARY_CACHE_PATH", "./summary_cache.sqlite")
+SUMMARY_CACHE_DISK_ENTRIES = int(os.getenv("SUMMARY_CACHE_DISK_ENTRIES", "50000"))
+
+NAMESPACE = "chat_summary"
+
+
+def chat_version(customer_id: str, chat: Dict[str, Any]) -> Tuple[str, str, int, str]:
+    """
+    Identifies a chat's content: a message added to the chat changes its version & so misses the cached summary.
+    """
+    return customer_id, chat["chatId"], chat.get("messageCount", -1), chat.get("lastMessageAt") or ""
+
+
+class SummaryCache:
+    """
+    Chat summaries keyed by customer, chat & chat version. A bounded LRU with TTL in memory,
+    backed by an optional SQLite store so the summaries survive restarts.
+    """
+
+    def __init__(
+        self,
+        memory_entries: int = SUMMARY_CACHE_MEMORY_ENTRIES,
+        ttl_seconds: float = SUMMARY_CACHE_TTL,
+        store: Optional[SqliteResponseStore] = None,
+    ):
+        self.memory: TTLCache[str] = TTLCache(max_size= memory_entries, ttl_seconds= ttl_seconds)
+        self.store = store
+        self.metrics = {"diskHits": 0, "stores": 0}
+
+    @staticmethod
+    def key(customer_id: str, chat: Dict[str, Any]) -> Tuple[str, str]:
+        version = json.dumps(chat_version(customer_id, chat))
+        return version, hashlib.sha256(f"{NAMESPACE}\x00{version}".encode("utf-8")).hexdigest()
+
+    def get(self, customer_id: str, chat: Dict[str, Any]) -> Optional[str]:
+        _, key = self.key(customer_id, chat)
+        summary = self.memory.get(key)
+        if summary is None and self.store is not None:
+            summary = self.store.get(key)
+            if summary is not None:
+                self.metrics["diskHits"] += 1
+                self.memory.set(key, summary)
+        return summary
+
+    def set(self, customer_id: str, chat: Dict[str, Any], summary: str) -> None:
+        version, key = self.key(customer_id, chat)
+        self.memory.set(key, summary)
+        self.metrics["stores"] += 1
+        if self.store is not None:
+            self.store.put(key, NAMESPACE, version, summary)
+
+    async def aget(self, customer_id: str, chat: Dict[str, Any]) -> Optional[str]:
+        if self.store is None:
+            return self.get(customer_id, chat)
+        return await asyncio.to_thread(self.get, customer_id, chat)
+
+    async def aset(self, customer_id: str, chat: Dict[str, Any], summary: str) -> None:
+        if self.store is None:
+            self.set(customer_id, chat, summary)
+            return
+        await asyncio.to_thread(self.set, customer_id, chat, summary)
+
+    def clear(self) -> None:
+        """
+        Empties the in-memory tier, the SQLite store keeps its summaries.
+        """
+        self.memory.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.memory.stats(), **self.metrics, "persistent": self.store is not None}
+
+
+_summary_cache: Optional[SummaryCache] = None
+_summary_cache_lock = threading.Lock()
+
+
+def get_summary_cache() -> SummaryCache:
+    global _summary_cache
+    with _summary_cache_lock:
+        if _summary_cache is None:
+            store = SqliteResponseStore(SUMMARY_CACHE_PATH, SUMMARY_CACHE_TTL, SUMMARY_CACHE_DISK_ENTRIES) if SUMMARY_CACHE_PATH else None
+            _summary_cache = SummaryCache(store= store)
+        return _summary_cache
@@ -0,0 +1,41 @@
+import re
+import zlib
+
+import numpy as np
+
+
+class HashedNgramEmbedder:
+    """
+    Embeds text as L2 normalised, hashed counts of its character 3-5 grams & words.
+    Needs no model download or API call, an utterance embeds in a few microseconds.
+    With `mask_digits`, every number reads as 0, so utterances differing only in ids or amounts embed alike.
+    """
+
+    def __init__(self, dimensions: int = 4096, ngram_range: tuple = (3, 5), word_weight: float = 2.0, mask_digits: bool = True):
+        self.dimensions = dimensions
+        self.ngram_range = ngram_range
+        self.word_weight = word_weight
+        self.mask_digits = mask_digits
+
+    def normalise(self, text: str) -> str:
+        text = text.lower()
+        if self.mask_digits:
+            text = re.sub(r"\d+", "0", text)
+        return " ".join(re.findall(r"[a-z0-9@.]+", text))
+
+    def _index(self, feature: str) -> int:
+        return zlib.crc32(feature.encode("utf-8")) % self.dimensions
+
+    def embed(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dimensions, dtype= np.float32)
+        text = self.normalise(text)
+        padded = f" {text} "
+        for n in range(self.ngram_range[0], self.ngram_range[1] + 1):
+            for i in range(len(padded) - n + 1):
+                vector[self._index(padded[i:i + n])] += 1.0
+        for word in text.split():
+            vector[self._index(f"w:{word}")] += self.word_weight
+
+        vector = np.log1p(vector)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
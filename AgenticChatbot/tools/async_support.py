@@ -0,0 +1,17 @@
+from typing import Awaitable, Callable, TypeVar
+from langchain_core.tools import StructuredTool
+
+CoroutineFunction = TypeVar("CoroutineFunction", bound= Callable[..., Awaitable])
+
+
+def async_implementation(sync_tool: StructuredTool) -> Callable[[CoroutineFunction], CoroutineFunction]:
+    """
+    Registers the decorated coroutine as the implementation used when `sync_tool` is awaited (`ainvoke`).
+    The coroutine must accept the same arguments as the sync tool, including injected ones.
+    The tool's name, description & schema keep coming from the sync definition.
+    """
+    def decorator(coroutine: CoroutineFunction) -> CoroutineFunction:
+        sync_tool.coroutine = coroutine
+        return coroutine
+
+    return decorator
@@ -2,7 +2,8 @@ from langchain_core.tools import tool
 from langchain_core.messages import ToolMessage
 from endpoints import Endpoints
 from typing import Union
-import requests
+from services import backend_client
+from tools.async_support import async_implementation
 import certifi
 import ssl
 import urllib3
@@ -18,9 +19,19 @@ def check_customer(customer_id: str= "", SSN: str= "") -> str:
         SSN (str): The Social Security Number to validate. 
     """
 
-    context = ssl.create_default_context(cafile= certifi.where())
     headers = {"customerId": customer_id, "SSN": SSN}
-    response = requests.get(Endpoints.CHECK_CUSTOMER, headers= headers, verify= False)
+    response = backend_client.get(Endpoints.CHECK_CUSTOMER, headers= headers)
+    return check_customer_result(response)
+
+
+@async_implementation(check_customer)
+async def acheck_customer(customer_id: str= "", SSN: str= "") -> str:
+    headers = {"customerId": customer_id, "SSN": SSN}
+    response = await backend_client.aget(Endpoints.CHECK_CUSTOMER, headers= headers)
+    return check_customer_result(response)
+
+
+def check_customer_result(response) -> str:
     data = response.json()
 
     if response.status_code == 200:
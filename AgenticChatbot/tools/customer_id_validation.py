@@ -10,7 +10,8 @@ from langchain_core.tools import tool, InjectedToolCallId
 from langchain_core.messages.tool import ToolMessage
 from langgraph.prebuilt import InjectedState
 from langgraph.types import Command
-import requests
+from services import backend_client
+from tools.async_support import async_implementation
 import certifi
 import ssl
 import urllib3
@@ -31,10 +32,21 @@ def validate_customer_id(customer_id: str, tool_call_id: Annotated[str, Injected
 
     print(f"Validating customer id {customer_id}")
 
-    context = ssl.create_default_context(cafile= certifi.where())
     headers = {"customerId": customer_id}
-    response = requests.get(Endpoints.GET_CUSTOMER_BY_ID, headers= headers, verify= False)
+    response = backend_client.get(Endpoints.GET_CUSTOMER_BY_ID, headers= headers)
+    return validation_command(response, tool_call_id)
 
+
+@async_implementation(validate_customer_id)
+async def avalidate_customer_id(customer_id: str, tool_call_id: Annotated[str, InjectedToolCallId], state: Annotated[Dict[str, Any], InjectedState]) -> Command:
+    print(f"Validating customer id {customer_id}")
+
+    headers = {"customerId": customer_id}
+    response = await backend_client.aget(Endpoints.GET_CUSTOMER_BY_ID, headers= headers)
+    return validation_command(response, tool_call_id)
+
+
+def validation_command(response, tool_call_id: str) -> Command:
     if response.status_code == 200:
         customer = Customer(**response.json()['customer'])
         tool_content = f"The customer was succesfully validated. Name: {customer.customerName} with CustomerId: {customer.customerId}"
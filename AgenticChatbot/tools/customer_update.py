@@ -11,7 +11,8 @@ from langchain_core.tools import tool, InjectedToolCallId
 from langchain_core.messages.tool import ToolMessage
 from langgraph.prebuilt import InjectedState
 from langgraph.types import Command
-import requests
+from services import backend_client
+from tools.async_support import async_implementation
 import certifi
 import ssl
 import urllib3
@@ -30,16 +31,25 @@ def update_customer_email(customer_id: str, email_address: str, tool_call_id: An
         state: A state object containing relevant metadata that serves as short-term memory checkpointer for the agent
     """
 
-    context = ssl.create_default_context(cafile= certifi.where())
     headers = {"customerId": customer_id, "newEmailAddress": email_address}
-    response = requests.post(Endpoints.UPDATE_CUSTOMER_EMAIL, headers= headers, verify= False)
+    response = backend_client.post(Endpoints.UPDATE_CUSTOMER_EMAIL, headers= headers)
+    return email_update_command(response, tool_call_id)
 
+
+@async_implementation(update_customer_email)
+async def aupdate_customer_email(customer_id: str, email_address: str, tool_call_id: Annotated[str, InjectedToolCallId], state: Annotated[Dict[str, Any], InjectedState]) -> Command:
+    headers = {"customerId": customer_id, "newEmailAddress": email_address}
+    response = await backend_client.apost(Endpoints.UPDATE_CUSTOMER_EMAIL, headers= headers)
+    return email_update_command(response, tool_call_id)
+
+
+def email_update_command(response, tool_call_id: str) -> Command:
     if response.status_code == 202:
         customer = Customer(**response.json()['customer'])
         tool_content = f"The customer email for Id {customer.customerId} has been updated to {customer.emailAddress}"
         tool_message = ToolMessage(content= tool_content, tool_call_id= tool_call_id)
         command = Command(update= {
-            "messages": state['messages'] + [tool_message],
+            "messages": [tool_message],
             "customer": customer.model_dump(mode= 'json'),
         })
     else:
@@ -48,7 +58,7 @@ def update_customer_email(customer_id: str, email_address: str, tool_call_id: An
         tool_content = f"The customer email could not be updated. Status code: {status}. Errors: {errors}"
         tool_message = ToolMessage(content= tool_content, tool_call_id= tool_call_id)
         command = Command(update= {
-            "messages": state["messages"] + [tool_message]
+            "messages": [tool_message]
         })
         
     return command
@@ -67,18 +77,27 @@ def update_customer_payment_reminder(customer_id: str, payment_reminder: bool, t
         state: A state object containing relevant metadata that serves as short-term memory checkpointer for the agent
     """
 
-    context = ssl.create_default_context(cafile= certifi.where())
     headers = {"customerId": customer_id, "newPaymentReminder": "true" if payment_reminder else "false"}
     print(headers)
-    response = requests.post(Endpoints.UPDATE_CUSTOMER_PAYMENT_REMINDER, headers= headers, verify= False)
+    response = backend_client.post(Endpoints.UPDATE_CUSTOMER_PAYMENT_REMINDER, headers= headers)
+    return payment_reminder_update_command(response, tool_call_id)
+
+
+@async_implementation(update_customer_payment_reminder)
+async def aupdate_customer_payment_reminder(customer_id: str, payment_reminder: bool, tool_call_id: Annotated[str, InjectedToolCallId], state: Annotated[Dict[str, Any], InjectedState]) -> Command:
+    headers = {"customerId": customer_id, "newPaymentReminder": "true" if payment_reminder else "false"}
+    response = await backend_client.apost(Endpoints.UPDATE_CUSTOMER_PAYMENT_REMINDER, headers= headers)
+    return payment_reminder_update_command(response, tool_call_id)
+
 
+def payment_reminder_update_command(response, tool_call_id: str) -> Command:
     if response.status_code == 202:
         print("Updated")
         customer = Customer(**response.json()['customer'])
         tool_content = f"The customer payment reminder status details for Id {customer.customerId} has been updated to {customer.paymentReminder}"
         tool_message = ToolMessage(content= tool_content, tool_call_id= tool_call_id)
         command = Command(update= {
-            "messages": state['messages'] + [tool_message],
+            "messages": [tool_message],
             "customer": customer.model_dump(mode= 'json'),
         })
     else:
@@ -88,7 +107,7 @@ def update_customer_payment_reminder(customer_id: str, payment_reminder: bool, t
         tool_content = f"The customer payment reminder status could not be updated. Status code: {status}. Errors: {errors}"
         tool_message = ToolMessage(content= tool_content, tool_call_id= tool_call_id)
         command = Command(update= {
-            "messages": state["messages"] + [tool_message]
+            "messages": [tool_message]
         })
         
     return command
@@ -1,30 +1,246 @@
-from typing import Annotated, Dict, Any
+from typing import Annotated, Dict, Any, List, Optional, Tuple
 from langchain_core.tools import tool, InjectedToolCallId
 from langgraph.prebuilt import InjectedState
-from dateutil.parser import isoparse
 from datetime import datetime
-from services.loan_service import fetch_loan_statement
-import math
-from langchain_openai import ChatOpenAI
+from services.loan_service import fetch_loan_statement, afetch_loan_statement
+from services.amortization import (
+    remaining_tenure,
+    quote_loan_closure,
+    quote_tenure_reduction,
+    quote_part_payment,
+    sweep_scenarios,
+)
+from models.loan import LoanPayment, LoanStatementResponse
+from services.llm_registry import get_chat_model
+from services.response_cache import response_cache
 from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.output_parsers import StrOutputParser
+from tools.async_support import async_implementation
 from dotenv import load_dotenv
-from pydantic import SecretStr
 import os
 
 load_dotenv()
-llm = ChatOpenAI(model= "gpt-4o",
-                   temperature= 0,
-                   streaming= True,
-                   api_key= SecretStr(os.getenv('OPENAI_API_KEY', ''))
-        )
+llm = get_chat_model("tool_formatter")
+# The same loan figures are phrased again whenever a customer repeats a question
+calculator_cache = response_cache("financial_calculator", llm.model_name)
 
-def run_financial_calculator(prompt_instruction: str, user_data: dict) -> str:
+# Figures are computed by services.amortization. The LLM is only used to phrase them when enabled.
+LLM_PHRASING_ENABLED = os.getenv("LOAN_TOOLS_LLM_PHRASING", "false").lower() == "true"
+
+PHRASING_INSTRUCTION = """
+You are a financial assistant. The user data contains a pre-computed markdown answer for the customer.
+Rephrase it in a friendly tone while keeping the markdown structure.
+Do NOT recalculate, round, add or remove any figures. Every amount must appear exactly as given.
+"""
+
+
+def financial_calculator_chain(prompt_instruction: str):
     prompt = ChatPromptTemplate.from_messages([
         ("system", prompt_instruction),
         ("human", "{input}")
     ])
-    chain = prompt | llm
-    return chain.invoke({"input": user_data})
+    return prompt | llm | StrOutputParser()
+
+
+def run_financial_calculator(prompt_instruction: str, user_data: dict) -> str:
+    """
+    Phrases a pre-computed financial result with the LLM. All figures in `user_data` are final.
+    """
+    return calculator_cache.get_or_compute(
+        {"instruction": prompt_instruction, "input": user_data},
+        lambda: financial_calculator_chain(prompt_instruction).invoke({"input": user_data}),
+    )
+
+
+async def arun_financial_calculator(prompt_instruction: str, user_data: dict) -> str:
+    return await calculator_cache.aget_or_compute(
+        {"instruction": prompt_instruction, "input": user_data},
+        lambda: financial_calculator_chain(prompt_instruction).ainvoke({"input": user_data}),
+    )
+
+
+def format_currency(amount: float) -> str:
+    sign = "-" if round(amount, 2) < 0 else ""
+    return f"{sign}${abs(amount):,.2f}"
+
+
+def phrase_result(answer: str, figures: Optional[dict]) -> str:
+    """
+    Returns the deterministic markdown answer, optionally rephrased by the LLM.
+    Answers without figures (validation & error messages) are returned as is.
+    """
+    if not LLM_PHRASING_ENABLED or figures is None:
+        return answer
+
+    return run_financial_calculator(PHRASING_INSTRUCTION, {"answer": answer, "figures": figures})
+
+
+async def aphrase_result(answer: str, figures: Optional[dict]) -> str:
+    if not LLM_PHRASING_ENABLED or figures is None:
+        return answer
+
+    return await arun_financial_calculator(PHRASING_INSTRUCTION, {"answer": answer, "figures": figures})
+
+
+def get_latest_payment(data: LoanStatementResponse) -> LoanPayment:
+    # fetch_loan_statement returns the payment history sorted by payment date
+    return data.paymentHistory[-1]
+
+
+# Each tool builds its answer from the loan statement with a shared builder returning (answer, figures),
+# so the sync tool & its async implementation only differ in how the statement is fetched & phrased.
+Answer = Tuple[str, Optional[dict]]
+
+NO_LOAN_DATA = "Loan data unavailable or no payment history found."
+
+
+def has_loan_data(data: LoanStatementResponse) -> bool:
+    return bool(data.success and data.paymentHistory)
+
+
+def remaining_months_of(data: LoanStatementResponse) -> int:
+    latest = get_latest_payment(data)
+    summary = data.loanSummary
+    return remaining_tenure(
+        summary.tenureMonths, len(data.paymentHistory), latest.currentPrincipal, summary.interestRate, summary.emiAmount
+    )
+
+
+def outstanding_balance_answer(data: LoanStatementResponse) -> Answer:
+    if not has_loan_data(data):
+        return NO_LOAN_DATA, None
+
+    latest = get_latest_payment(data)
+    answer = (
+        f"As of your last payment on **{latest.paymentDate.strftime('%Y-%m-%d')}**, "
+        f"your outstanding loan principal is **{format_currency(latest.currentPrincipal)}**."
+    )
+
+    return answer, latest.model_dump(mode= 'json')
+
+
+def loan_closure_answer(data: LoanStatementResponse) -> Answer:
+    if not has_loan_data(data):
+        return NO_LOAN_DATA, None
+
+    latest = get_latest_payment(data)
+    quote = quote_loan_closure(latest.currentPrincipal, data.loanSummary.interestRate)
+
+    answer = "\n".join([
+        f"**Loan closure amount as of {datetime.today().strftime('%Y-%m-%d')}**",
+        "",
+        "| Component | Amount |",
+        "|---|---|",
+        f"| Outstanding principal | {format_currency(quote.outstandingPrincipal)} |",
+        f"| One month interest ({quote.interestRate}% p.a.) | {format_currency(quote.accruedInterest)} |",
+        f"| Foreclosure charge ({quote.foreclosureChargePercent:g}%) | {format_currency(quote.foreclosureCharge)} |",
+        f"| **Total closure amount** | **{format_currency(quote.totalClosureAmount)}** |",
+    ])
+
+    return answer, quote.model_dump()
+
+
+def tenure_reduction_answer(data: LoanStatementResponse, tenure_reduction_months: int) -> Answer:
+    if not has_loan_data(data):
+        return NO_LOAN_DATA, None
+
+    latest = get_latest_payment(data)
+    summary = data.loanSummary
+    remaining_months = remaining_months_of(data)
+
+    try:
+        quote = quote_tenure_reduction(
+            latest.currentPrincipal, summary.interestRate, summary.emiAmount, remaining_months, tenure_reduction_months
+        )
+    except ValueError as e:
+        return f"The tenure reduction could not be simulated. {e}", None
+
+    answer = "\n".join([
+        f"**Reducing your tenure by {tenure_reduction_months} months**",
+        "",
+        "| | Current | After reduction |",
+        "|---|---|---|",
+        f"| Remaining tenure | {quote.remainingMonths} months | {quote.newTenureMonths} months |",
+        f"| EMI | {format_currency(quote.currentEmi)} | {format_currency(quote.newEmi)} |",
+        f"| Total interest payable | {format_currency(quote.currentTotalInterest)} | {format_currency(quote.newTotalInterest)} |",
+        "",
+        f"Your EMI would increase by **{format_currency(quote.emiIncrease)}** "
+        f"and you would save **{format_currency(quote.interestSaved)}** in interest.",
+    ])
+
+    return answer, quote.model_dump()
+
+
+def part_payment_answer(data: LoanStatementResponse, part_payment: float) -> Answer:
+    if not has_loan_data(data):
+        return NO_LOAN_DATA, None
+
+    latest = get_latest_payment(data)
+    summary = data.loanSummary
+    remaining_months = remaining_months_of(data)
+
+    try:
+        quote = quote_part_payment(
+            latest.currentPrincipal, summary.interestRate, summary.emiAmount, remaining_months, part_payment
+        )
+    except ValueError as e:
+        return f"The part payment could not be simulated. {e}", None
+
+    answer = "\n".join([
+        f"**Part payment of {format_currency(quote.partPayment)}**",
+        "",
+        f"Your outstanding principal would drop from {format_currency(quote.principal)} to **{format_currency(quote.newPrincipal)}**.",
+        "",
+        "| | EMI | Tenure | Total interest | Interest saved |",
+        "|---|---|---|---|---|",
+        f"| Current | {format_currency(quote.currentEmi)} | {quote.remainingMonths} months | {format_currency(quote.currentTotalInterest)} | - |",
+        f"| Option 1: Reduce EMI | {format_currency(quote.reducedEmi)} | {quote.remainingMonths} months | {format_currency(quote.reducedEmiTotalInterest)} | {format_currency(quote.reducedEmiInterestSaved)} |",
+        f"| Option 2: Reduce tenure | {format_currency(quote.currentEmi)} | {quote.reducedTenureMonths} months | {format_currency(quote.reducedTenureTotalInterest)} | {format_currency(quote.reducedTenureInterestSaved)} |",
+        "",
+        f"Option 2 finishes your loan **{quote.monthsSaved} months** earlier.",
+    ])
+
+    return answer, quote.model_dump()
+
+
+def loan_scenarios_answer(data: LoanStatementResponse, part_payments: List[float], tenure_reduction_months: List[int]) -> Answer:
+    if not has_loan_data(data):
+        return NO_LOAN_DATA, None
+
+    latest = get_latest_payment(data)
+    summary = data.loanSummary
+    remaining_months = remaining_months_of(data)
+
+    try:
+        table = sweep_scenarios(summary, latest, part_payments, tenure_reduction_months, remaining_months)
+    except ValueError as e:
+        return f"The scenarios could not be compared. {e}", None
+
+    if table.empty:
+        return "None of the requested scenarios are possible. The part payment or tenure reduction exceeds the remaining loan.", None
+
+    lines = [
+        f"**Scenario comparison** (current EMI {format_currency(summary.emiAmount)}, {remaining_months} months remaining)",
+        "",
+        "| Part payment | Tenure reduction | New EMI | EMI change | Interest saved | Tenure at current EMI | Interest saved at current EMI |",
+        "|---|---|---|---|---|---|---|",
+    ]
+    for row in table.itertuples(index= False):
+        lines.append(
+            f"| {format_currency(row.partPayment)} | {row.tenureReductionMonths} months | {format_currency(row.emi)} "
+            f"| {format_currency(row.emiChange)} | {format_currency(row.interestSaved)} "
+            f"| {row.tenureAtCurrentEmi} months | {format_currency(row.interestSavedAtCurrentEmi)} |"
+        )
+
+    return "\n".join(lines), {"scenarios": table.to_dict(orient= "records")}
+
+
+def validate_scenarios(part_payments: List[float], tenure_reduction_months: List[int]) -> Optional[str]:
+    if not part_payments or not tenure_reduction_months:
+        return "Please provide at least one part payment amount and one tenure reduction."
+    if any(p < 0 for p in part_payments) or any(m < 0 for m in tenure_reduction_months):
+        return "Part payments and tenure reductions cannot be negative."
+    return None
 
 
 @tool(parse_docstring=True, return_direct=True)
@@ -33,10 +249,10 @@ def get_outstanding_balance(
     state: Annotated[Dict[str, Any], InjectedState],
 ) -> str:
     """
-    Retrieve and explain the customer's current outstanding loan balance using an LLM.
+    Retrieve and explain the customer's current outstanding loan balance.
 
-    This tool fetches the latest loan payment data and uses a language model
-    to generate a user-friendly summary of the current outstanding principal.
+    This tool fetches the latest loan payment data and generates a user-friendly
+    summary of the current outstanding principal.
 
     Args:
         tool_call_id (str): Tool call identifier injected by LangGraph.
@@ -47,29 +263,15 @@ def get_outstanding_balance(
         str: A formatted message describing the customer's outstanding balance.
     """
 
-    customer_id = state["customer"]["customerId"]
-    data = fetch_loan_statement(customer_id)
-
-    if not data.success or not data.paymentHistory:
-        return "Loan data unavailable or no payment history found."
+    data = fetch_loan_statement(state["customer"]["customerId"])
+    return phrase_result(*outstanding_balance_answer(data))
 
-    for p in data.paymentHistory:
-        if not isinstance(p.paymentDate, datetime):
-            p.paymentDate = isoparse(p.paymentDate)
 
-    latest = max(data.paymentHistory, key=lambda p: p.paymentDate)
-    input_data = {
-        "customerId": data.customerId,
-        "paymentDate": latest.paymentDate.strftime('%Y-%m-%d'),
-        "currentPrincipal": latest.currentPrincipal
-    }
+@async_implementation(get_outstanding_balance)
+async def aget_outstanding_balance(tool_call_id: str, state: Dict[str, Any]) -> str:
+    data = await afetch_loan_statement(state["customer"]["customerId"])
+    return await aphrase_result(*outstanding_balance_answer(data))
 
-    return run_financial_calculator(
-        """You are a financial assistant. 
-        Format all currency in US dollars ($) with commas and 2 decimal places (e.g., $12,345.67).
-        Given the payment date and outstanding principal, generate a user-friendly summary of the current loan balance.""",
-        input_data
-    )
 
 @tool(parse_docstring=True, return_direct=True)
 def get_loan_closure_amount(
@@ -79,9 +281,8 @@ def get_loan_closure_amount(
     """
     Calculate and explain the total amount required to close the customer's loan.
 
-    The tool fetches the current outstanding principal, estimates one month of interest,
-    and adds foreclosure charges. These values are passed to a language model, which
-    generates a breakdown of the total closure amount.
+    The tool fetches the current outstanding principal, adds one month of simple interest
+    and the foreclosure charges, and returns a breakdown of the total closure amount.
 
     Args:
         tool_call_id (str): Tool call identifier injected by LangGraph.
@@ -91,38 +292,15 @@ def get_loan_closure_amount(
         str: A markdown-formatted message with total closure amount and its breakdown.
     """
 
-    customer_id = state["customer"]["customerId"]
-    data = fetch_loan_statement(customer_id)
+    data = fetch_loan_statement(state["customer"]["customerId"])
+    return phrase_result(*loan_closure_answer(data))
 
-    if not data.success or not data.paymentHistory:
-        return "Loan data unavailable or no payment history found."
 
-    for p in data.paymentHistory:
-        if not isinstance(p.paymentDate, datetime):
-            p.paymentDate = isoparse(p.paymentDate)
+@async_implementation(get_loan_closure_amount)
+async def aget_loan_closure_amount(tool_call_id: str, state: Dict[str, Any]) -> str:
+    data = await afetch_loan_statement(state["customer"]["customerId"])
+    return await aphrase_result(*loan_closure_answer(data))
 
-    latest = max(data.paymentHistory, key=lambda p: p.paymentDate)
-    summary = data.loanSummary
-
-    input_data = {
-        "customerId": data.customerId,
-        "asOfDate": datetime.today().strftime('%Y-%m-%d'),
-        "outstandingPrincipal": latest.currentPrincipal,
-        "interestRate": summary.interestRate,
-        "foreclosureChargePercent": 2
-    }
-
-    return run_financial_calculator(
-        """
-        You are a financial assistant. Given the outstanding principal, annual interest rate, and foreclosure charge percent:
-        - Calculate one month of interest using simple interest formula.
-        - Calculate foreclosure fee.
-        - Sum all to get total closure amount.
-        - Return a readable breakdown in markdown.
-        - Format and return all amounts in **US dollars ($)** with two decimal places and commas.
-        """,
-        input_data
-    )
 
 @tool(parse_docstring=True, return_direct=True)
 def simulate_tenure_reduction(
@@ -134,8 +312,8 @@ def simulate_tenure_reduction(
     Simulate EMI increase if the loan tenure is reduced.
 
     This tool allows the customer to explore how their EMI would change
-    if they chose to shorten their loan duration. The calculation is performed
-    by the LLM based on the current principal, interest rate, and remaining tenure.
+    if they chose to shorten their loan duration. The new EMI is computed
+    from the current principal, interest rate, and remaining tenure.
 
     Args:
         tool_call_id (str): Tool call identifier from the calling agent.
@@ -149,38 +327,18 @@ def simulate_tenure_reduction(
     if tenure_reduction_months <= 0:
         return "Please enter a valid number of months."
 
-    customer_id = state["customer"]["customerId"]
-    data = fetch_loan_statement(customer_id)
+    data = fetch_loan_statement(state["customer"]["customerId"])
+    return phrase_result(*tenure_reduction_answer(data, tenure_reduction_months))
 
-    if not data.success or not data.paymentHistory:
-        return "Loan data unavailable or no payment history found."
 
-    for p in data.paymentHistory:
-        if not isinstance(p.paymentDate, datetime):
-            p.paymentDate = isoparse(p.paymentDate)
+@async_implementation(simulate_tenure_reduction)
+async def asimulate_tenure_reduction(tool_call_id: str, state: Dict[str, Any], tenure_reduction_months: int) -> str:
+    if tenure_reduction_months <= 0:
+        return "Please enter a valid number of months."
 
-    latest = max(data.paymentHistory, key=lambda p: p.paymentDate)
-    summary = data.loanSummary
+    data = await afetch_loan_statement(state["customer"]["customerId"])
+    return await aphrase_result(*tenure_reduction_answer(data, tenure_reduction_months))
 
-    input_data = {
-        "principal": latest.currentPrincipal,
-        "currentEMI": summary.emiAmount,
-        "currentTenure": summary.tenureMonths,
-        "interestRate": summary.interestRate,
-        "reduceBy": tenure_reduction_months
-    }
-
-    return run_financial_calculator(
-        """
-        You are a financial advisor.
-        Given current principal, annual interest rate, and requested reduction in tenure (in months):
-        - Calculate new EMI after tenure reduction using EMI formula.
-        - Compare old and new EMI.
-        - Return a markdown response with comparison and increase in EMI.
-        - Format all currency in **US dollars ($)** with commas and 2 decimal places.
-        """,
-        input_data
-    )
 
 @tool(parse_docstring=True, return_direct=True)
 def simulate_part_payment_impact(
@@ -195,8 +353,8 @@ def simulate_part_payment_impact(
     - Option 1: Reduce EMI and keep the same tenure.
     - Option 2: Keep EMI the same and reduce the remaining tenure.
 
-    The LLM calculates the impact of the lump-sum payment on both options
-    and presents the results in a markdown-formatted message.
+    The impact of the lump-sum payment on both options is computed
+    and presented in a markdown-formatted message.
 
     Args:
         tool_call_id (str): Tool call identifier injected by LangGraph.
@@ -210,35 +368,62 @@ def simulate_part_payment_impact(
     if part_payment <= 0:
         return "Please enter a valid part payment amount."
 
-    customer_id = state["customer"]["customerId"]
-    data = fetch_loan_statement(customer_id)
+    data = fetch_loan_statement(state["customer"]["customerId"])
+    return phrase_result(*part_payment_answer(data, part_payment))
 
-    if not data.success or not data.paymentHistory:
-        return "Loan data unavailable or no payment history found."
 
-    for p in data.paymentHistory:
-        if not isinstance(p.paymentDate, datetime):
-            p.paymentDate = isoparse(p.paymentDate)
+@async_implementation(simulate_part_payment_impact)
+async def asimulate_part_payment_impact(tool_call_id: str, state: Dict[str, Any], part_payment: float) -> str:
+    if part_payment <= 0:
+        return "Please enter a valid part payment amount."
 
-    latest = max(data.paymentHistory, key=lambda p: p.paymentDate)
-    summary = data.loanSummary
+    data = await afetch_loan_statement(state["customer"]["customerId"])
+    return await aphrase_result(*part_payment_answer(data, part_payment))
+
+
+@tool(parse_docstring=True, return_direct=True)
+def compare_loan_scenarios(
+    tool_call_id: Annotated[str, InjectedToolCallId],
+    state: Annotated[Dict[str, Any], InjectedState],
+    part_payments: List[float],
+    tenure_reduction_months: List[int],
+) -> str:
+    """
+    Compare several part payment and tenure reduction scenarios side by side.
+
+    Every combination of the given part payments and tenure reductions is evaluated
+    in a single pass and returned as one comparison table, so follow-up "what if"
+    questions can be answered from the table.
+
+    Args:
+        tool_call_id (str): Tool call identifier injected by LangGraph.
+        state (Dict[str, Any]): LangGraph state with current customer context.
+        part_payments (List[float]): The lump sum amounts to compare. Use [0] to only compare tenure reductions.
+        tenure_reduction_months (List[int]): The tenure reductions in months to compare. Use [0] to only compare part payments.
+
+    Returns:
+        str: A markdown table comparing EMI, tenure and interest savings for every scenario.
+    """
+
+    invalid = validate_scenarios(part_payments, tenure_reduction_months)
+    if invalid:
+        return invalid
+
+    data = fetch_loan_statement(state["customer"]["customerId"])
+    return phrase_result(*loan_scenarios_answer(data, part_payments, tenure_reduction_months))
+
+
+@async_implementation(compare_loan_scenarios)
+async def acompare_loan_scenarios(
+    tool_call_id: str,
+    state: Dict[str, Any],
+    part_payments: List[float],
+    tenure_reduction_months: List[int],
+) -> str:
+    invalid = validate_scenarios(part_payments, tenure_reduction_months)
+    if invalid:
+        return invalid
+
+    data = await afetch_loan_statement(state["customer"]["customerId"])
+    return await aphrase_result(*loan_scenarios_answer(data, part_payments, tenure_reduction_months))
 
-    input_data = {
-        "originalPrincipal": latest.currentPrincipal,
-        "partPayment": part_payment,
-        "interestRate": summary.interestRate,
-        "emi": summary.emiAmount,
-        "tenureMonths": summary.tenureMonths
-    }
-
-    return run_financial_calculator(
-        """
-        You are a financial assistant. Given a part payment scenario:
-        - Reduce the principal.
-        - Show Option 1: Recalculate EMI (same tenure).
-        - Show Option 2: Recalculate tenure (same EMI).
-        - Return a markdown message with both options and savings.
-        - Format everything in **US dollars ($)**.
-        """,
-        input_data
-    )
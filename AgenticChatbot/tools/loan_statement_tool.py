@@ -2,59 +2,39 @@ from typing import Annotated, Dict, Any
 from langchain_core.tools import tool, InjectedToolCallId
 from langchain_core.messages import ToolMessage
 from langgraph.prebuilt import InjectedState
-from dateutil.parser import isoparse
-from services.loan_service import fetch_loan_statement
-from datetime import datetime
-from langchain_openai import ChatOpenAI
+from services.loan_service import fetch_loan_statement, afetch_loan_statement
+from models.loan import LoanStatementResponse
+from tools.async_support import async_implementation
+from services.llm_registry import get_chat_model
 from langchain_core.prompts import ChatPromptTemplate
 from dotenv import load_dotenv, find_dotenv
-from pydantic import SecretStr
-import os
 import json
 from langchain_core.output_parsers import StrOutputParser
 from langgraph.types import Command
 
 load_dotenv(find_dotenv())
-llm = ChatOpenAI(
-    model="gpt-4o",
-    temperature=0,
-    streaming=True,
-    api_key=SecretStr(os.getenv('OPENAI_API_KEY', ''))
-)
-
-@tool(parse_docstring= True)
-def get_loan_statement(
-    tool_call_id: Annotated[str, InjectedToolCallId],
-    state: Annotated[Dict[str, Any], InjectedState],
-) -> Command:
-    """
-    Fetch and return the loan statement for the current customer using LLM formatting.
-    Includes a Markdown table for display and raw JSON array for backend use.
+llm = get_chat_model("tool_formatter")
 
-    Args:
-        tool_call_id (str): Tool call ID injected by LangGraph.
-        state (Dict[str, Any]): Current LangGraph state with customerId.
-    """
-    print("Transferred to loan_statement_tool")
-
-    customer_id = state["customer"]["customerId"]
-    data = fetch_loan_statement(customer_id)
+LOAN_STATEMENT_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", """
+    You are a helpful financial assistant.
+    
+    Given the following loan JSON data:
+    1. Generate a loan summary in plain readable text (no markdown headers or bullet points).
+    2. Then generate a payment history **Markdown table**.
+       Use columns: No., Date, EMI, Interest, Principal, Previous Principal, Current Principal, Mode, Txn ID.
+    3. After the table, on a new line, include only the **raw JSON array** of payment records.
+       Do not explain or format the JSON in any way.
+    4. All currency must be formatted as US dollars (e.g. $10,000.00).
+    """),
+    ("human", "{input}")
+])
 
-    if data.paymentHistory:
-        for p in data.paymentHistory: 
-            if not isinstance(p.paymentDate, datetime):
-                p.paymentDate = isoparse(p.paymentDate)
+loan_statement_chain = LOAN_STATEMENT_PROMPT | llm | StrOutputParser()
 
-    if not data.success:
-        tool_message = ToolMessage(content= f"Could not fetch loan statement: {', '.join(data.errors or ['Unknown error'])}",
-                                   tool_call_id=tool_call_id)
-        return Command(update= {
-            "messages": state["messages"] + [tool_message]
-        })
-    
 
-    print(f"Fetched loan statement for customer {data.customerId}")
-    loan_input = {
+def loan_statement_input(data: LoanStatementResponse) -> Dict[str, Any]:
+    return {
         "customerId": data.customerId,
         "loanAccountNumber": data.loanAccountNumber,
         "summary": {
@@ -76,28 +56,21 @@ def get_loan_statement(
                 "paymentMode": p.paymentMode,
                 "transactionId": p.transactionId,
             }
-            for p in sorted(data.paymentHistory or [], key=lambda x: x.paymentDate)
+            for p in data.paymentHistory or []
         ]
     }
 
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", """
-        You are a helpful financial assistant.
-        
-        Given the following loan JSON data:
-        1. Generate a loan summary in plain readable text (no markdown headers or bullet points).
-        2. Then generate a payment history **Markdown table**.
-           Use columns: No., Date, EMI, Interest, Principal, Previous Principal, Current Principal, Mode, Txn ID.
-        3. After the table, on a new line, include only the **raw JSON array** of payment records.
-           Do not explain or format the JSON in any way.
-        4. All currency must be formatted as US dollars (e.g. $10,000.00).
-        """),
-        ("human", "{input}")
-    ])
 
-    
-    chain = prompt | llm | StrOutputParser()
-    result = chain.invoke({"input": json.dumps(loan_input)})  # type: ignore
+def loan_statement_error_command(data: LoanStatementResponse, tool_call_id: str) -> Command:
+    tool_message = ToolMessage(content= f"Could not fetch loan statement: {', '.join(data.errors or ['Unknown error'])}",
+                               tool_call_id=tool_call_id,
+                               status= "error")
+    return Command(update= {
+        "messages": [tool_message]
+    })
+
+
+def loan_statement_command(result: str, tool_call_id: str) -> Command:
     tool_message = ToolMessage(
         content = result,
         tool_call_id =tool_call_id
@@ -105,6 +78,47 @@ def get_loan_statement(
 
     # Update state with the generated content  & set generation flag to true
     return Command(update = {
-        "messages": state["messages"] + [tool_message],
+        "messages": [tool_message],
         "loan_statement_generation": True,
     })
+
+
+@tool(parse_docstring= True, return_direct= True)
+def get_loan_statement(
+    tool_call_id: Annotated[str, InjectedToolCallId],
+    state: Annotated[Dict[str, Any], InjectedState],
+) -> Command:
+    """
+    Fetch and return the loan statement for the current customer using LLM formatting.
+    Includes a Markdown table for display and raw JSON array for backend use.
+
+    Args:
+        tool_call_id (str): Tool call ID injected by LangGraph.
+        state (Dict[str, Any]): Current LangGraph state with customerId.
+    """
+    print("Transferred to loan_statement_tool")
+
+    customer_id = state["customer"]["customerId"]
+    data = fetch_loan_statement(customer_id)
+
+    if not data.success:
+        return loan_statement_error_command(data, tool_call_id)
+
+    print(f"Fetched loan statement for customer {data.customerId}")
+    result = loan_statement_chain.invoke({"input": json.dumps(loan_statement_input(data))})
+    return loan_statement_command(result, tool_call_id)
+
+
+@async_implementation(get_loan_statement)
+async def aget_loan_statement(tool_call_id: str, state: Dict[str, Any]) -> Command:
+    print("Transferred to loan_statement_tool")
+
+    customer_id = state["customer"]["customerId"]
+    data = await afetch_loan_statement(customer_id)
+
+    if not data.success:
+        return loan_statement_error_command(data, tool_call_id)
+
+    print(f"Fetched loan statement for customer {data.customerId}")
+    result = await loan_statement_chain.ainvoke({"input": json.dumps(loan_statement_input(data))})
+    return loan_statement_command(result, tool_call_id)
@@ -1,17 +1,21 @@
-import os
 from langchain.vectorstores.base import VectorStore
 from langchain_core.documents import Document
-from langchain_openai import ChatOpenAI, OpenAIEmbeddings
 from langchain.prompts import PromptTemplate
-from langchain_cohere import CohereRerank
 from langchain.retrievers.contextual_compression import ContextualCompressionRetriever
 from typing import (
     TypedDict,
-    List
+    List,
+    Optional
 )
 from dotenv import load_dotenv
 from langgraph.graph import START, StateGraph
-from pydantic import SecretStr
+from langchain_core.runnables import RunnableLambda
+from services.llm_registry import get_chat_model
+from services.embedding_cache import get_query_embeddings
+from services.answer_cache import RAGAnswerCache
+from tools.query_handlers.rerankers import RAG_RERANKER, RERANK_SKIP_MARGIN, get_reranker
+from tools.query_handlers.retrievers import RAG_HYBRID_TOP_K, HybridRetriever, ScoredVectorRetriever
+from services.sparse_index import SparseIndex
 
 class State(TypedDict):
     question: str
@@ -23,37 +27,45 @@ class RAG:
         self, 
         vector_store: VectorStore, 
         prompt: str, 
-        top_k_retrieval: int = 20, 
+        top_k_retrieval: Optional[int] = None, 
         top_k_rerank: int = 5,
+        collection: Optional[str] = None,
+        index_path: Optional[str] = None,
+        reranker: str = RAG_RERANKER,
+        sparse_index: Optional[SparseIndex] = None,
     ):
         load_dotenv()
-        self.embedding_function = OpenAIEmbeddings(
-            model= "text-embedding-3-large",
-            api_key= SecretStr(os.getenv('OPENAI_API_KEY', '')) 
-        )
+        self.embedding_function = get_query_embeddings()
         self.vector_store = vector_store
         self.PROMPT = PromptTemplate(template= prompt, input_variables= ['context', 'question'])  
-        self.top_k_retrieval = top_k_retrieval
+        self.sparse_index = sparse_index
+        # Hybrid retrieval hands RAG_HYBRID_TOP_K fused candidates to the reranker, a vector search alone 20
+        self.top_k_retrieval = top_k_retrieval or (RAG_HYBRID_TOP_K if sparse_index is not None else 20)
         self.top_k_rerank = top_k_rerank
-        self.model = ChatOpenAI(model= "gpt-4o-mini", temperature= 0, api_key= SecretStr(os.getenv('OPENAI_API_KEY', ''))) # type: ignore
+        self.reranker = reranker
+        self.model = get_chat_model("rag_answer")
+        # Answers are cached per corpus version, so only collections with a document index are cached
+        settings = {
+            "prompt": prompt,
+            "reranker": reranker,
+            "skipMargin": RERANK_SKIP_MARGIN,
+            "retrieval": "hybrid" if sparse_index is not None else "dense",
+            "topKRetrieval": self.top_k_retrieval,
+            "topKRerank": top_k_rerank,
+        }
+        self.answer_cache = RAGAnswerCache(collection, index_path, self.model.model_name, settings= settings) if collection and index_path else None
         self.setup_reranked_retriever()
     
 
     def setup_reranked_retriever(self) -> None:
-        # Setup vector store as retriever
-        retriever = self.vector_store.as_retriever(
-            search_type= "similarity",
-            search_kwargs= {
-                "k": self.top_k_retrieval
-            }
-        )
-        compressor = CohereRerank(
-            model= "rerank-english-v3.0",
-            top_n= self.top_k_rerank,
-            cohere_api_key= SecretStr(os.getenv('COHERE_API_KEY', ''))
-        )
+        # Setup vector store as retriever, keeping the vector scores for the reranker, fused with the BM25 index when there is one
+        if self.sparse_index is not None:
+            retriever = HybridRetriever(vector_store= self.vector_store, sparse_index= self.sparse_index, k= self.top_k_retrieval)
+        else:
+            retriever = ScoredVectorRetriever(vector_store= self.vector_store, k= self.top_k_retrieval)
+        compressor = get_reranker(self.reranker, top_n= self.top_k_rerank)
 
-        # Wrap the ChromaDB base retriever with a reranker that reranks the docs using a Cohere Rerank
+        # Wrap the base retriever with the configured reranker, Cohere Rerank unless RAG_RERANKER says otherwise
         self.retriever = ContextualCompressionRetriever(
             base_compressor= compressor, base_retriever= retriever
         )
@@ -63,27 +75,47 @@ class RAG:
         retrieved_docs = self.retriever.invoke(state["question"])
         return {"context": retrieved_docs}
 
-    def generate(self, state: State):
+    async def aretrieve(self, state: State):
+        retrieved_docs = await self.retriever.ainvoke(state["question"])
+        return {"context": retrieved_docs}
+
+    def build_messages(self, state: State):
         docs_content = "\n\n".join(doc.page_content for doc in state["context"])
-        messages = self.PROMPT.invoke({
+        return self.PROMPT.invoke({
             "context": docs_content, 
             "question": state["question"]})
-        response = self.model.invoke(messages)
+
+    def generate(self, state: State):
+        response = self.model.invoke(self.build_messages(state))
+        return {"answer": response.content}
+
+    async def agenerate(self, state: State):
+        response = await self.model.ainvoke(self.build_messages(state))
         return {"answer": response.content}
     
 
     def create_rag(self):
+        # Nodes carry both implementations so the graph runs natively on `invoke` & `ainvoke`
         self.rag = (
             StateGraph(State)
-            .add_node("retrieve", self.retrieve)
-            .add_node("generate", self.generate)
+            .add_node("retrieve", RunnableLambda(self.retrieve, afunc= self.aretrieve))
+            .add_node("generate", RunnableLambda(self.generate, afunc= self.agenerate))
             .add_edge(START, "retrieve")
             .add_edge("retrieve", "generate")
         ).compile()
 
 
+    def answer(self, question: str) -> str:
+        compute = lambda: self.rag.invoke({"question": question})["answer"]
+        if self.answer_cache is None:
+            return compute()
+        return self.answer_cache.get_or_compute(question, compute)
 
+    async def aanswer(self, question: str) -> str:
+        async def compute() -> str:
+            result = await self.rag.ainvoke({"question": question})
+            return result["answer"]
 
-
-
-
+        if self.answer_cache is None:
+            return await compute()
+        return await self.answer_cache.aget_or_compute(question, compute)
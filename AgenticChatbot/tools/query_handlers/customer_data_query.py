@@ -1,4 +1,4 @@
-from langchain_openai import ChatOpenAI
+from services.llm_registry import get_chat_model
 from langgraph.graph import StateGraph, START, END
 from langchain_core.tools import tool
 from langchain_core.output_parsers.string import StrOutputParser
@@ -23,7 +23,7 @@ class QueryState(MessagesState):
 
 
 
-chat_model = ChatOpenAI(model= "gpt-4.1-nano", temperature= 0, streaming= True)
+chat_model = get_chat_model("data_query")
 
 
 GENERATE_PROMPT = """
@@ -1,15 +1,11 @@
-from tools.query_handlers.RAG import RAG
-from langchain_qdrant import QdrantVectorStore
-from qdrant_client import QdrantClient
-from langchain_openai import OpenAIEmbeddings
-from pydantic import SecretStr
-import os
+from tools.query_handlers.rag_service import rag_service
+from vector_stores.paths import document_index_path, persist_directory
 from dotenv import load_dotenv, find_dotenv
 from langchain_core.tools import BaseTool, tool
+from tools.async_support import async_implementation
 
 
 load_dotenv(find_dotenv())
-embeddings = OpenAIEmbeddings(model= "text-embedding-3-large", api_key= SecretStr(os.getenv("OPENAI_API_KEY", "")))
 
 payments_prompt = '''
 You're an AI agent tasked with answering user queries related to Customer Relation Summary.
@@ -26,6 +22,15 @@ Question: {question}
 '''
 
 
+# Opened once per process & shared by every query, answers are cached until the indexed documents change
+payments_rag = rag_service(
+    collection= 'Payments',
+    path= persist_directory('Payments'),
+    prompt= payments_prompt,
+    index_path= document_index_path('Payments'),
+)
+
+
 def get_payments_query_handler() -> BaseTool:
     @tool(parse_docstring= True)
     def invoke_model(query: str):
@@ -35,25 +40,14 @@ def get_payments_query_handler() -> BaseTool:
         Args:
             query (str): The question or query to be answered by the RAG model.
         """
-        
-        # Setup Qdrant client and vector store
-        client = QdrantClient(path= "./qdrant/Payments")
-        payments_vector_store = QdrantVectorStore(
-            client= client,
-            collection_name= 'Payments',
-            embedding= embeddings,
-        )
-        payments_rag = RAG(vector_store= payments_vector_store, prompt= payments_prompt)
-        payments_rag.create_rag()
-
         # Invoke the RAG model with the query
         print("Processing payments query")
-        result = payments_rag.rag.invoke({"question": query})
+        return payments_rag.invoke(query)
 
-        # Clean up resources
-        del payments_vector_store
-        del client
-        return result["answer"]
+    @async_implementation(invoke_model)
+    async def ainvoke_model(query: str):
+        print("Processing payments query")
+        return await payments_rag.ainvoke(query)
 
     
-    return invoke_model
\ No newline at end of file
+    return invoke_model
@@ -1,15 +1,11 @@
-from tools.query_handlers.RAG import RAG
-from langchain_qdrant import QdrantVectorStore
-from qdrant_client import QdrantClient
-from langchain_openai import OpenAIEmbeddings
-from pydantic import SecretStr
-import os
+from tools.query_handlers.rag_service import rag_service
+from vector_stores.paths import document_index_path, persist_directory
 from dotenv import load_dotenv, find_dotenv
 from langchain_core.tools import BaseTool, tool
+from tools.async_support import async_implementation
 
 
 load_dotenv(find_dotenv())
-embeddings = OpenAIEmbeddings(model= "text-embedding-3-large", api_key= SecretStr(os.getenv("OPENAI_API_KEY", "")))
 
 profile_prompt = '''
 You're an AI agent tasked with answering user queries related to Customer Relation Summary.
@@ -26,6 +22,15 @@ Question: {question}
 '''
 
 
+# Opened once per process & shared by every query, answers are cached until the indexed documents change
+profile_rag = rag_service(
+    collection= 'Profile',
+    path= persist_directory('Profile'),
+    prompt= profile_prompt,
+    index_path= document_index_path('Profile'),
+)
+
+
 def get_profile_query_handler() -> BaseTool:
     @tool(parse_docstring= True)
     def invoke_model(query: str):
@@ -35,24 +40,14 @@ def get_profile_query_handler() -> BaseTool:
         Args:
             query (str): The question or query to be answered by the RAG model.
         """
-        # Setup Qdrant client and vector store
-        client = QdrantClient(path= "./qdrant/Profile")
-        profile_vector_store = QdrantVectorStore(
-            client= client,
-            collection_name= 'Profile',
-            embedding= embeddings,
-        )
-        profile_rag = RAG(vector_store= profile_vector_store, prompt= profile_prompt)
-        profile_rag.create_rag()
-
         # Invoke the RAG model with the query
         print("Processing profile query")
-        result = profile_rag.rag.invoke({"question": query})
+        return profile_rag.invoke(query)
 
-        # Clean up resources
-        del profile_vector_store
-        del client
-        return result["answer"]
+    @async_implementation(invoke_model)
+    async def ainvoke_model(query: str):
+        print("Processing profile query")
+        return await profile_rag.ainvoke(query)
 
     
-    return invoke_model
\ No newline at end of file
+    return invoke_model
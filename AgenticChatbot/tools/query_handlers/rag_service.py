@@ -0,0 +1,120 @@
+import os
+import time
+import atexit
+import asyncio
+import threading
+from typing import Any, Dict, Optional
+
+from langchain_core.embeddings import Embeddings
+from langchain_qdrant import QdrantVectorStore
+from qdrant_client import QdrantClient
+from dotenv import load_dotenv, find_dotenv
+
+from services.embedding_cache import get_query_embeddings
+from services.sparse_index import SparseIndex, open_sparse_index
+from tools.query_handlers.RAG import RAG
+from tools.query_handlers.retrievers import RAG_RETRIEVAL_MODE
+
+load_dotenv(find_dotenv())
+
+# Builds the RAG pipelines when the assistant starts instead of on their first query
+RAG_WARMUP_ON_START = os.getenv("RAG_WARMUP_ON_START", "true").lower() == "true"
+
+
+class RAGService:
+    """
+    The RAG pipeline of one Qdrant collection, built on first use & shared by every query of the process.
+    The embedded Qdrant storage locks its folder for a single client, so the client is opened once & kept open.
+    """
+
+    def __init__(self, collection: str, path: str, prompt: str, embeddings: Optional[Embeddings] = None, **rag_kwargs: Any):
+        self.collection = collection
+        self.path = path
+        self.prompt = prompt
+        self.embeddings = embeddings
+        self.rag_kwargs = rag_kwargs
+        self.client: Optional[QdrantClient] = None
+        self.sparse_index: Optional[SparseIndex] = None
+        self._rag: Optional[RAG] = None
+        self._lock = threading.Lock()
+
+    def _build(self) -> RAG:
+        with self._lock:
+            if self._rag is None:
+                self.client = QdrantClient(path= self.path)
+                vector_store = QdrantVectorStore(
+                    client= self.client,
+                    collection_name= self.collection,
+                    embedding= self.embeddings or get_query_embeddings(),
+                )
+                if RAG_RETRIEVAL_MODE == "hybrid":
+                    self.sparse_index = open_sparse_index(self.path)
+                    if self.sparse_index is None:
+                        print(f"[INFO] No sparse index for '{self.collection}', its queries use the vector search only")
+                rag = RAG(vector_store= vector_store, prompt= self.prompt, collection= self.collection, sparse_index= self.sparse_index, **self.rag_kwargs)
+                rag.create_rag()
+                self._rag = rag
+            return self._rag
+
+    @property
+    def rag(self) -> RAG:
+        return self._rag or self._build()
+
+    def invoke(self, query: str) -> str:
+        return self.rag.answer(query)
+
+    async def ainvoke(self, query: str) -> str:
+        # Opening the local Qdrant store is blocking file IO, so a first build is kept off the event loop
+        rag = self._rag or await asyncio.to_thread(self._build)
+        return await rag.aanswer(query)
+
+    def warm_up(self) -> float:
+        """
+        Opens the collection & builds the pipeline ahead of the first query. Returns the seconds it took.
+        """
+        start = time.perf_counter()
+        self._build()
+        return time.perf_counter() - start
+
+    def close(self) -> None:
+        with self._lock:
+            if self.client is not None:
+                self.client.close()
+            if self.sparse_index is not None:
+                self.sparse_index.close()
+            self.client = None
+            self.sparse_index = None
+            self._rag = None
+
+
+_services: Dict[str, RAGService] = {}
+_services_lock = threading.Lock()
+
+
+def rag_service(collection: str, path: str, prompt: str, **kwargs: Any) -> RAGService:
+    """
+    Returns the process wide service of a collection, one per storage folder.
+    """
+    key = os.path.abspath(path)
+    with _services_lock:
+        if key not in _services:
+            _services[key] = RAGService(collection, path, prompt, **kwargs)
+        return _services[key]
+
+
+def warm_up_rag_services() -> None:
+    for service in list(_services.values()):
+        try:
+            seconds = service.warm_up()
+            print(f"[INFO] RAG pipeline for '{service.collection}' ready in {seconds:.2f}s")
+        except Exception as e:
+            # The pipeline is built again on its first query
+            print(f"[EXCEPTION] Could not warm up the RAG pipeline for '{service.collection}': {e}")
+
+
+def close_rag_services() -> None:
+    for service in list(_services.values()):
+        service.close()
+
+
+atexit.register(close_rag_services)
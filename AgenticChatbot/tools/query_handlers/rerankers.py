@@ -0,0 +1,160 @@
+import os
+import threading
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+from langchain_cohere import CohereRerank
+from langchain_core.callbacks import Callbacks
+from langchain_core.documents import BaseDocumentCompressor, Document
+from pydantic import Field, SecretStr
+from dotenv import load_dotenv, find_dotenv
+
+from services.bm25 import BM25, tokenize
+
+load_dotenv(find_dotenv())
+
+# Reranker of the RAG pipelines, one of RERANKERS
+RAG_RERANKER = os.getenv("RAG_RERANKER", "cohere")
+# Reranking is skipped when the retrieval score of the last kept document leads the next one by this much, empty to always rerank
+# Hybrid retrieval scores are reciprocal rank fusion sums of at most 2 / 61, so margins suited to cosine scores never skip there
+_skip_margin = os.getenv("RERANK_SKIP_MARGIN", "")
+RERANK_SKIP_MARGIN = float(_skip_margin) if _skip_margin else None
+# Share of the lexical score in the lexical reranker, the rest is the vector score
+LEXICAL_RERANK_WEIGHT = float(os.getenv("LEXICAL_RERANK_WEIGHT", "0.5"))
+# Needs the sentence-transformers package
+CROSS_ENCODER_MODEL = os.getenv("CROSS_ENCODER_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+
+
+def _normalised(values: np.ndarray) -> np.ndarray:
+    spread = float(values.max() - values.min()) if len(values) else 0.0
+    return (values - values.min()) / spread if spread else np.zeros_like(values)
+
+
+def _ranked(documents: Sequence[Document], scores: np.ndarray, top_n: int) -> List[Document]:
+    order = np.argsort(-scores, kind= "stable")[:top_n]
+    return [
+        Document(page_content= documents[i].page_content, metadata= {**documents[i].metadata, "relevance_score": float(scores[i])}, id= documents[i].id)
+        for i in order
+    ]
+
+
+class VectorOrderReranker(BaseDocumentCompressor):
+    """
+    Keeps the `top_n` best documents of the vector search, as they are.
+    """
+    top_n: int = 5
+
+    def compress_documents(self, documents: Sequence[Document], query: str, callbacks: Optional[Callbacks] = None) -> Sequence[Document]:
+        return list(documents)[:self.top_n]
+
+    async def acompress_documents(self, documents: Sequence[Document], query: str, callbacks: Optional[Callbacks] = None) -> Sequence[Document]:
+        return self.compress_documents(documents, query)
+
+
+class LexicalReranker(BaseDocumentCompressor):
+    """
+    Reranks on the CPU by mixing the BM25 score of the query over the candidates with their vector score,
+    both scaled to 0-1. Exact terms like form names & payment modes lift the documents quoting them.
+    """
+    top_n: int = 5
+    lexical_weight: float = LEXICAL_RERANK_WEIGHT
+
+    def compress_documents(self, documents: Sequence[Document], query: str, callbacks: Optional[Callbacks] = None) -> Sequence[Document]:
+        if not documents:
+            return []
+        lexical = BM25([tokenize(doc.page_content) for doc in documents]).scores(tokenize(query))
+        if all("score" in doc.metadata for doc in documents):
+            dense = np.array([doc.metadata["score"] for doc in documents], dtype= np.float32)
+        else:
+            # Without scores, the order of the vector search stands in for them
+            dense = np.linspace(1, 0, len(documents), dtype= np.float32)
+        scores = self.lexical_weight * _normalised(lexical) + (1 - self.lexical_weight) * _normalised(dense)
+        return _ranked(documents, scores, self.top_n)
+
+    async def acompress_documents(self, documents: Sequence[Document], query: str, callbacks: Optional[Callbacks] = None) -> Sequence[Document]:
+        return self.compress_documents(documents, query)
+
+
+class DecisiveScoreSkip(BaseDocumentCompressor):
+    """
+    Wraps a reranker, returning the vector order unchanged when the `top_n` documents already lead the rest
+    by `margin` in vector score, since reranking would keep the same documents.
+    """
+    reranker: BaseDocumentCompressor
+    top_n: int = 5
+    margin: float = 0.05
+    metrics: Dict[str, int] = Field(default_factory= lambda: {"skipped": 0, "reranked": 0})
+
+    def decisive(self, documents: Sequence[Document]) -> bool:
+        if len(documents) <= self.top_n:
+            return True
+        scores = [doc.metadata.get("score") for doc in documents[:self.top_n + 1]]
+        return None not in scores and scores[self.top_n - 1] - scores[self.top_n] >= self.margin
+
+    def compress_documents(self, documents: Sequence[Document], query: str, callbacks: Optional[Callbacks] = None) -> Sequence[Document]:
+        if self.decisive(documents):
+            self.metrics["skipped"] += 1
+            return list(documents)[:self.top_n]
+        self.metrics["reranked"] += 1
+        return self.reranker.compress_documents(documents, query, callbacks= callbacks)
+
+    async def acompress_documents(self, documents: Sequence[Document], query: str, callbacks: Optional[Callbacks] = None) -> Sequence[Document]:
+        if self.decisive(documents):
+            self.metrics["skipped"] += 1
+            return list(documents)[:self.top_n]
+        self.metrics["reranked"] += 1
+        return await self.reranker.acompress_documents(documents, query, callbacks= callbacks)
+
+
+def cohere_reranker(top_n: int) -> BaseDocumentCompressor:
+    return CohereRerank(
+        model= "rerank-english-v3.0",
+        top_n= top_n,
+        cohere_api_key= SecretStr(os.getenv('COHERE_API_KEY', ''))
+    )
+
+
+_cross_encoders: Dict[str, Any] = {}
+_cross_encoders_lock = threading.Lock()
+
+
+def cross_encoder_reranker(top_n: int) -> BaseDocumentCompressor:
+    # Imported on use, only this reranker needs sentence-transformers
+    from langchain.retrievers.document_compressors import CrossEncoderReranker
+    from langchain_community.cross_encoders import HuggingFaceCrossEncoder
+
+    # The model is loaded once per process & scores all the candidates of a query in one batch
+    with _cross_encoders_lock:
+        if CROSS_ENCODER_MODEL not in _cross_encoders:
+            _cross_encoders[CROSS_ENCODER_MODEL] = HuggingFaceCrossEncoder(model_name= CROSS_ENCODER_MODEL, model_kwargs= {"device": "cpu"})
+        model = _cross_encoders[CROSS_ENCODER_MODEL]
+    return CrossEncoderReranker(model= model, top_n= top_n)
+
+
+RERANKERS: Dict[str, Callable[[int], BaseDocumentCompressor]] = {
+    # Cohere's hosted rerank model, a network round-trip per query
+    "cohere": cohere_reranker,
+    # Local CPU rerankers
+    "cross_encoder": cross_encoder_reranker,
+    "lexical": lambda top_n: LexicalReranker(top_n= top_n),
+    # The vector search order
+    "none": lambda top_n: VectorOrderReranker(top_n= top_n),
+}
+
+
+def get_reranker(name: str = RAG_RERANKER, top_n: int = 5, skip_margin: Optional[float] = RERANK_SKIP_MARGIN) -> BaseDocumentCompressor:
+    """
+    Returns a reranker keeping `top_n` documents, wrapped to skip decisive vector rankings when `skip_margin` is set.
+
+    Args:
+        name (str): One of RERANKERS.
+        top_n (int): Documents kept for the answer.
+        skip_margin (Optional[float]): Vector score lead of the kept documents above which reranking is skipped.
+    """
+    if name not in RERANKERS:
+        raise ValueError(f"Unknown reranker '{name}', expected one of {list(RERANKERS)}")
+
+    reranker = RERANKERS[name](top_n)
+    if skip_margin is not None and name != "none":
+        reranker = DecisiveScoreSkip(reranker= reranker, top_n= top_n, margin= skip_margin)
+    return reranker
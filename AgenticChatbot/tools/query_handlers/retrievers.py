@@ -0,0 +1,82 @@
+import os
+import asyncio
+from typing import Dict, List, Tuple
+
+from langchain_core.callbacks import AsyncCallbackManagerForRetrieverRun, CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from langchain_core.vectorstores import VectorStore
+from dotenv import load_dotenv, find_dotenv
+
+from services.sparse_index import SparseIndex
+
+load_dotenv(find_dotenv())
+
+# "dense" searches vectors only, "hybrid" fuses the vector search with the collection's BM25 index when ingestion built one.
+# Hybrid stays opt-in until a run with the production embeddings shows it finds at least what the vector search does
+RAG_RETRIEVAL_MODE = os.getenv("RAG_RETRIEVAL_MODE", "dense")
+# Candidates handed to the reranker in hybrid mode. Cutting them to 10 lost recall in scripts/benchmark_hybrid_retrieval
+RAG_HYBRID_TOP_K = int(os.getenv("RAG_HYBRID_TOP_K", "20"))
+# Damping of reciprocal rank fusion, the usual 60 keeps a single list's top hit from dominating
+RRF_K = int(os.getenv("RRF_K", "60"))
+
+
+def with_score(doc: Document, score: float) -> Document:
+    return Document(page_content= doc.page_content, metadata= {**doc.metadata, "score": float(score)}, id= doc.id)
+
+
+class ScoredVectorRetriever(BaseRetriever):
+    """
+    Similarity search keeping each document's score in its `score` metadata, so the reranker can tell
+    how decisive the vector ranking already is. Higher scores are closer, as with Qdrant's cosine similarity.
+    """
+    vector_store: VectorStore
+    k: int = 20
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        return [with_score(doc, score) for doc, score in self.vector_store.similarity_search_with_score(query, k= self.k)]
+
+    async def _aget_relevant_documents(self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun) -> List[Document]:
+        results = await self.vector_store.asimilarity_search_with_score(query, k= self.k)
+        return [with_score(doc, score) for doc, score in results]
+
+
+def reciprocal_rank_fusion(rankings: List[List[Document]], k: int, rrf_k: int = RRF_K) -> List[Document]:
+    """
+    Merges ranked lists of the same chunks, identified by their `_id` metadata, scoring each chunk with the sum of
+    1 / (rrf_k + rank) over the lists it is in. The fused score replaces the `score` metadata.
+    """
+    fused: Dict[str, Tuple[float, Document]] = {}
+    for ranking in rankings:
+        for rank, doc in enumerate(ranking):
+            key = str(doc.metadata.get("_id", doc.page_content))
+            score, first = fused.get(key, (0.0, doc))
+            fused[key] = (score + 1 / (rrf_k + rank + 1), first)
+    best = sorted(fused.values(), key= lambda entry: entry[0], reverse= True)[:k]
+    return [with_score(doc, score) for score, doc in best]
+
+
+class HybridRetriever(BaseRetriever):
+    """
+    Runs the vector search & the BM25 search of a collection side by side & fuses their rankings, so chunks quoting
+    the exact terms of a question (form names, fee codes, payment modes) are found even when their vectors are not.
+    """
+    vector_store: VectorStore
+    sparse_index: SparseIndex
+    k: int = RAG_HYBRID_TOP_K
+    # Depth of each ranking before fusion
+    fetch_k: int = 20
+
+    model_config = {"arbitrary_types_allowed": True}
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        dense = [doc for doc, _ in self.vector_store.similarity_search_with_score(query, k= self.fetch_k)]
+        sparse = [doc for doc, _ in self.sparse_index.search(query, k= self.fetch_k)]
+        return reciprocal_rank_fusion([dense, sparse], k= self.k)
+
+    async def _aget_relevant_documents(self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun) -> List[Document]:
+        dense, sparse = await asyncio.gather(
+            self.vector_store.asimilarity_search_with_score(query, k= self.fetch_k),
+            asyncio.to_thread(self.sparse_index.search, query, self.fetch_k),
+        )
+        return reciprocal_rank_fusion([[doc for doc, _ in dense], [doc for doc, _ in sparse]], k= self.k)
@@ -5,7 +5,8 @@ from langgraph.prebuilt import InjectedState
 from langgraph.types import Command
 from typing import Annotated, Dict, Any
 from models.customer import Customer
-import requests
+from services import backend_client
+from tools.async_support import async_implementation
 import certifi
 import ssl
 import urllib3
@@ -24,10 +25,19 @@ def verify_customer_id(customer_id: str, phoneInfoLastFourDigits: str, tool_call
         state: A state object containing relevant metadata that serves as short-term memory checkpointer for the agent
     """
 
-    context = ssl.create_default_context(cafile= certifi.where())
     headers = {"customerId": customer_id, "phoneInfoLastFourDigits": phoneInfoLastFourDigits}
-    response = requests.get(Endpoints.VERIFY_CUSTOMER_ID, headers= headers, verify=False)
+    response = backend_client.get(Endpoints.VERIFY_CUSTOMER_ID, headers= headers)
+    return verification_command(response, tool_call_id)
 
+
+@async_implementation(verify_customer_id)
+async def averify_customer_id(customer_id: str, phoneInfoLastFourDigits: str, tool_call_id: Annotated[str, InjectedToolCallId], state: Annotated[Dict[str, Any], InjectedState]) -> Command:
+    headers = {"customerId": customer_id, "phoneInfoLastFourDigits": phoneInfoLastFourDigits}
+    response = await backend_client.aget(Endpoints.VERIFY_CUSTOMER_ID, headers= headers)
+    return verification_command(response, tool_call_id)
+
+
+def verification_command(response, tool_call_id: str) -> Command:
     if response.status_code == 200:
         customer = Customer(**response.json()['customer'])
         print(customer.model_dump(mode='json'))
@@ -1,32 +1,19 @@
 from dotenv import load_dotenv, find_dotenv
-import os
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
-from langchain_openai import ChatOpenAI
-from pydantic import SecretStr
+from services.llm_registry import get_chat_model
+from services.response_cache import response_cache
 from typing import List, Dict
 
 
 # Load environment variables from .env file
 load_dotenv(find_dotenv())
 
-title_model = ChatOpenAI(
-    model= "gpt-4.1-nano",
-    temperature= 0.5,
-    api_key= SecretStr(os.getenv("OPENAI_API_KEY", ""))
-)
+title_model = get_chat_model("title")
 
-summary_model = ChatOpenAI(
-    model= "gpt-4.1-mini",
-    temperature= 0,
-    api_key= SecretStr(os.getenv("OPENAI_API_KEY", ""))
-)
+summary_model = get_chat_model("summarizer")
 
-ivr_model = ChatOpenAI(
-    model= "gpt-4.1-nano",
-    temperature= 0,
-    api_key= SecretStr(os.getenv("OPENAI_API_KEY", ""))
-)
+ivr_model = get_chat_model("ivr")
 
 TITLE_GENERATION_PROMPT = """
 You are an AI assistant tasked with generating a concise and descriptive title for a chat session based on the initial prompt provided by the user. Do not include any additional information or context beyond the title itself. Do not make use of newline or carriage return characters.
@@ -34,6 +21,39 @@ You are an AI assistant tasked with generating a concise and descriptive title f
 Prompt: {prompt}
 """
 
+SUMMARY_GENERATION_PROMPT = ChatPromptTemplate.from_messages(
+    [
+        ("system", "Create a detailed summary of the conversation below."),
+        ("user", "{messages}")
+    ]
+)
+
+IVR_PROMPT = ChatPromptTemplate.from_messages(
+    [
+        ("system", "Shorten the following message to a message that can be communicated by an IVR teleprompter. Make sure to not omit important details."),
+        ("user", "{content}"),
+    ]
+)
+
+ROLLING_SUMMARY_PROMPT = ChatPromptTemplate.from_messages(
+    [
+        ("system", "You maintain a running summary of a customer support conversation. Extend the existing summary with the new messages below. Keep every customer detail, request, figure & outcome, and drop small talk. Return only the updated summary."),
+        ("user", "Existing summary:\n{summary}\n\nNew messages:\n{messages}")
+    ]
+)
+
+# Chains are built once & shared by the sync and async helpers
+title_chain = ChatPromptTemplate.from_template(TITLE_GENERATION_PROMPT) | title_model | StrOutputParser()
+summary_chain = SUMMARY_GENERATION_PROMPT | summary_model | StrOutputParser()
+rolling_summary_chain = ROLLING_SUMMARY_PROMPT | summary_model | StrOutputParser()
+ivr_chain = IVR_PROMPT | ivr_model | StrOutputParser()
+
+# Helper responses are reused for identical inputs to the same prompt. First prompts quote customer ids & emails,
+# so titles are only reused for an identical prompt
+title_response_cache = response_cache("title", title_model.model_name, template= TITLE_GENERATION_PROMPT)
+summary_response_cache = response_cache("summary", summary_model.model_name, template= SUMMARY_GENERATION_PROMPT)
+ivr_response_cache = response_cache("ivr", ivr_model.model_name, template= IVR_PROMPT)
+
 
 
 def chat_title_generation(prompt: str) -> str:
@@ -44,9 +64,16 @@ def chat_title_generation(prompt: str) -> str:
         str: The title of the application.
     """
 
-    title_prompt = ChatPromptTemplate.from_template(TITLE_GENERATION_PROMPT)
-    chain = title_prompt | title_model | StrOutputParser()
-    title = chain.invoke({"prompt": prompt})
+    title = title_response_cache.get_or_compute({"prompt": prompt}, lambda: title_chain.invoke({"prompt": prompt}))
+    return title.strip() if title else "Untitled Chat"
+
+
+async def achat_title_generation(prompt: str) -> str:
+    """
+    Async counterpart of `chat_title_generation`.
+    """
+
+    title = await title_response_cache.aget_or_compute({"prompt": prompt}, lambda: title_chain.ainvoke({"prompt": prompt}))
     return title.strip() if title else "Untitled Chat"
 
     
@@ -61,18 +88,43 @@ def chat_summary_generation(messages : List[Dict]) -> str:
     Returns:
         str: A string containing the summarized version of the chat conversation.
     """
-    
-    SUMMARY_GENERATION_PROMPT = ChatPromptTemplate.from_messages(
-        [
-            ("system", "Create a detailed summary of the conversation below."),
-            ("user", "{messages}")
-        ]
-    )
-    chain = SUMMARY_GENERATION_PROMPT | summary_model | StrOutputParser()
-    summary = chain.invoke({"messages": messages})
+
+    summary = summary_response_cache.get_or_compute({"messages": messages}, lambda: summary_chain.invoke({"messages": messages}))
     return summary.strip()
 
 
+async def achat_summary_generation(messages : List[Dict]) -> str:
+    """
+    Async counterpart of `chat_summary_generation`.
+    """
+
+    summary = await summary_response_cache.aget_or_compute({"messages": messages}, lambda: summary_chain.ainvoke({"messages": messages}))
+    return summary.strip()
+
+
+def rolling_summary_generation(summary: str, messages: List[Dict]) -> str:
+    """
+    Extends a running conversation summary with messages that happened after it.
+    Args:
+        summary (str): The current summary, empty when nothing has been summarized yet.
+        messages (List[Dict]): The new messages, as dictionaries with 'role' and 'message' keys.
+    Returns:
+        str: The updated summary.
+    """
+
+    updated = rolling_summary_chain.invoke({"summary": summary or "(none)", "messages": messages})
+    return updated.strip()
+
+
+async def arolling_summary_generation(summary: str, messages: List[Dict]) -> str:
+    """
+    Async counterpart of `rolling_summary_generation`.
+    """
+
+    updated = await rolling_summary_chain.ainvoke({"summary": summary or "(none)", "messages": messages})
+    return updated.strip()
+
+
 def ivr_message_generation(content: str) -> str:
     """
     Converts the given content into a shorter message that can easily read by the ivr system
@@ -82,15 +134,15 @@ def ivr_message_generation(content: str) -> str:
         str: Shortened IVR friendly message
     """
 
-    IVR_PROMPT = ChatPromptTemplate.from_messages(
-        [
-            ("system", "Shorten the following message to a message that can be communicated by an IVR teleprompter. Make sure to not omit important details."),
-            ("user", "{content}"),
-        ]
-    )
+    return ivr_response_cache.get_or_compute({"content": content}, lambda: ivr_chain.invoke({"content": content})).strip()
+
+
+async def aivr_message_generation(content: str) -> str:
+    """
+    Async counterpart of `ivr_message_generation`.
+    """
 
-    chain = IVR_PROMPT | ivr_model | StrOutputParser()
-    return chain.invoke({"content": content}).strip()
+    return (await ivr_response_cache.aget_or_compute({"content": content}, lambda: ivr_chain.ainvoke({"content": content}))).strip()
 
 
 
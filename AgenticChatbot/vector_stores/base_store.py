@@ -17,6 +17,8 @@ from langchain_community.document_loaders import AzureAIDocumentIntelligenceLoad
 from dotenv import load_dotenv, find_dotenv
 from pydantic import SecretStr
 
+from services.sparse_index import SparseIndex, sparse_index_path
+
 
 class BaseVectorStore:
     def __init__(
@@ -102,11 +104,30 @@ class BaseVectorStore:
         return (to_delete, to_update)
     
     
+    def backfill_sparse_index(self, vector_store: QdrantVectorStore, sparse_index: SparseIndex) -> None:
+        """
+        Indexes the chunks already in the collection, for collections ingested before the sparse index existed.
+        """
+        offset = None
+        while True:
+            points, offset = vector_store.client.scroll(self.collection, limit= 256, offset= offset, with_payload= True)
+            sparse_index.add(
+                [point.id for point in points],
+                [Document(page_content= point.payload.get('page_content', ''), metadata= point.payload.get('metadata') or {}) for point in points],
+            )
+            if offset is None:
+                break
+
+
     def update_vector_store(self):
         if not os.path.exists(self.db_directory):
             os.makedirs(self.db_directory)
         
         vector_store = self.get_vector_store()
+        # BM25 index of the same chunks, searched alongside the vectors by hybrid retrieval
+        sparse_index = SparseIndex(sparse_index_path(self.db_directory))
+        if not sparse_index.count():
+            self.backfill_sparse_index(vector_store, sparse_index)
         current_index = self.generate_current_hash_codes()
         to_delete, to_update = self.fetch_to_delete_and_update(current_index)
         
@@ -116,6 +137,7 @@ class BaseVectorStore:
             vector_store.delete(where= {
                 "HashCode": hash_to_delete
             })
+            sparse_index.delete_source(hash_to_delete)
         
         
         # Adding updated docs to the vector db
@@ -135,7 +157,10 @@ class BaseVectorStore:
                 extracted_documents.append(Document(page_content= doc.page_content, metadata= meta_data))
             
             chunks = self.split_documents(extracted_documents)
-            vector_store.add_documents(chunks)
+            ids = vector_store.add_documents(chunks)
+            sparse_index.add(ids, chunks)
         
         
-        current_index.to_csv(os.path.join(self.source_directory, 'index.csv'), index= False)
\ No newline at end of file
+        # The RAG answer caches are keyed by the hashes in this index, rewriting it with new hashes drops their answers
+        current_index.to_csv(os.path.join(self.source_directory, 'index.csv'), index= False)
+        sparse_index.close()
\ No newline at end of file
@@ -0,0 +1,23 @@
+import os
+
+# Relative to the application root, the working directory of both the app & the ingestion scripts
+DOCS_DIRECTORY = "docs"
+QDRANT_DIRECTORY = "qdrant"
+
+
+def docs_directory(collection: str) -> str:
+    """
+    Folder of a collection's source PDFs & of the `index.csv` listing their hashes, e.g. docs/Payments.
+    """
+    return os.path.join(DOCS_DIRECTORY, collection)
+
+
+def document_index_path(collection: str) -> str:
+    return os.path.join(docs_directory(collection), "index.csv")
+
+
+def persist_directory(collection: str) -> str:
+    """
+    Storage folder of a collection's embedded Qdrant database, e.g. qdrant/Payments.
+    """
+    return os.path.join(QDRANT_DIRECTORY, collection)
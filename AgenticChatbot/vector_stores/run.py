@@ -1,4 +1,5 @@
-from utils import update_vector_stores, reset_vector_stores   # type: ignore
+# Run from the application root, like the app, so the shared services are importable: python -m vector_stores.run
+from .utils import update_vector_stores, reset_vector_stores
 
 reset_vector_stores()
 update_vector_stores()
\ No newline at end of file
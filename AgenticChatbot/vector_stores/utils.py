@@ -1,9 +1,11 @@
-from base_store import BaseVectorStore
+from .base_store import BaseVectorStore
+from .paths import docs_directory, document_index_path, persist_directory
 import os
 import shutil
 
-payments_docs_source = r"docs\Payments"
-profile_docs_source = r"docs\Profile"
+# Shared with the query handlers, whose answer caches read the index.csv the ingestion writes here
+payments_docs_source = docs_directory("Payments")
+profile_docs_source = docs_directory("Profile")
 
 
 def update_vector_stores():
@@ -15,14 +17,14 @@ def update_vector_stores():
     payments_store = BaseVectorStore(
         source_directory= payments_docs_source, 
         collection= "Payments", 
-        persist_directory= "./qdrant/Payments")
+        persist_directory= persist_directory("Payments"))
     payments_store.update_vector_store()
     
     
     profile_store = BaseVectorStore(
         source_directory= profile_docs_source,
         collection= "Profile",
-        persist_directory= "./qdrant/Profile"
+        persist_directory= persist_directory("Profile")
     )
     profile_store.update_vector_store()
 
@@ -33,10 +35,10 @@ def reset_vector_stores():
     """
     shutil.rmtree("./dqrant/Payments", ignore_errors=True)
 
-    payments_index = os.path.join(payments_docs_source, 'index.csv')
+    payments_index = document_index_path("Payments")
     if os.path.exists(payments_index):
         os.remove(payments_index)
     
-    profile_index = os.path.join(profile_docs_source, 'index.csv')
+    profile_index = document_index_path("Profile")
     if os.path.exists(profile_index):
         os.remove(profile_index)
\ No newline at end of file